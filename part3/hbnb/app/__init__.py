@@ -1,15 +1,15 @@
 from flask import Flask, request  # Add request import
 from flask_sqlalchemy import SQLAlchemy
 from flask_restx import Api
-from flask_jwt_extended import JWTManager
+from app.services.jwt_cache import CachingJWTManager
 from flask_bcrypt import Bcrypt
 from flask_migrate import Migrate
 from config import config  # Import the configuration dictionary
-from app.db import db  # Import db instance from app.db
+from app.db import db, configure_replicas  # Import db instance from app.db
 
 # Initialize extensions
 bcrypt = Bcrypt()
-jwt = JWTManager()
+jwt = CachingJWTManager()  # Verifies each distinct token once (see token_cache)
 migrate = Migrate()
 
 def create_app(config_name='default'):
@@ -17,18 +17,42 @@ def create_app(config_name='default'):
 
     # Enable CORS for all routes and all origins
     from flask_cors import CORS
-    CORS(app, origins="*", methods=["GET", "POST", "OPTIONS", "PUT", "DELETE"], allow_headers=["Content-Type", "Authorization"])
+    CORS(app, origins="*", methods=["GET", "POST", "OPTIONS", "PUT", "PATCH", "DELETE"], allow_headers=["Content-Type", "Authorization"], expose_headers=["X-Next-Cursor"])
   
     # Load the configuration based on the environment (default to 'default')
     app.config.from_object(config[config_name])  # Load the config based on 'default'
 
+    if app.config.get('TRUSTED_PROXIES'):
+        # remote_addr becomes the address the outermost trusted proxy saw
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'])
+
     # Initialize extensions with the app object
     bcrypt.init_app(app)
     jwt.init_app(app)
 
+    configure_replicas(app)  # Replica URLs become replica_<n> binds
     db.init_app(app)  # Connect db to the app
     migrate.init_app(app, db)  # Setup migration tool
 
+    from app.services.cache import cache
+    cache.init_app(app)  # Select the facade cache backend
+
+    from app.services.passwords import hasher
+    hasher.init_app(app)  # bcrypt cost and hashing worker pool
+
+    from app.services.jwt_cache import token_cache
+    token_cache.init_app(app)  # Verified token claims
+
+    from app.services.search import search_index
+    search_index.init_app(app)  # Full-text search backend for the database dialect
+
+    from app.compression import compressor
+    compressor.init_app(app)  # gzip/brotli for large enough responses
+
+    from app.cli import hbnb_cli
+    app.cli.add_command(hbnb_cli)  # flask hbnb ... maintenance commands
+
     # Add a before-request hook to handle OPTIONS requests globally
     @app.before_request
     def handle_options_requests():
@@ -36,7 +60,19 @@ def create_app(config_name='default'):
             return {}, 200
 
     # Initialize API
-    api = Api(app, version='1.0', title='HBnB API', description='HBnB Application API')
+    # Every resource runs in a unit of work: one commit per request
+    from app.persistence.unit_of_work import transactional
+    api = Api(app, version='1.0', title='HBnB API', description='HBnB Application API',
+              decorators=[transactional])
+
+    from app import serialization
+    serialization.init_app(app, api)  # orjson provider and registry-based responses
+
+    from app import instrumentation
+    instrumentation.init_app(app, api)  # SQL/latency metrics, /metrics, Server-Timing
+
+    from app.services.rate_limit import rate_limiter
+    rate_limiter.init_app(app)  # 429 before the view runs; after instrumentation so rejections are counted
 
     # Register namespaces (API routes for different parts of your app)
     from app.api.v1.auth import api as auth_ns
@@ -44,15 +80,25 @@ def create_app(config_name='default'):
     from app.api.v1.amenities import api as amenities_ns
     from app.api.v1.places import api as places_ns
     from app.api.v1.reviews import api as reviews_ns
+    from app.api.v1.stats import api as stats_ns
+    from app.api.v1.bulk import api as bulk_ns
+    from app.api.v1.export import api as export_ns
+    from app.api.v1.search import api as search_ns
 
     api.add_namespace(auth_ns, path='/api/v1/auth')
     api.add_namespace(users_ns, path='/api/v1/users')
     api.add_namespace(amenities_ns, path='/api/v1/amenities')
     api.add_namespace(places_ns, path='/api/v1/places')
     api.add_namespace(reviews_ns, path='/api/v1/reviews')
+    api.add_namespace(stats_ns, path='/api/v1/stats')
+    api.add_namespace(bulk_ns, path='/api/v1/bulk')
+    api.add_namespace(export_ns, path='/api/v1/export')
+    api.add_namespace(search_ns, path='/api/v1/search')
 
     # Optional: Create tables (this will automatically create tables for all models)
     with app.app_context():
-        db.create_all()  # This command will create tables for all your models
+        db.create_all(bind_key=None)  # This command will create tables for all your models, on the primary only
+        search_index.create_schema()  # FTS tables are not models
+        db.session.commit()
 
     return app
\ No newline at end of file
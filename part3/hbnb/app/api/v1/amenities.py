@@ -5,6 +5,10 @@ from app.services import facade
 from flask import request
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
+from app.api.v1.batch import MAX_BATCH_IDS, batch_response, parse_ids
+from app.api.v1.conditional import conditional, precondition_failed
+from app.models.amenity import Amenity
+from app.serialization import serializers
 facade = HBnBFacade()
 
 api = Namespace('amenities', description='Amenity operations')
@@ -25,40 +29,62 @@ class AmenityList(Resource):
         amenity_data = api.payload
         try:
             new_amenity = facade.create_amenity(amenity_data)
-            return {'id': new_amenity.id, 'name': new_amenity.name, 'description': new_amenity.description}, 201
+            return serializers.dump(new_amenity), 201
         except ValueError:
             return {'error': 'Invalid input data'}, 400
 
+    @api.doc(params={'ids': f'Comma separated amenity IDs (at most {MAX_BATCH_IDS}) to return instead of every amenity'})
     @api.response(200, 'List of amenities retrieved successfully')
+    @api.response(304, 'Amenities not modified')
+    @api.response(400, 'Invalid ids parameter')
     def get(self):
-        """Retrieve a list of all amenities"""
-        amenities = facade.get_all_amenities()
-        if not amenities:
+        """Retrieve a list of all amenities, or those of ?ids= in one lookup"""
+        try:
+            ids = parse_ids()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if ids is not None:
+            return batch_response(ids, facade.get_amenities_by_ids(ids), serializers.serializer(Amenity))
+        entry = facade.get_all_amenities_entry()
+        if not entry.value:
             return {'error': 'No amenities found'}, 404
-        return [{'id': amenity.id, 'name': amenity.name, 'description': amenity.description} for amenity in amenities], 200
+        return conditional(entry.value, entry.etag)
 
 @api.route('/<amenity_id>')
 class AmenityResource(Resource):
     @api.response(200, 'Amenity details retrieved successfully')
+    @api.response(304, 'Amenity not modified')
     @api.response(404, 'Amenity not found')
     def get(self, amenity_id):
         """Get amenity details by ID"""
-        amenity = facade.get_amenity(amenity_id)
-        if not amenity:
+        entry = facade.get_amenity_entry(amenity_id)
+        if not entry:
             return {'error': 'Amenity not found'}, 404
-        return {'id': amenity.id, 'name': amenity.name, 'description': amenity.description}, 200
+        return conditional(entry.value, entry.etag)
     
     @api.expect(amenity_model)
     @api.response(200, 'Amenity updated successfully')
     @api.response(404, 'Amenity not found')
     @api.response(400, 'Invalid input data')
+    @api.response(412, 'If-Match does not match the current ETag')
     def put(self, amenity_id):
         """Update an amenity's information"""
+        if request.if_match:
+            # Lock the row so nobody changes it between the check and the update
+            entry = facade.get_amenity_entry(amenity_id, for_update=True)
+            if not entry:
+                return {'error': 'Amenity not found'}, 404
+            failed = precondition_failed(entry.etag)
+            if failed:
+                return failed
         amenity_data = api.payload
-        updated_amenity = facade.update_amenity(amenity_id, amenity_data)
+        try:
+            updated_amenity = facade.update_amenity(amenity_id, amenity_data)
+        except ValueError as e:
+            return {'error': f'Invalid input data: {str(e)}'}, 400
         if not updated_amenity:
             return {'error': 'Amenity not found'}, 404
-        return {'id': updated_amenity.id, 'name': updated_amenity.name, 'description': updated_amenity.description}, 200
+        return serializers.dump(updated_amenity), 200
 
 
 @api.route('/admin/')
@@ -77,7 +103,7 @@ class AdminAmenityCreate(Resource):
         amenity_data = request.json
         try:
             new_amenity = facade.create_amenity(amenity_data)
-            return {'id': new_amenity.id, 'name': new_amenity.name, 'description': new_amenity.description}, 201
+            return serializers.dump(new_amenity), 201
         except ValueError:
             return {'error': 'Invalid input data'}, 400
         
@@ -96,8 +122,20 @@ class AdminAmenityModify(Resource):
             return {'error': 'Admin privileges required'}, 403
 
 
+        if request.if_match:
+            # Lock the row so nobody changes it between the check and the update
+            entry = facade.get_amenity_entry(amenity_id, for_update=True)
+            if not entry:
+                return {'error': 'Amenity not found'}, 404
+            failed = precondition_failed(entry.etag)
+            if failed:
+                return failed
+
         amenity_data = request.json
-        updated_amenity = facade.update_amenity(amenity_id, amenity_data)
+        try:
+            updated_amenity = facade.update_amenity(amenity_id, amenity_data)
+        except ValueError as e:
+            return {'error': f'Invalid input data: {str(e)}'}, 400
         if not updated_amenity:
             return {'error': 'Failed to update amenity'}, 500
-        return {'id': updated_amenity.id, 'name': updated_amenity.name, 'description': updated_amenity.description}, 200
+        return serializers.dump(updated_amenity), 200
@@ -7,6 +7,8 @@ from flask_jwt_extended import (
 )
 from app.services.facade import HBnBFacade
 from app.models.user import User
+from app.services.passwords import PasswordHasherBusy, busy_response
+from app.services.rate_limit import rate_limit
 
 api = Namespace('auth', description='User authentication')
 
@@ -30,12 +32,17 @@ register_model = api.model('Register', {
 @api.route('/login')
 class LoginResource(Resource):
     @api.expect(login_model)
+    @api.response(429, 'Too many login attempts')
+    @rate_limit('login')
     def post(self):
         """Authenticate user and return a JWT token"""
         credentials = api.payload
-        user = facade.get_user_by_email(credentials['email'])
+        try:
+            user = facade.authenticate(credentials['email'], credentials['password'])
+        except PasswordHasherBusy:
+            return busy_response()
 
-        if not user or not user.check_password(credentials['password']):
+        if not user:
             return {'error': 'Invalid credentials'}, 401
 
         access_token = create_access_token(
@@ -49,6 +56,8 @@ class LoginResource(Resource):
 @api.route('/register')
 class RegisterResource(Resource):
     @api.expect(register_model)
+    @api.response(429, 'Too many registrations')
+    @rate_limit('register')
     def post(self):
         """Register a new user"""
         data = api.payload
@@ -67,6 +76,8 @@ class RegisterResource(Resource):
             facade.save_user(new_user)
         except ValueError as e:
             return {'error': str(e)}, 400
+        except PasswordHasherBusy:
+            return busy_response()
 
         access_token = create_access_token(
             identity=str(new_user.id),
@@ -91,6 +102,8 @@ class ProtectedResource(Resource):
 
 @api.route('/generate_admin_token')
 class GenerateAdminToken(Resource):
+    @api.response(429, 'Too many requests')
+    @rate_limit('admin_token')
     def get(self):
         """Temporary utility to generate a static admin token (for testing)"""
         token = create_access_token(
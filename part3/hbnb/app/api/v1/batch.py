@@ -0,0 +1,36 @@
+from flask import request
+from app.api.v1.conditional import conditional
+from app.api.v1.query_params import parse_csv_arg
+from app.services.cache import etag_of
+
+# Most distinct IDs one ?ids= lookup may ask for
+MAX_BATCH_IDS = 100
+
+
+def parse_ids():
+    """Return the distinct ?ids= values in request order, None if the argument is absent.
+
+    Raises ValueError if it lists no ID or more than MAX_BATCH_IDS.
+    """
+    if 'ids' not in request.args:
+        return None
+    ids = list(dict.fromkeys(parse_csv_arg('ids')))
+    if not ids:
+        raise ValueError("ids must list at least one ID")
+    if len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f"At most {MAX_BATCH_IDS} ids can be requested at once")
+    return ids
+
+
+def batch_response(ids, objects, serialize):
+    """Return the objects found for ids, serialized in the order of ids, and the IDs not found.
+
+    The body is {'results': [...], 'not_found': [...]}; like pages, it only
+    gets an ETag.
+    """
+    by_id = {obj.id: obj for obj in objects}
+    body = {
+        'results': [serialize(by_id[obj_id]) for obj_id in ids if obj_id in by_id],
+        'not_found': [obj_id for obj_id in ids if obj_id not in by_id]
+    }
+    return conditional(body, etag_of(body))
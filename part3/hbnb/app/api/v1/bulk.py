@@ -0,0 +1,29 @@
+from flask import current_app, request
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import get_jwt, jwt_required, get_jwt_identity
+from app.services.bulk_import import BulkImporter
+
+api = Namespace('bulk', description='Bulk import operations')
+
+
+@api.route('/places')
+class BulkPlaceImport(Resource):
+    @api.doc(params={'batch_size': 'Records per insert batch'})
+    @api.response(200, 'Import finished, see the report for per-line errors')
+    @api.response(400, 'Invalid batch size')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def post(self):
+        """Stream an NDJSON body of places, amenities and reviews into the database"""
+        claims = get_jwt()
+        if not claims.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+
+        batch_size = request.args.get('batch_size', current_app.config['BULK_IMPORT_BATCH_SIZE'], type=int)
+        try:
+            importer = BulkImporter(batch_size)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        # Places without user_id belong to the caller
+        report = importer.run(request.stream, default_user_id=get_jwt_identity())
+        return report, 200
@@ -0,0 +1,34 @@
+from flask import Response, request
+from werkzeug.http import quote_etag
+from app.compression import ETAG_SUFFIXES
+
+
+def conditional(data, etag, status=200, headers=None):
+    """Return data with its ETag, or an empty 304 if If-None-Match matches it.
+
+    The strong ETag is the only validator: without Last-Modified, clients
+    never revalidate with If-Modified-Since. Clients must revalidate
+    (Cache-Control: no-cache), which costs no more than a cache lookup
+    when nothing changed.
+    """
+    headers = dict(headers or {})
+    headers['ETag'] = quote_etag(etag)
+    headers['Cache-Control'] = 'no-cache'
+    if request.if_none_match and _matches(request.if_none_match, etag, weak=True):
+        return Response(status=304, headers=headers)
+    return data, status, headers
+
+
+def _matches(etags, etag, weak):
+    """Whether etags contains etag, as sent or as suffixed by the compression of the response."""
+    contains = etags.contains_weak if weak else etags.contains
+    return any(contains(etag + suffix) for suffix in ('', *ETAG_SUFFIXES.values()))
+
+
+def precondition_failed(etag):
+    """Return a 412 error if an If-Match header does not match etag (None: no current representation)."""
+    if not request.if_match:
+        return None
+    if etag is None or not _matches(request.if_match, etag, weak=False):
+        return {'error': 'Precondition failed: the resource has been modified'}, 412
+    return None
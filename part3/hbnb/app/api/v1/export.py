@@ -0,0 +1,71 @@
+from datetime import datetime
+from flask import Response, request, stream_with_context
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import get_jwt, jwt_required
+from app.models.place import Place
+from app.models.review import Review
+from app.services.facade import HBnBFacade
+from app.services.export import EXPORT_FORMATS, chunked, encode_csv, encode_ndjson
+
+facade = HBnBFacade()
+api = Namespace('export', description='Streaming data exports')
+
+MIMETYPES = {'ndjson': 'application/x-ndjson', 'csv': 'text/csv'}
+
+export_params = {
+    'format': 'ndjson (default) or csv',
+    'updated_since': 'ISO 8601 timestamp; only rows updated at or after it are exported'
+}
+
+
+def stream_export(name, model, iter_rows):
+    """Build a streamed export response from a facade row iterator."""
+    claims = get_jwt()
+    if not claims.get('is_admin'):
+        return {'error': 'Admin privileges required'}, 403
+
+    export_format = request.args.get('format', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return {'error': f"Invalid format, expected one of: {', '.join(EXPORT_FORMATS)}"}, 400
+    updated_since = request.args.get('updated_since')
+    if updated_since:
+        try:
+            updated_since = datetime.fromisoformat(updated_since)
+        except ValueError:
+            return {'error': 'Invalid updated_since timestamp'}, 400
+
+    rows = iter_rows(updated_since or None)
+    if export_format == 'csv':
+        pieces = encode_csv(rows, [column.name for column in model.public_columns()])
+    else:
+        pieces = encode_ndjson(rows)
+
+    gzip = request.accept_encodings.best_match(('gzip',)) is not None
+    headers = {'Content-Disposition': f'attachment; filename={name}.{export_format}', 'Vary': 'Accept-Encoding'}
+    if gzip:
+        headers['Content-Encoding'] = 'gzip'
+    return Response(stream_with_context(chunked(pieces, gzip)), mimetype=MIMETYPES[export_format], headers=headers)
+
+
+@api.route('/places')
+class PlaceExport(Resource):
+    @api.doc(params=export_params)
+    @api.response(200, 'Places streamed ordered by updated_at')
+    @api.response(400, 'Invalid query parameters')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Stream all places as NDJSON or CSV"""
+        return stream_export('places', Place, facade.iter_places)
+
+
+@api.route('/reviews')
+class ReviewExport(Resource):
+    @api.doc(params=export_params)
+    @api.response(200, 'Reviews streamed ordered by updated_at')
+    @api.response(400, 'Invalid query parameters')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Stream all reviews as NDJSON or CSV"""
+        return stream_export('reviews', Review, facade.iter_reviews)
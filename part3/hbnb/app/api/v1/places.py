@@ -1,10 +1,18 @@
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
 from app.services.facade import HBnBFacade
 from app import db
 from app.models.amenity import Amenity 
 from app.models.place import Place
+from app.models.geo import MAX_RADIUS_KM
 from app.models.amenity import Amenity
+from app.persistence.pagination import clamp_limit
+from app.api.v1.query_params import parse_csv_arg, parse_expand, parse_fields
+from app.api.v1.batch import MAX_BATCH_IDS, batch_response, parse_ids
+from app.api.v1.conditional import conditional, precondition_failed
+from app.services.cache import etag_of
+from app.serialization import serializers
 
 
 from flask_jwt_extended import get_jwt, jwt_required, get_jwt_identity
@@ -17,6 +25,11 @@ amenity_model = api.model('PlaceAmenity', {
     'name': fields.String(description='Name of the amenity')
 })
 
+amenity_links_model = api.model('PlaceAmenityLinks', {
+    'add': fields.List(fields.String, description='IDs of the amenities to link to the place'),
+    'remove': fields.List(fields.String, description='IDs of the amenities to unlink from the place')
+})
+
 user_model = api.model('PlaceUser', {
     'id': fields.String(description='User ID'),
     'first_name': fields.String(description='First name of the owner'),
@@ -32,6 +45,12 @@ place_model = api.model('Place', {
     'longitude': fields.Float(required=True, description='Longitude of the place')
 })
 
+# Fields returned after creating or updating a place
+PLACE_WRITE_FIELDS = ('id', 'title', 'description', 'price', 'latitude', 'longitude', 'associated_amenities')
+# Fields returned by the admin update
+PLACE_ADMIN_WRITE_FIELDS = ('id', 'title', 'description', 'price', 'latitude', 'longitude')
+
+
 @api.route('/')
 class PlaceList(Resource):
     @api.expect(place_model)
@@ -48,111 +67,172 @@ class PlaceList(Resource):
         amenities_ids = place_data.get('amenities_ids', [])
 
         try:
-            # Create the new place using the facade
-            new_place = facade.create_place(place_data)
-
-            # If amenities_ids are provided, add them to the new place
+            # If amenities_ids are provided, they must all exist
             if amenities_ids:
+                found_ids = {amenity.id for amenity in facade.get_amenities_by_ids(amenities_ids)}
                 for amenity_id in amenities_ids:
-                    # Query the amenity by ID
-                    amenity = Amenity.query.get(amenity_id)  # Fetch the amenity by ID
-
-                    if amenity:
-                        # Add the amenity to the place
-                        new_place.add_amenity(amenity)
-                    else:
-                        # If any amenity ID is invalid, return an error
+                    if amenity_id not in found_ids:
                         return {'error': f'Amenity with ID {amenity_id} not found'}, 404
-            
-            # After adding amenities, return the newly created place's details
-            associated_amenities = [amenity.name for amenity in new_place.associated_amenities]
 
-            return {
-                'id': new_place.id,
-                'title': new_place.title,
-                'description': new_place.description,
-                'price': new_place.price,
-                'latitude': new_place.latitude,
-                'longitude': new_place.longitude,
-                'associated_amenities': associated_amenities
-            }, 201
+            # Create the new place with its amenities using the facade
+            place_data['associated_amenities'] = amenities_ids
+            new_place = facade.create_place(place_data)
+
+            # Return the newly created place's details
+            return serializers.dump(new_place, PLACE_WRITE_FIELDS), 201
 
         except ValueError:
             return {'error': 'Invalid input data'}, 400
 
+    @api.doc(params={
+        'limit': 'Maximum number of places to return',
+        'cursor': 'Cursor returned in the X-Next-Cursor header of the previous page',
+        'min_price': 'Minimum price per night',
+        'max_price': 'Maximum price per night',
+        'amenities': 'Comma separated amenity IDs the places must offer',
+        'mode': 'all (default): places offering every amenity; any: at least one',
+        'amenity': 'Only places offering this amenity ID (same as amenities with a single ID)',
+        'sort': 'created_at (default), price or rating, prefixed with - for descending order',
+        'fields': 'Comma separated fields to return instead of the default ones',
+        'ids': f'Comma separated place IDs (at most {MAX_BATCH_IDS}) to return instead of a page; '
+               'the other filters are ignored'
+    })
     @api.response(200, 'List of places retrieved successfully')
+    @api.response(304, 'Page unchanged since the If-None-Match ETag')
+    @api.response(400, 'Invalid query parameters')
     @api.response(404, 'No places found')
     def get(self):
-        """Retrieve a list of all places"""
-        places_data = facade.get_all_places()
-        if not places_data:
+        """Retrieve a page of places, or those of ?ids= in one lookup"""
+        args = request.args
+        amenity_ids = parse_csv_arg('amenities') + parse_csv_arg('amenity')
+        try:
+            fields = parse_fields(Place)
+            ids = parse_ids()
+            if ids is not None:
+                return batch_response(ids, facade.get_places_by_ids(ids, fields), serializers.serializer(Place, fields))
+            places, next_cursor = facade.get_places_page(
+                clamp_limit(args.get('limit', type=int)),
+                cursor=args.get('cursor'),
+                min_price=args.get('min_price', type=float),
+                max_price=args.get('max_price', type=float),
+                amenity_ids=amenity_ids,
+                amenity_mode=args.get('mode', 'all'),
+                sort=args.get('sort', 'created_at'),
+                fields=fields
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if not places:
             return {'error': 'No places found'}, 404
 
-        return [{
-            'id': place_data['place']['id'],
-            'title': place_data['place']['title'],
-            'description': place_data['place']['description'],
-            'price': place_data['place']['price'],
-            'latitude': place_data['place']['latitude'],
-            'longitude': place_data['place']['longitude'],
-            'associated_amenities': place_data['associated_amenities']
-        } for place_data in places_data], 200
+        headers = {'X-Next-Cursor': next_cursor} if next_cursor else {}
+        # Pages are not cached, so they only get an ETag
+        body = serializers.dump_many(places, fields)
+        return conditional(body, etag_of(body), headers=headers)
+
+
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.doc(params={
+        'lat': 'Latitude of the center point',
+        'lon': 'Longitude of the center point',
+        'radius_km': f'Search radius in kilometers, at most {MAX_RADIUS_KM}',
+        'limit': 'Maximum number of places to return',
+        'fields': 'Comma separated fields to return instead of the default ones'
+    })
+    @api.response(200, 'Nearby places retrieved successfully')
+    @api.response(400, 'Invalid query parameters')
+    def get(self):
+        """Retrieve places within a radius of a point, nearest first"""
+        args = request.args
+        lat = args.get('lat', type=float)
+        lon = args.get('lon', type=float)
+        radius_km = args.get('radius_km', type=float)
+        if lat is None or lon is None or radius_km is None:
+            return {'error': 'lat, lon and radius_km are required'}, 400
+        try:
+            fields = parse_fields(Place)
+            matches = facade.get_places_nearby(lat, lon, radius_km, clamp_limit(args.get('limit', type=int)), fields)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        serialize = serializers.serializer(Place, fields)
+        return [
+            dict(serialize(place), distance_km=round(distance, 3))
+            for place, distance in matches
+        ], 200
+
+
+@api.route('/bbox')
+class PlaceBoundingBox(Resource):
+    @api.doc(params={
+        'min_lat': 'Southern latitude', 'min_lon': 'Western longitude',
+        'max_lat': 'Northern latitude', 'max_lon': 'Eastern longitude',
+        'limit': 'Maximum number of places to return',
+        'fields': 'Comma separated fields to return instead of the default ones'
+    })
+    @api.response(200, 'Places retrieved successfully')
+    @api.response(400, 'Invalid query parameters')
+    def get(self):
+        """Retrieve places inside a bounding box"""
+        args = request.args
+        bounds = [args.get(key, type=float) for key in ('min_lat', 'min_lon', 'max_lat', 'max_lon')]
+        if None in bounds:
+            return {'error': 'min_lat, min_lon, max_lat and max_lon are required'}, 400
+        try:
+            fields = parse_fields(Place)
+            places = facade.get_places_in_bbox(*bounds, clamp_limit(args.get('limit', type=int)), fields)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        return serializers.dump_many(places, fields), 200
 
 
 
 @api.route('/<place_id>')
 class PlaceResource(Resource):
+    @api.doc(params={'expand': 'amenities: return amenities as {id, name} objects instead of names'})
     @api.response(200, 'Place details retrieved successfully')
+    @api.response(304, 'Place not modified')
+    @api.response(400, 'Invalid expand parameter')
     @api.response(404, 'Place not found')
     def get(self, place_id):
         """Get place details by ID"""
-        place_data = facade.get_place(place_id)
-        if not place_data:
+        try:
+            expand = parse_expand(('amenities',))
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        entry = facade.get_place_entry(place_id, expand_amenities='amenities' in expand)
+        if not entry:
             return {'error': 'No places found'}, 404
-        
-        # Extract amenity IDs from place_data
-        amenity_ids = place_data.get('associated_amenities', [])
-        
-        # Fetch the Amenity objects and get their names
-        if amenity_ids:
-            amenities = Amenity.query.filter(Amenity.id.in_(amenity_ids)).all()
-            amenity_names = [amenity.name for amenity in amenities]
-        else:
-            amenity_names = []
-
-        # Update place_data with amenity names instead of IDs
-        place_data['associated_amenities'] = amenity_names
-        
-        return place_data, 200
+        return conditional(entry.value, entry.etag)
     
     @api.expect(place_model)
     @api.response(200, 'Place updated successfully')
+    @api.response(400, 'Invalid input data')
     @api.response(404, 'Place not found')
     @api.response(403, 'Unauthorized action')
+    @api.response(412, 'If-Match does not match the current ETag')
     @api.response(500, 'Failed to update this place')
     @jwt_required()
     def put(self, place_id):
         """Update a place's information"""
-        place_data = facade.get_place(place_id)
+        # With If-Match, lock the row so nobody changes it between the check and the update
+        entry = facade.get_place_entry(place_id, for_update=bool(request.if_match))
         current_user_id = get_jwt_identity()
-        if not place_data:
+        if not entry:
             return {'error': 'Place not found'}, 404
-        if place_data['place']['user_id'] != current_user_id:
+        if entry.value['place']['user_id'] != current_user_id:
             return {'error': 'Unauthorized action'}, 403
+        failed = precondition_failed(entry.etag)
+        if failed:
+            return failed
         user_place = api.payload
-        updated_place = facade.update_place(place_id, user_place)
+        try:
+            updated_place = facade.update_place(place_id, user_place)
+        except ValueError as e:
+            return {'error': f'Invalid input data: {str(e)}'}, 400
         if not updated_place:
             return {'error': 'Failed to update this place'}, 500
-        associated_amenities = [amenity.id for amenity in updated_place.associated_amenities]
-        return {
-            'id': updated_place.id,
-            'title': updated_place.title,
-            'description': updated_place.description,
-            'price': updated_place.price,
-            'latitude': updated_place.latitude,
-            'longitude': updated_place.longitude,
-            'associated_amenities': associated_amenities
-        }, 200
+        return serializers.dump(updated_place, PLACE_WRITE_FIELDS), 200
 
     @api.response(200, 'Review deleted successfully')
     @api.response(404, 'Review not found')
@@ -187,62 +267,71 @@ class PlaceAmenitiesResource(Resource):
     @api.response(400, 'Invalid input')
     @jwt_required()
     def post(self, place_id):
-        # Fetch place from the database
-        place_data = facade.get_place(place_id)
-        if not place_data:
-            return {'error': 'Place not found'}, 404
-
-        # Get the list of amenity IDs from the request payload
+        """Add amenities to a place"""
         amenities_ids = api.payload.get('amenities_ids')
         if not amenities_ids:
             return {'error': 'Amenities IDs are required'}, 400
-
-        # Query the amenities
-        amenities = Amenity.query.filter(Amenity.id.in_(amenities_ids)).all()
-        if len(amenities) != len(amenities_ids):
+        try:
+            change = facade.change_place_amenities(place_id, add=amenities_ids)
+        except ValueError:
             return {'error': 'Some amenities not found'}, 404
+        if change is None:
+            return {'error': 'Place not found'}, 404
+        return {'message': 'Amenities added successfully'}, 200
 
-        # Get existing amenity IDs (ensure it's a list of IDs)
-        existing_amenities_ids = place_data.get('associated_amenities', [])
-        if not isinstance(existing_amenities_ids, list):
-            existing_amenities_ids = []
-
-        # Ensure existing_amenities_ids contains only strings (IDs)
-        existing_amenities_ids = [str(amenity_id) for amenity_id in existing_amenities_ids]
-
-        # Add new amenity IDs, avoiding duplicates
-        new_amenities_ids = [amenity.id for amenity in amenities if amenity.id not in existing_amenities_ids]
-        updated_amenities_ids = existing_amenities_ids + new_amenities_ids
-
-        # Update place_data with the new list of amenity IDs (strings only)
-        place_data['associated_amenities'] = updated_amenities_ids
-
-        # Update the place in the database
+    @api.expect(amenity_links_model)
+    @api.response(200, 'Amenities of the place changed')
+    @api.response(400, 'Invalid input')
+    @api.response(403, 'Unauthorized action')
+    @api.response(404, 'Place or amenity not found')
+    @api.response(412, 'If-Match does not match the current ETag')
+    @jwt_required()
+    def patch(self, place_id):
+        """Add and remove amenities of a place in one request"""
+        payload = api.payload or {}
+        add, remove = payload.get('add') or [], payload.get('remove') or []
+        if not all(isinstance(ids, list) and all(isinstance(i, str) for i in ids) for ids in (add, remove)):
+            return {'error': 'add and remove must be lists of amenity IDs'}, 400
+        if not add and not remove:
+            return {'error': 'Amenity IDs to add or remove are required'}, 400
+        if set(add) & set(remove):
+            return {'error': 'An amenity cannot be both added and removed'}, 400
+        # With If-Match, lock the row so nobody changes it between the check and the update
+        entry = facade.get_place_entry(place_id, for_update=bool(request.if_match))
+        if not entry:
+            return {'error': 'Place not found'}, 404
+        if entry.value['place']['user_id'] != get_jwt_identity() and not get_jwt().get('is_admin'):
+            return {'error': 'Unauthorized action'}, 403
+        failed = precondition_failed(entry.etag)
+        if failed:
+            return failed
         try:
-            facade.update_place(place_id, place_data)
-            return {'message': 'Amenities added successfully'}, 200
-        except Exception as e:
-            return {'error': f'Failed to update place: {str(e)}'}, 500
+            change = facade.change_place_amenities(place_id, add=add, remove=remove)
+        except ValueError as e:
+            return {'error': str(e)}, 404
+        if change is None:
+            return {'error': 'Place not found'}, 404
+        return {
+            'associated_amenities': sorted(change.linked),
+            'added': sorted(change.added),
+            'removed': sorted(change.removed)
+        }, 200
 
     @api.response(200, 'Amenities retrieved successfully')
     @api.response(404, 'Place not found')
     @jwt_required()
     def get(self, place_id):
         """Retrieve amenities associated with a place by its ID"""
-        # Fetch place from the database
-        place_data = facade.get_place(place_id)
+        # Fetch place and its amenities in one (cached) lookup
+        place_data = facade.get_place(place_id, expand_amenities=True)
         
         if not place_data:
             return {'error': 'Place not found'}, 404
         associated_amenities = place_data['associated_amenities']
-        # Retrieve the associated amenities for the place
-        amenities = Amenity.query.filter(Amenity.id.in_(associated_amenities)).all()
         
         # If there are associated amenities, return them
         if associated_amenities:
-     # Return a list of amenities (you can modify this as needed)
-            amenities_list = [{'id': amenity.id, 'name': amenity.name} for amenity in amenities]
-            return {'associated_amenities': amenities_list}, 200
+            return {'associated_amenities': associated_amenities}, 200
         else:
             return {'message': 'No amenities associated with this place'}, 404
 
@@ -264,12 +353,18 @@ class AdminPlaceModify(Resource):
             return {'error': 'Admin privileges required'}, 403
        
        
-        place = facade.get_place(place_id)
-        if not place:
+        entry = facade.get_place_entry(place_id, for_update=bool(request.if_match))
+        if not entry:
             return {'error': 'Place not found'}, 404
+        failed = precondition_failed(entry.etag)
+        if failed:
+            return failed
        
         user_place = api.payload
-        updated_place = facade.update_place(place_id, user_place)
+        try:
+            updated_place = facade.update_place(place_id, user_place)
+        except ValueError as e:
+            return {'error': f'Invalid input data: {str(e)}'}, 400
         if not updated_place:
             return {'error': 'Failed to update this place'}, 500
-        return {'id': updated_place.id, 'title': updated_place.title, 'description': updated_place.description, 'price': updated_place.price, 'latitude': updated_place.latitude, 'longitude' : updated_place.longitude}, 200
\ No newline at end of file
+        return serializers.dump(updated_place, PLACE_ADMIN_WRITE_FIELDS), 200
\ No newline at end of file
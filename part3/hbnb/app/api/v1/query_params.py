@@ -0,0 +1,21 @@
+from flask import request
+from app.serialization import serializers
+
+
+def parse_csv_arg(name):
+    """Split a comma separated query argument into a list of non-empty values."""
+    return [value.strip() for value in request.args.get(name, '').split(',') if value.strip()]
+
+
+def parse_expand(allowed):
+    """Return the requested ?expand= relations, raising ValueError on unknown ones."""
+    expand = set(parse_csv_arg('expand'))
+    unknown = expand - set(allowed)
+    if unknown:
+        raise ValueError(f"Cannot expand {', '.join(sorted(unknown))}; expected one of: {', '.join(allowed)}")
+    return expand
+
+
+def parse_fields(model):
+    """Return the ?fields= selection for model (None: its default fields), raising ValueError on unknown ones."""
+    return serializers.select(model, parse_csv_arg('fields'))
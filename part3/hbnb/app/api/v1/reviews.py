@@ -1,7 +1,12 @@
+from flask import request
 from flask_restx import Namespace, Resource, fields
 from app.services import facade
 from flask_jwt_extended import get_jwt, jwt_required, get_jwt_identity
 from app.services.facade import HBnBFacade
+from app.persistence.pagination import clamp_limit
+from app.api.v1.query_params import parse_expand, parse_fields
+from app.models.review import Review
+from app.serialization import serializers
 
 facade = HBnBFacade()
 
@@ -13,6 +18,18 @@ review_model = api.model('Review', {
 })
 
 
+# Fields of the author embedded with ?expand=author
+AUTHOR_FIELDS = ('id', 'first_name', 'last_name')
+
+
+def review_to_dict(review, fields=None, expand_author=False):
+    """Representation of a review, optionally embedding its author"""
+    review_dict = serializers.dump(review, fields)
+    if expand_author:
+        review_dict['author'] = serializers.dump(review.author, AUTHOR_FIELDS)
+    return review_dict
+
+
 @api.route('/')
 class ReviewList(Resource):
     @api.expect(review_model)
@@ -25,18 +42,15 @@ class ReviewList(Resource):
         """Register a new review"""
         review_data = api.payload
         current_user_id = get_jwt_identity()  # Get user ID from JWT
-        place = facade.get_place(review_data['place_id'])
-        user = facade.get_user_by_id(current_user_id)
-        if not user:
+        user_exists, owner_id, reviewed = facade.get_review_context(current_user_id, review_data['place_id'])
+        if not user_exists:
             return {'error': 'User not found'}, 404
-        if not place:
+        if owner_id is None:
             return {'error': 'Place not found'}, 404
-        if place['place']['user_id'] == current_user_id:
+        if owner_id == current_user_id:
             return {'error': 'You cannot review your own place'}, 400
-        place_reviews = facade.get_reviews_by_place(review_data['place_id'])
-        for existing_review in place_reviews:
-            if existing_review.user_id == current_user_id:
-                return {'error': 'You have already reviewed this place'}, 400
+        if reviewed:
+            return {'error': 'You have already reviewed this place'}, 400
         try:
             new_review = facade.create_review({
                 'text': review_data['text'],
@@ -44,24 +58,24 @@ class ReviewList(Resource):
                 'user_id': current_user_id,
                 'place_id': review_data['place_id']
             })
-            return {
-                'id': new_review.id,
-                'text': new_review.text,
-                'rating': new_review.rating,
-                'user_id': new_review.user_id,
-                'place_id': new_review.place_id
-            }, 201
+            return serializers.dump(new_review), 201
         except ValueError as e:
             return {'error': f'Invalid input data: {str(e)}'}, 400
     
+    @api.doc(params={'fields': 'Comma separated fields to return instead of the default ones'})
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid fields parameter')
     @api.response(404, 'No reviews found')
     def get(self):
         """Retrieve a list of all reviews"""
-        reviews = facade.get_all_reviews()
+        try:
+            fields = parse_fields(Review)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        reviews = facade.get_all_reviews(fields)
         if not reviews:
             return {'error': 'No reviews found'}, 404
-        return [{'id': review.id, 'text': review.text, 'rating': review.rating, 'user_id': review.user_id, 'place_id': review.place_id} for review in reviews], 200
+        return serializers.dump_many(reviews, fields), 200
 
 
 @api.route('/<review_id>')
@@ -73,7 +87,7 @@ class ReviewResource(Resource):
         review = facade.get_review(review_id)
         if not review:
             return {'error': 'Review not found'}, 404
-        return {'id': review.id, 'text': review.text, 'rating': review.rating, 'user_id': review.user_id, 'place_id': review.place_id}, 200
+        return serializers.dump(review), 200
    
     @api.expect(review_model)
     @api.response(200, 'Review updated successfully')
@@ -90,15 +104,16 @@ class ReviewResource(Resource):
         if review.user_id != current_user:
             return {'error': 'Unauthorized action'}, 403
         review_data = api.payload
-        review.text = review_data.get('text', review.text)
-        review.rating = review_data.get('rating', review.rating)
-        updated_review = facade.update_review(review.id, {
-            'text': review.text,
-            'rating': review.rating,
-        })
+        try:
+            updated_review = facade.update_review(review.id, {
+                'text': review_data.get('text', review.text),
+                'rating': review_data.get('rating', review.rating),
+            })
+        except ValueError as e:
+            return {'error': f'Invalid input data: {str(e)}'}, 400
         if not updated_review:
             return {'error': 'Failed to update this review'}, 500
-        return {'id': review.id, 'text': review.text, 'rating': review.rating, 'user_id': review.user_id, 'place_id': review.place_id}, 200
+        return serializers.dump(updated_review), 200
    
     @api.response(200, 'Review deleted successfully')
     @api.response(404, 'Review not found')
@@ -115,23 +130,42 @@ class ReviewResource(Resource):
         if review.user_id != current_user_id and not claims.get('is_admin'):
             return {'error': 'Unauthorized action'}, 403
         deleted_review = facade.delete_review(review_id)
-        if deleted_review:
+        if not deleted_review:
             return {'error': 'Failed to delete this review'}, 500
         return {'message': 'Review deleted successfully'}, 200
     
 @api.route('/places/<place_id>/reviews')
 class PlaceReviewList(Resource):
+    @api.doc(params={
+        'limit': 'Maximum number of reviews to return',
+        'cursor': 'Cursor returned in the X-Next-Cursor header of the previous page',
+        'expand': 'author: embed the id, first_name and last_name of each author',
+        'fields': 'Comma separated review fields to return instead of the default ones'
+    })
     @api.response(200, 'List of reviews retrieved successfully')
+    @api.response(400, 'Invalid query parameters')
     @api.response(404, 'No reviews found for this place')
     def get(self, place_id):
-        """Retrieve all reviews for a specific place"""
+        """Retrieve a page of reviews for a specific place"""
         place = facade.get_place(place_id)
         if not place:
             return {'error': 'Place not found'}, 404
-        reviews = facade.get_reviews_by_place(place_id)
+        try:
+            expand = parse_expand(('author',))
+            fields = parse_fields(Review)
+            reviews, next_cursor = facade.get_reviews_page_by_place(
+                place_id,
+                clamp_limit(request.args.get('limit', type=int)),
+                cursor=request.args.get('cursor'),
+                expand_author='author' in expand,
+                fields=fields
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
         if not reviews:
             return {'error': 'No reviews found for this place'}, 404
-        return [{'id': review.id, 'text': review.text, 'rating': review.rating, 'user_id': review.user_id, 'place_id': review.place_id} for review in reviews], 200
+        headers = {'X-Next-Cursor': next_cursor} if next_cursor else {}
+        return [review_to_dict(review, fields, 'author' in expand) for review in reviews], 200, headers
 
     @api.expect(review_model)
     @api.response(201, 'Review successfully created')
@@ -143,20 +177,16 @@ class PlaceReviewList(Resource):
         """Post a new review for a place"""
         review_data = api.payload
         current_user_id = get_jwt_identity()  # Get user ID from JWT
-        place = facade.get_place(place_id)  # Get place by place_id
-        user = facade.get_user_by_id(current_user_id)
+        user_exists, owner_id, reviewed = facade.get_review_context(current_user_id, place_id)
         
-        if not user:
+        if not user_exists:
             return {'error': 'User not found'}, 404
-        if not place:
+        if owner_id is None:
             return {'error': 'Place not found'}, 404
-        if place['place']['user_id'] == current_user_id:
+        if owner_id == current_user_id:
             return {'error': 'You cannot review your own place'}, 400
-        
-        place_reviews = facade.get_reviews_by_place(place_id)
-        for existing_review in place_reviews:
-            if existing_review.user_id == current_user_id:
-                return {'error': 'You have already reviewed this place'}, 400
+        if reviewed:
+            return {'error': 'You have already reviewed this place'}, 400
         
         try:
             new_review = facade.create_review({
@@ -165,12 +195,6 @@ class PlaceReviewList(Resource):
                 'user_id': current_user_id,
                 'place_id': place_id  # Link the review to the place using place_id
             })
-            return {
-                'id': new_review.id,
-                'text': new_review.text,
-                'rating': new_review.rating,
-                'user_id': new_review.user_id,
-                'place_id': new_review.place_id
-            }, 201
+            return serializers.dump(new_review), 201
         except ValueError as e:
             return {'error': f'Invalid input data: {str(e)}'}, 400
\ No newline at end of file
@@ -0,0 +1,41 @@
+from flask import current_app, request
+from flask_restx import Namespace, Resource
+from app.services.facade import HBnBFacade
+from app.persistence.pagination import clamp_limit
+from app.api.v1.query_params import parse_fields
+from app.models.place import Place
+from app.serialization import serializers
+
+facade = HBnBFacade()
+api = Namespace('search', description='Full-text search')
+
+
+@api.route('/')
+class PlaceSearch(Resource):
+    @api.doc(params={
+        'q': 'Words to look for in place titles, descriptions and reviews; end with * to match the last one as a prefix',
+        'limit': 'Maximum number of places to return',
+        'offset': 'Number of ranked results to skip',
+        'fields': 'Comma separated fields to return instead of the default ones'
+    })
+    @api.response(200, 'Places ranked by relevance')
+    @api.response(400, 'Invalid query parameters')
+    def get(self):
+        """Search places, best match first"""
+        args = request.args
+        query = args.get('q', '').strip()
+        if not query:
+            return {'error': 'Query parameter q is required'}, 400
+        limit = clamp_limit(args.get('limit', type=int))
+        offset = args.get('offset', 0, type=int)
+        max_results = current_app.config.get('SEARCH_MAX_RESULTS', 1000)
+        if not 0 <= offset <= max_results - limit:
+            return {'error': f'offset must be between 0 and {max_results - limit}'}, 400
+
+        try:
+            fields = parse_fields(Place)
+            results = facade.search_places(query, limit, offset)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        serialize = serializers.serializer(Place, fields)
+        return [dict(serialize(place), score=round(score, 4)) for place, score in results], 200
@@ -0,0 +1,19 @@
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import get_jwt, jwt_required
+from app.services.cache import cache
+from app.services.jwt_cache import token_cache
+
+api = Namespace('stats', description='Runtime statistics')
+
+
+@api.route('/cache')
+class CacheStats(Resource):
+    @api.response(200, 'Cache statistics retrieved successfully')
+    @api.response(403, 'Admin privileges required')
+    @jwt_required()
+    def get(self):
+        """Retrieve hit/miss counters of the facade and token caches"""
+        claims = get_jwt()
+        if not claims.get('is_admin'):
+            return {'error': 'Admin privileges required'}, 403
+        return dict(cache.stats(), tokens=token_cache.stats()), 200
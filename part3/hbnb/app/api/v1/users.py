@@ -1,10 +1,16 @@
 from flask_restx import Namespace, Resource, fields
 from app.services.facade import HBnBFacade
+from app.services.passwords import PasswordHasherBusy, busy_response
 from flask_jwt_extended import get_jwt, jwt_required, get_jwt_identity
 from flask import request
-from app import bcrypt  # Make sure bcrypt is imported 
 from app.services.facade import HBnBFacade
 from sqlalchemy.orm import joinedload
+from app.api.v1.conditional import conditional, precondition_failed
+from app.api.v1.batch import MAX_BATCH_IDS, batch_response, parse_ids
+from app.api.v1.query_params import parse_fields
+from app.models.user import User
+from app.serialization import serializers
+from app.services.rate_limit import rate_limit
 
 api = Namespace('users', description='User operations')
 
@@ -31,6 +37,8 @@ class UserList(Resource):
     @api.response(201, 'User successfully created')
     @api.response(400, 'Email already registered')
     @api.response(400, 'Invalid input data')
+    @api.response(429, 'Too many registrations')
+    @rate_limit('register')
     def post(self):
         """Register a new user"""
         user_data = api.payload
@@ -42,42 +50,49 @@ class UserList(Resource):
             return {'error': 'Email already registered'}, 400
 
         try:
-            # Hash the password before saving
-            user_data['password'] = bcrypt.generate_password_hash(user_data['password']).decode('utf-8')
             new_user = facade.create_user(user_data)
 
-            return {
-                'id': new_user.id,
-                'first_name': new_user.first_name,
-                'last_name': new_user.last_name,
-                'email': new_user.email,
-                'is_admin': new_user.is_admin
-            }, 201
+            return serializers.dump(new_user), 201
         except ValueError:
             return {'error': 'Invalid input data'}, 400
+        except PasswordHasherBusy:
+            return busy_response()
 
+    @api.doc(params={
+        'fields': 'Comma separated fields to return instead of the default ones',
+        'ids': f'Comma separated user IDs (at most {MAX_BATCH_IDS}) to return instead of every user'
+    })
     @api.response(200, 'User details retrieved successfully')
+    @api.response(400, 'Invalid fields or ids parameter')
     @api.response(404, 'User not found')
     def get(self):
-        """Get all users"""
-        users = facade.get_all_users()
+        """Get all users, or those of ?ids= in one lookup"""
+        try:
+            fields = parse_fields(User)
+            ids = parse_ids()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if ids is not None:
+            return batch_response(ids, facade.get_users_by_ids(ids, fields), serializers.serializer(User, fields))
+        users = facade.get_all_users(fields)
         if not users:
             return {'error': 'No users found'}, 404
 
-        return [user.to_dict() for user in users], 200
+        return serializers.dump_many(users, fields), 200
 
 
 @api.route('/<user_id>')
 class UserResource(Resource):
     @api.response(200, 'User details retrieved successfully')
+    @api.response(304, 'User not modified')
     @api.response(404, 'User not found')
     def get(self, user_id):
         """Get user details by ID"""
-        user = facade.get_user(user_id)
-        if not user:
+        entry = facade.get_user_entry(user_id)
+        if not entry:
             return {'error': 'User not found'}, 404
 
-        return user.to_dict(), 200
+        return conditional(entry.value, entry.etag)
 # Instantiate the facade object
 facade = HBnBFacade()
 
@@ -88,6 +103,8 @@ class UserList(Resource):
     @api.response(201, 'User successfully created')
     @api.response(400, 'Email already registered')
     @api.response(400, 'Invalid input data')
+    @api.response(429, 'Too many registrations')
+    @rate_limit('register')
     def post(self):
         """Register a new user"""
         user_data = api.payload
@@ -99,58 +116,70 @@ class UserList(Resource):
             return {'error': 'Email already registered'}, 400
 
         try:
-            # Hash the password before saving
-            user_data['password'] = bcrypt.generate_password_hash(user_data['password']).decode('utf-8')
             new_user = facade.create_user(user_data)
 
-            return {
-                'id': new_user.id,
-                'first_name': new_user.first_name,
-                'last_name': new_user.last_name,
-                'email': new_user.email,
-                'is_admin': new_user.is_admin
-            }, 201
+            return serializers.dump(new_user), 201
         except ValueError:
             return {'error': 'Invalid input data'}, 400
+        except PasswordHasherBusy:
+            return busy_response()
 
+    @api.doc(params={
+        'fields': 'Comma separated fields to return instead of the default ones',
+        'ids': f'Comma separated user IDs (at most {MAX_BATCH_IDS}) to return instead of every user'
+    })
     @api.response(200, 'User details retrieved successfully')
+    @api.response(400, 'Invalid fields or ids parameter')
     @api.response(404, 'User not found')
     def get(self):
-        """Get all users"""
-        users = facade.get_all_users()
+        """Get all users, or those of ?ids= in one lookup"""
+        try:
+            fields = parse_fields(User)
+            ids = parse_ids()
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        if ids is not None:
+            return batch_response(ids, facade.get_users_by_ids(ids, fields), serializers.serializer(User, fields))
+        users = facade.get_all_users(fields)
         if not users:
             return {'error': 'No users found'}, 404
 
-        return [user.to_dict() for user in users], 200
+        return serializers.dump_many(users, fields), 200
 
 
 @api.route('/<user_id>')
 class UserResource(Resource):
     @api.response(200, 'User details retrieved successfully')
+    @api.response(304, 'User not modified')
     @api.response(404, 'User not found')
     def get(self, user_id):
         """Get user details by ID"""
-        user = facade.get_user(user_id)
-        if not user:
+        entry = facade.get_user_entry(user_id)
+        if not entry:
             return {'error': 'User not found'}, 404
 
-        return user.to_dict(), 200
+        return conditional(entry.value, entry.etag)
 
     @api.response(200, 'User details updated successfully')
     @api.response(400, 'You cannot modify email or password')
     @api.response(403, 'Unauthorized action')
     @api.response(404, 'User not found')
+    @api.response(412, 'If-Match does not match the current ETag')
     @api.response(500, 'Internal server error')
     @jwt_required()
     def put(self, user_id):
         """Update user details"""
-        user = facade.get_user(user_id)
+        # With If-Match, lock the row so nobody changes it between the check and the update
+        entry = facade.get_user_entry(user_id, for_update=bool(request.if_match))
         current_user_id = get_jwt_identity()
-        if not user:
+        if not entry:
             return {'error': 'User not found'}, 404
 
         if current_user_id != user_id:
             return {'error': 'Unauthorized action'}, 403
+        failed = precondition_failed(entry.etag)
+        if failed:
+            return failed
 
         user_data = api.payload
         if 'email' in user_data or 'password' in user_data:
@@ -165,6 +194,7 @@ class UserResource(Resource):
 
 @api.route('/admin')
 class AdminUserCreate(Resource):
+    @rate_limit('register')
     @jwt_required()
     def post(self):
         current_user = get_jwt_identity()
@@ -180,12 +210,13 @@ class AdminUserCreate(Resource):
 
         try:
             user_data['is_admin'] = True
-            user_data['password'] = bcrypt.generate_password_hash(user_data['password']).decode('utf-8')
             new_user = facade.create_user(user_data)
 
             return new_user.to_dict(), 201
         except ValueError:
             return {'error': 'Invalid input data'}, 400
+        except PasswordHasherBusy:
+            return busy_response()
 
 
 @api.route('/admin/<user_id>')
@@ -0,0 +1,39 @@
+import click
+from flask.cli import AppGroup
+
+hbnb_cli = AppGroup('hbnb', help='HBnB maintenance commands.')
+
+
+@hbnb_cli.command('reconcile-ratings')
+def reconcile_ratings():
+    """Backfill and repair per-place rating aggregates from the reviews table."""
+    from app.services.facade import HBnBFacade
+    fixed = HBnBFacade().reconcile_rating_stats()
+    click.echo(f'Reconciled rating aggregates: {fixed} place(s) updated')
+
+
+@hbnb_cli.command('reindex-search')
+def reindex_search():
+    """Rebuild the full-text search index of places from places and reviews."""
+    from app import db
+    from app.services.search import search_index
+    search_index.create_schema()
+    indexed = search_index.rebuild()
+    db.session.commit()
+    click.echo(f'Indexed {indexed} place(s) for search')
+
+
+@hbnb_cli.command('import')
+@click.argument('source', type=click.File('rb'))
+@click.option('--batch-size', type=int, default=None, help='Records per insert batch.')
+@click.option('--owner', default=None, help='Owner user ID for places without user_id.')
+def import_records(source, batch_size, owner):
+    """Stream amenities, places and reviews from an NDJSON file (- for stdin)."""
+    from flask import current_app
+    from app.services.bulk_import import BulkImporter
+    importer = BulkImporter(batch_size or current_app.config['BULK_IMPORT_BATCH_SIZE'])
+    report = importer.run(source, default_user_id=owner)
+    for error in report['errors']:
+        click.echo(f"line {error['line']}: {error['error']}", err=True)
+    imported = ', '.join(f'{count} {record_type}(s)' for record_type, count in report['imported'].items())
+    click.echo(f"Imported {imported}; {report['failed']} line(s) failed")
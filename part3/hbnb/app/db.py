@@ -1,5 +1,109 @@
 # app/db.py
+import random
+from contextlib import contextmanager
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+# Bind keys of the read replicas: replica_0, replica_1, ...
+REPLICA_BIND_PREFIX = 'replica_'
+
+# Pool options only QueuePool accepts
+QUEUE_POOL_OPTIONS = ('pool_size', 'max_overflow', 'pool_timeout', 'pool_use_lifo')
+
+
+class RoutingSession(Session):
+    """Session sending plain SELECTs to a read replica and everything else to the primary.
+
+    Each session picks one replica for its lifetime, so a request reads a
+    consistent snapshot. Locking reads (FOR UPDATE), textual SQL, flushes
+    and bulk operations go to the primary, and once anything but a plain
+    SELECT has, the session sticks to the primary for all later reads: a
+    request reads its own writes, committed or not, until the session is
+    removed at the end of the request. Write requests stick to it from the
+    start (see stick_to_primary). Without replicas configured this behaves
+    like the default session.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._reads_from_replica(clause):
+                replica = self._replica()
+                if replica is not None:
+                    return replica
+            else:
+                self.info['sticky_primary'] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _reads_from_replica(self, clause):
+        return (getattr(clause, 'is_select', False) and getattr(clause, '_for_update_arg', None) is None
+                and not self._flushing and not self.info.get('sticky_primary')
+                and not self.info.get('reading_primary'))
+
+    def _replica(self):
+        if 'replica' not in self.info:
+            keys = [key for key in self._db.engines if key and key.startswith(REPLICA_BIND_PREFIX)]
+            self.info['replica'] = random.choice(keys) if keys else None
+        key = self.info['replica']
+        return self._db.engines[key] if key is not None else None
+
+
+def stick_to_primary():
+    """Send every later statement of db.session to the primary, until the session is removed.
+
+    For units of work that write: the rows they read and then change must
+    be the current ones.
+    """
+    db.session.info['sticky_primary'] = True
+
+
+@contextmanager
+def reading_primary():
+    """Send the reads of db.session to the primary while the block runs.
+
+    For reads whose result outlives the request, such as cache fills: a
+    lagging replica would keep serving the state before the last write.
+    """
+    info = db.session.info
+    previous = info.get('reading_primary', False)
+    info['reading_primary'] = True
+    try:
+        yield
+    finally:
+        info['reading_primary'] = previous
+
+
+def configure_replicas(app):
+    """Register SQLALCHEMY_REPLICA_URIS as the replica_<n> binds of the app.
+
+    The primary and every replica get the DB_POOL_OPTIONS their pool accepts.
+    """
+    pool_options = app.config.get('DB_POOL_OPTIONS') or {}
+    primary = app.config.get('SQLALCHEMY_DATABASE_URI')
+    if primary is not None:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = dict(
+            engine_options(primary, pool_options), **(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}))
+    binds = dict(app.config.get('SQLALCHEMY_BINDS') or {})
+    for index, url in enumerate(app.config.get('SQLALCHEMY_REPLICA_URIS') or ()):
+        binds[f'{REPLICA_BIND_PREFIX}{index}'] = dict(engine_options(url, pool_options), url=url)
+    app.config['SQLALCHEMY_BINDS'] = binds
+
+
+def engine_options(url, options):
+    """Return options without the QueuePool-only keys if the engine on url will not use a QueuePool.
+
+    That is the case of an explicit other poolclass, and of in-memory SQLite,
+    which Flask-SQLAlchemy serves from a StaticPool.
+    """
+    url = make_url(url)
+    poolclass = options.get('poolclass')
+    in_memory = url.get_backend_name() == 'sqlite' and (
+        url.database in (None, '', ':memory:') or url.query.get('mode') == 'memory')
+    if in_memory or (poolclass is not None and not issubclass(poolclass, QueuePool)):
+        return {key: value for key, value in options.items() if key not in QUEUE_POOL_OPTIONS}
+    return dict(options)
+
 
 # Initialize the SQLAlchemy object
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
@@ -0,0 +1,192 @@
+"""
+Per-route SQL, serialization and latency instrumentation
+"""
+import logging
+import threading
+import time
+from flask import Response, g, has_request_context, request
+from flask_restx.representations import output_json
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class MetricsRegistry:
+    """Thread-safe accumulator of per-route request metrics."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._requests = {}
+            self._routes = {}
+
+    def observe(self, method, route, status, total, sql_count, sql_time, serialize_time):
+        """Record one finished request."""
+        with self._lock:
+            key = (method, route, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            stats = self._routes.get((method, route))
+            if stats is None:
+                stats = self._routes[(method, route)] = {
+                    'count': 0, 'latency_sum': 0.0, 'buckets': [0] * len(LATENCY_BUCKETS),
+                    'sql_count': 0, 'sql_time': 0.0, 'serialize_time': 0.0
+                }
+            stats['count'] += 1
+            stats['latency_sum'] += total
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if total <= bound:
+                    stats['buckets'][i] += 1
+            stats['sql_count'] += sql_count
+            stats['sql_time'] += sql_time
+            stats['serialize_time'] += serialize_time
+
+    def snapshot(self):
+        """Return a copy of the per-route statistics keyed by (method, route)."""
+        with self._lock:
+            return {key: dict(stats, buckets=list(stats['buckets'])) for key, stats in self._routes.items()}
+
+    def render_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        from app.services.cache import cache
+        from app.services.jwt_cache import token_cache
+
+        with self._lock:
+            requests = dict(self._requests)
+            routes = {key: dict(stats, buckets=list(stats['buckets'])) for key, stats in self._routes.items()}
+
+        lines = [
+            '# HELP hbnb_http_requests_total Requests handled, by route and status.',
+            '# TYPE hbnb_http_requests_total counter'
+        ]
+        for (method, route, status), count in sorted(requests.items()):
+            lines.append(f'hbnb_http_requests_total{_labels(method=method, route=route, status=status)} {count}')
+
+        lines += [
+            '# HELP hbnb_http_request_duration_seconds Request latency, by route.',
+            '# TYPE hbnb_http_request_duration_seconds histogram'
+        ]
+        for (method, route), stats in sorted(routes.items()):
+            for bound, count in zip(LATENCY_BUCKETS, stats['buckets']):
+                labels = _labels(method=method, route=route, le=repr(bound))
+                lines.append(f'hbnb_http_request_duration_seconds_bucket{labels} {count}')
+            labels = _labels(method=method, route=route)
+            inf_labels = _labels(method=method, route=route, le='+Inf')
+            lines.append(f'hbnb_http_request_duration_seconds_bucket{inf_labels} {stats["count"]}')
+            lines.append(f'hbnb_http_request_duration_seconds_sum{labels} {stats["latency_sum"]}')
+            lines.append(f'hbnb_http_request_duration_seconds_count{labels} {stats["count"]}')
+
+        for name, key, help_text in (
+            ('hbnb_sql_queries_total', 'sql_count', 'SQL statements executed, by route.'),
+            ('hbnb_sql_duration_seconds_total', 'sql_time', 'Time spent in SQL statements, by route.'),
+            ('hbnb_serialization_seconds_total', 'serialize_time', 'Time spent encoding responses, by route.')
+        ):
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+            for (method, route), stats in sorted(routes.items()):
+                lines.append(f'{name}{_labels(method=method, route=route)} {stats[key]}')
+
+        lines += [
+            '# HELP hbnb_cache_lookups_total Cache lookups, by cache and result.',
+            '# TYPE hbnb_cache_lookups_total counter'
+        ]
+        caches = dict(cache.stats()['by_prefix'], jwt=token_cache.stats())
+        for name, cache_stats in sorted(caches.items()):
+            lines.append(f'hbnb_cache_lookups_total{_labels(cache=name, result="hit")} {cache_stats["hits"]}')
+            lines.append(f'hbnb_cache_lookups_total{_labels(cache=name, result="miss")} {cache_stats["misses"]}')
+        lines += [
+            '# HELP hbnb_cache_shared_lookups_total Lookups served stale during a reload or by a concurrent load.',
+            '# TYPE hbnb_cache_shared_lookups_total counter'
+        ]
+        for name, cache_stats in sorted(cache.stats()['by_prefix'].items()):
+            for kind in ('stale', 'coalesced'):
+                lines.append(f'hbnb_cache_shared_lookups_total{_labels(cache=name, kind=kind)} {cache_stats[kind]}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+metrics = MetricsRegistry()
+
+
+# The start time lives on the statement's execution context, which is
+# discarded with it when the statement fails
+@event.listens_for(Engine, 'before_cursor_execute')
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_start = time.perf_counter()
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, '_query_start', None)
+    if start is None or not has_request_context() or 'request_metrics' not in g:
+        return
+    elapsed = time.perf_counter() - start
+    request_metrics = g.request_metrics
+    request_metrics['sql_count'] += 1
+    request_metrics['sql_time'] += elapsed
+    if elapsed * 1000 >= request_metrics['slow_query_ms']:
+        logger.warning('Slow query (%.1f ms) on %s %s: %s',
+                       elapsed * 1000, request.method, _route(), statement)
+
+
+def _route():
+    return request.url_rule.rule if request.url_rule else 'unmatched'
+
+
+def init_app(app, api):
+    """Hook request timing, SQL counting and the /metrics endpoint into the app."""
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+
+    @app.before_request
+    def start_request_metrics():
+        g.request_metrics = {
+            'start': time.perf_counter(),
+            'sql_count': 0,
+            'sql_time': 0.0,
+            'serialize_time': 0.0,
+            'slow_query_ms': app.config.get('SLOW_QUERY_THRESHOLD_MS', 100)
+        }
+
+    @app.after_request
+    def record_request_metrics(response):
+        request_metrics = g.pop('request_metrics', None)
+        if request_metrics is None or request.path == '/metrics':
+            return response
+        total = time.perf_counter() - request_metrics['start']
+        metrics.observe(request.method, _route(), response.status_code, total,
+                        request_metrics['sql_count'], request_metrics['sql_time'],
+                        request_metrics['serialize_time'])
+        response.headers['Server-Timing'] = (
+            f'sql;dur={request_metrics["sql_time"] * 1000:.2f};desc="{request_metrics["sql_count"]} queries", '
+            f'ser;dur={request_metrics["serialize_time"] * 1000:.2f}, '
+            f'total;dur={total * 1000:.2f}'
+        )
+        return response
+
+    # Time whichever encoder is installed (see serialization.init_app)
+    encode_json = api.representations.get('application/json', output_json)
+
+    @api.representation('application/json')
+    def timed_output_json(data, code, headers=None):
+        start = time.perf_counter()
+        response = encode_json(data, code, headers)
+        if 'request_metrics' in g:
+            g.request_metrics['serialize_time'] += time.perf_counter() - start
+        return response
+
+    @app.route('/metrics')
+    def prometheus_metrics():
+        return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
@@ -1,14 +1,15 @@
-import uuid
 from app import db
-from .base_model import BaseModel  # Inherit from BaseModel
+from .base_model import InternalKeyModel
+from app.serialization import serializers
 
-class Amenity(BaseModel):  # Inherit from BaseModel
+class Amenity(InternalKeyModel):  # Integer primary key, public UUID id
     __tablename__ = 'amenities'
 
-    # UUID primary key
-    id = db.Column(db.String(36), primary_key=True, default=str(uuid.uuid4), unique=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(512))
 
     def __repr__(self):
         return f'<Amenity {self.name}>'
+
+
+serializers.register(Amenity, ('id', 'name', 'description'), private=('pk',))
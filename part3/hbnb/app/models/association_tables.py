@@ -1,8 +1,13 @@
 from app import db
+from app.models.base_model import InternalKey
 
-# Association Table for Many-to-Many Relationship between Place and Amenity
+# Association Table for Many-to-Many Relationship between Place and Amenity, on the internal integer keys
 place_amenity_association = db.Table(
     'place_amenity', db.Model.metadata,
-    db.Column('place_id', db.String(36), db.ForeignKey('places.id'), primary_key=True),
-    db.Column('amenity_id', db.String(36), db.ForeignKey('amenities.id'), primary_key=True)
+    db.Column('place_pk', InternalKey, db.ForeignKey('places.pk'), primary_key=True),
+    db.Column('amenity_pk', InternalKey, db.ForeignKey('amenities.pk'), primary_key=True),
+    # The primary key does not serve lookups by amenity
+    db.Index('ix_place_amenity_amenity_pk', 'amenity_pk'),
+    # On SQLite the rows are stored in the primary key itself instead of a rowid table plus its index
+    sqlite_with_rowid=False
 )
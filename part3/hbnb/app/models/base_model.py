@@ -1,14 +1,22 @@
 from app import db
-import uuid
+from app.models.ids import new_id
 from datetime import datetime, timezone
 
 
 class BaseModel(db.Model):
     __abstract__ = True
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
-    updated_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
+    id = db.Column(db.String(36), primary_key=True, default=new_id)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
+
+    # Columns never exposed outside the database (exports, serializers)
+    internal_columns = ()
+
+    @classmethod
+    def public_columns(cls):
+        """Table columns without the internal ones."""
+        return [column for column in cls.__table__.c if column.name not in cls.internal_columns]
 
     def save(self):
         """Update the updated_at timestamp whenever the object is modified"""
@@ -20,3 +28,23 @@ class BaseModel(db.Model):
             if hasattr(self, key):
                 setattr(self, key, value)
         self.save()
+
+
+# BIGINT, but INTEGER on SQLite where only INTEGER PRIMARY KEY is an auto-incremented rowid alias
+InternalKey = db.BigInteger().with_variant(db.Integer(), 'sqlite')
+
+
+class InternalKeyModel(BaseModel):
+    """BaseModel keyed by a compact auto-incremented integer.
+
+    id stays the public identifier, unique but no longer the primary key.
+    Association tables reference pk: 8 bytes per key instead of 36
+    characters, so their indexes are several times smaller and joins
+    compare integers. pk never leaves the database.
+    """
+    __abstract__ = True
+
+    internal_columns = ('pk',)
+
+    pk = db.Column(InternalKey, primary_key=True)
+    id = db.Column(db.String(36), unique=True, nullable=False, default=new_id)
@@ -0,0 +1,109 @@
+"""
+Geohash helpers used to index and search places by location
+"""
+import math
+
+GEOHASH_PRECISION = 9
+MAX_COVER_CELLS = 16
+EARTH_RADIUS_KM = 6371.0088
+# Largest radius a nearby search may ask for
+MAX_RADIUS_KM = 500
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+
+def encode_geohash(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate as a geohash string of the given precision."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def cell_size(precision):
+    """Return the (height, width) in degrees of a geohash cell."""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def _cell_span(min_value, max_value, origin, step):
+    """Return the first and last cell index covering [min_value, max_value]."""
+    first = int((min_value - origin) // step)
+    last = int((max_value - origin) // step)
+    return first, last
+
+
+def cover_bbox(min_lat, min_lon, max_lat, max_lon, max_cells=MAX_COVER_CELLS):
+    """Return geohash prefixes whose cells together cover the bounding box.
+
+    The finest precision producing at most max_cells cells is used, so the
+    prefixes map to a handful of index range scans.
+    """
+    best = None
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        height, width = cell_size(precision)
+        lat_first, lat_last = _cell_span(min_lat, min(max_lat, 90.0 - height / 2), -90.0, height)
+        lon_first, lon_last = _cell_span(min_lon, min(max_lon, 180.0 - width / 2), -180.0, width)
+        if (lat_last - lat_first + 1) * (lon_last - lon_first + 1) > max_cells:
+            break
+        best = (precision, height, width, lat_first, lat_last, lon_first, lon_last)
+
+    if best is None:
+        return ['']
+    precision, height, width, lat_first, lat_last, lon_first, lon_last = best
+    return sorted({
+        encode_geohash(-90.0 + (i + 0.5) * height, -180.0 + (j + 0.5) * width, precision)
+        for i in range(lat_first, lat_last + 1)
+        for j in range(lon_first, lon_last + 1)
+    })
+
+
+def radius_bboxes(latitude, longitude, radius_km):
+    """Return the bounding boxes enclosing a circle, split at the antimeridian."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat = max(latitude - dlat, -90.0)
+    max_lat = min(latitude + dlat, 90.0)
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if min_lat <= -90.0 or max_lat >= 90.0 or cos_lat <= 0:
+        return [(min_lat, -180.0, max_lat, 180.0)]
+    dlon = math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat))
+    if dlon >= 180.0:
+        return [(min_lat, -180.0, max_lat, 180.0)]
+
+    min_lon = longitude - dlon
+    max_lon = longitude + dlon
+    if min_lon < -180.0:
+        return [(min_lat, min_lon + 360.0, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+    if max_lon > 180.0:
+        return [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon - 360.0)]
+    return [(min_lat, min_lon, max_lat, max_lon)]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two coordinates in kilometers."""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = phi2 - phi1
+    dlmb = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlmb / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
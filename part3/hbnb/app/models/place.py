@@ -2,20 +2,32 @@
 """
 This module contains a class Place
 """
-from .base_model import BaseModel
+from .base_model import InternalKeyModel
 from app import db
 from app.models.association_tables import place_amenity_association
+from app.models.geo import encode_geohash, GEOHASH_PRECISION
+from app.models.place_rating_stats import PlaceRatingStats
+from app.serialization import serializers
 
-class Place(BaseModel):
+class Place(InternalKeyModel):
     """Represents a place that can be rented in the HbnB app"""
     __tablename__ = 'places'
+    # Keyset pages ordered by (created_at, id) or (price, id); created_at comes from BaseModel
+    __table_args__ = (
+        db.Index('ix_places_created_at', 'created_at', 'id'),
+        db.Index('ix_places_price', 'price', 'id'),
+        # Exports of the places updated since a given time
+        db.Index('ix_places_updated_at', 'updated_at'),
+    )
 
     title = db.Column(db.String(50), nullable=False)
     description = db.Column(db.String(500), nullable=False)
     price = db.Column(db.Float, nullable=False)
     latitude = db.Column(db.Float, nullable=False)
     longitude = db.Column(db.Float, nullable=False)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+    # Geohash of (latitude, longitude), indexed for radius/bounding-box search
+    geohash = db.Column(db.String(GEOHASH_PRECISION), index=True)
     review_list = db.relationship('Review', backref='reviewed_place', lazy=True)
     
     # One-to-many relationship with Review
@@ -24,6 +36,9 @@ class Place(BaseModel):
     # Many-to-many relationship with Amenity
     associated_amenities = db.relationship('Amenity', secondary=place_amenity_association, backref='places_associated')
 
+    # Review aggregates, one row per reviewed place
+    rating_stats = db.relationship('PlaceRatingStats', uselist=False, lazy='selectin', cascade='all, delete-orphan')
+
     def __init__(self, title, description, price, latitude, longitude, user_id):
         super().__init__()
         self.title = title
@@ -33,6 +48,7 @@ class Place(BaseModel):
         self.longitude = longitude
         self.user_id = user_id 
         self.validate_place()
+        self.refresh_geohash()
 
     def validate_place(self):
         """Validate place information format"""
@@ -45,6 +61,10 @@ class Place(BaseModel):
         if (not self.longitude) or self.longitude < -180 or self.longitude > 180:
             raise ValueError("Longitude must be between -180 and 180")
 
+    def refresh_geohash(self):
+        """Recompute the geohash after latitude or longitude changed."""
+        self.geohash = encode_geohash(self.latitude, self.longitude)
+
     # Add a review to the place
     def add_review(self, review):
         """Add a review to the place."""
@@ -57,6 +77,12 @@ class Place(BaseModel):
          self.associated_amenities.append(amenity)
 
 
+    def rating_dict(self):
+        """Dictionary of the review aggregates of the place."""
+        if self.rating_stats is None:
+            return PlaceRatingStats.empty_dict()
+        return self.rating_stats.to_dict()
+
     # Returns the place information as a dictionary
     def list_by_place(self):
         """Dictionary of details for place."""
@@ -68,3 +94,14 @@ class Place(BaseModel):
             "longitude": self.longitude
         }
         return place_info
+
+
+serializers.register(
+    Place,
+    ('id', 'title', 'description', 'price', 'latitude', 'longitude', 'associated_amenities', 'rating'),
+    computed={
+        'associated_amenities': lambda place: [amenity.id for amenity in place.associated_amenities],
+        'rating': Place.rating_dict
+    },
+    private=('pk', 'geohash')
+)
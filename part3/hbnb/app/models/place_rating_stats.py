@@ -0,0 +1,46 @@
+"""
+This module contains a class PlaceRatingStats
+"""
+from app import db
+
+RATING_VALUES = (1, 2, 3, 4, 5)
+
+
+class PlaceRatingStats(db.Model):
+    """Denormalized review aggregates of a place, maintained incrementally"""
+    __tablename__ = 'place_rating_stats'
+
+    place_id = db.Column(db.String(36), db.ForeignKey('places.id'), primary_key=True)
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    average = db.Column(db.Float, index=True)
+    # Histogram: number of reviews per rating value
+    rating_1 = db.Column(db.Integer, nullable=False, default=0)
+    rating_2 = db.Column(db.Integer, nullable=False, default=0)
+    rating_3 = db.Column(db.Integer, nullable=False, default=0)
+    rating_4 = db.Column(db.Integer, nullable=False, default=0)
+    rating_5 = db.Column(db.Integer, nullable=False, default=0)
+
+    @staticmethod
+    def histogram_column(rating):
+        """Return the histogram column counting reviews with this rating."""
+        if rating not in RATING_VALUES:
+            raise ValueError("Rating must be between 1 and 5")
+        return getattr(PlaceRatingStats, f'rating_{rating}')
+
+    def to_dict(self):
+        """Dictionary of the rating aggregates."""
+        return {
+            'review_count': self.review_count,
+            'average': self.average,
+            'histogram': {str(rating): getattr(self, f'rating_{rating}') for rating in RATING_VALUES}
+        }
+
+    @staticmethod
+    def empty_dict():
+        """Aggregates of a place without reviews."""
+        return {
+            'review_count': 0,
+            'average': None,
+            'histogram': {str(rating): 0 for rating in RATING_VALUES}
+        }
@@ -3,6 +3,7 @@ this module contain a class Review
 """
 from .base_model import BaseModel
 from app import db
+from app.serialization import serializers
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 
@@ -10,6 +11,12 @@ import uuid
 class Review(BaseModel):
     """represents a Review tied to Place by Composition and dependent on User"""
     __tablename__ = 'reviews'
+    __table_args__ = (
+        # One review per user and place; also indexes lookups by user_id
+        db.UniqueConstraint('user_id', 'place_id', name='uq_reviews_user_id_place_id'),
+        # Keyset pages of a place's reviews, ordered by (created_at, id)
+        db.Index('ix_reviews_place_id_created_at', 'place_id', 'created_at', 'id'),
+    )
     
     text = db.Column(db.String(500), nullable=True)
     rating = db.Column(db.Integer, nullable=False)
@@ -29,4 +36,7 @@ def __init__(self, text, rating, user_id, place_id):
         if not isinstance(self.text, str) or not self.text.strip():
             raise ValueError("Text is required and must be a non-empty string")
         if not isinstance(self.rating, int) or not (1 <= self.rating <= 5):
-            raise ValueError("Rating must be an integer between 1 and 5")
\ No newline at end of file
+            raise ValueError("Rating must be an integer between 1 and 5")
+
+
+serializers.register(Review, ('id', 'text', 'rating', 'user_id', 'place_id'))
\ No newline at end of file
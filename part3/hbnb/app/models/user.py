@@ -1,12 +1,10 @@
 from app import db
-from flask_bcrypt import Bcrypt
 from app.models.base_model import BaseModel
+from app.services.passwords import hasher
+from app.serialization import serializers
 import re
-from datetime import datetime
 
 
-bcrypt = Bcrypt()
-
 class User(BaseModel):
     __tablename__ = 'users'
 
@@ -29,17 +27,20 @@ class User(BaseModel):
         self.set_password(password)  # Automatically sets the password hash
         self.is_admin = is_admin
         self.validate_user()
-        
-        # Call save() to ensure created_at and updated_at are set
-        self.save()
 
     def set_password(self, password):
         """Set the password hash, this is where we encrypt the password."""
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        if not password:
+            raise ValueError("Password is required")
+        self.password_hash = hasher.hash(password)
 
     def check_password(self, password):
         """Check if the provided password matches the stored password hash."""
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return hasher.check(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """Whether the stored hash was made with a different bcrypt cost than the configured one."""
+        return hasher.needs_rehash(self.password_hash)
 
     def validate_user(self):
         """Validate the user data."""
@@ -55,18 +56,11 @@ class User(BaseModel):
         email_regex = r'^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z]{2,}$'
         if not re.match(email_regex, self.email):
             raise ValueError("Invalid email format")
-    def save(self):
-        """Update the updated_at timestamp whenever the object is modified"""
-        self.updated_at = datetime.now()
-        db.session.add(self)
-        db.session.commit()  # Commit the transaction so that the `id` is set
-    def to_dict(self):
+
+    def to_dict(self, fields=None):
         """Convert the User object to a dictionary."""
-        return {
-            'id': self.id,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'email': self.email,
-            'is_admin': self.is_admin
-        }
+        return serializers.dump(self, fields)
+
+
+serializers.register(User, ('id', 'first_name', 'last_name', 'email', 'is_admin'), private=('password_hash',))
     
\ No newline at end of file
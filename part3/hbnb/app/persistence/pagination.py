@@ -0,0 +1,37 @@
+import base64
+import json
+from datetime import datetime
+
+DEFAULT_PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 100
+
+
+def clamp_limit(limit):
+    """Bound a client supplied page size to [1, MAX_PAGE_LIMIT]."""
+    if limit is None:
+        return DEFAULT_PAGE_LIMIT
+    return max(1, min(limit, MAX_PAGE_LIMIT))
+
+
+def encode_cursor(sort_value, obj_id):
+    """Encode the (sort value, id) keyset position of the last row of a page."""
+    if isinstance(sort_value, datetime):
+        payload = ['dt', sort_value.isoformat(), obj_id]
+    else:
+        payload = ['v', sort_value, obj_id]
+    raw = json.dumps(payload, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor, raising ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+        kind, sort_value, obj_id = json.loads(raw)
+        if kind == 'dt':
+            sort_value = datetime.fromisoformat(sort_value)
+        elif kind != 'v':
+            raise ValueError(kind)
+        return sort_value, obj_id
+    except (ValueError, TypeError, UnicodeError) as e:
+        raise ValueError("Invalid cursor") from e
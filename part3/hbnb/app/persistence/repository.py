@@ -1,5 +1,10 @@
 from abc import ABC, abstractmethod
+from sqlalchemy import and_, inspect, or_
+from sqlalchemy.orm import load_only
 from app import db
+from app.serialization import serializers
+from app.persistence.pagination import decode_cursor, encode_cursor
+from app.persistence.unit_of_work import in_unit_of_work, flush_in_unit_of_work
 
 class Repository(ABC):
     """Abstract base class for all repositories."""
@@ -63,19 +68,37 @@ class SQLAlchemyRepository(Repository):
     def __init__(self, model):
         """Initialize with a SQLAlchemy model."""
         self.model = model
+        # Models with an internal integer key are looked up by the id column, not by identity
+        self.id_is_primary_key = [column.name for column in inspect(model).primary_key] == ['id']
 
     def add(self, obj):
         """Add a new object to the session."""
         db.session.add(obj)
         self.commit()
 
-    def get(self, obj_id):
-        """Get a single object by its ID."""
+    def get(self, obj_id, for_update=False):
+        """Get a single object by its ID, locking its row with for_update."""
+        if not self.id_is_primary_key:
+            query = self.model.query.filter(self.model.id == obj_id)
+            return (query.with_for_update() if for_update else query).first()
+        if for_update:
+            return db.session.get(self.model, obj_id, with_for_update=True)
         return self.model.query.get(obj_id)
 
-    def get_all(self):
-        """Get all objects from the table."""
-        return self.model.query.all()
+    def get_all(self, fields=None):
+        """Get all objects from the table, loading only the columns of fields if given."""
+        return self.load_fields(self.model.query, fields).all()
+
+    def load_fields(self, query, fields, extra=()):
+        """Restrict query to the columns serialized for fields (None: every column).
+
+        The primary key and the extra column names are always loaded.
+        """
+        columns = serializers.columns(self.model, fields)
+        if columns is None:
+            return query
+        names = dict.fromkeys(('id', *columns, *extra))
+        return query.options(load_only(*(getattr(self.model, name) for name in names)))
 
     def update(self, obj_id, data):
         """Update an object by its ID."""
@@ -83,19 +106,81 @@ class SQLAlchemyRepository(Repository):
         if obj:
             for key, value in data.items():
                 setattr(obj, key, value)
-                self.commit()
+            self.commit()
+
     def delete(self, obj_id):
         """Delete an object by its ID."""
         obj = self.get(obj_id)
         if obj:
             db.session.delete(obj)
             self.commit()
+
     def get_by_attribute(self, attr_name, attr_value):
         """Get an object by a specific attribute."""
         return self.model.query.filter_by(**{attr_name: attr_value}).first()
 
+    def get_existing_ids(self, obj_ids):
+        """Return the subset of obj_ids present in the table, in one query."""
+        if not obj_ids:
+            return set()
+        rows = db.session.query(self.model.id).filter(self.model.id.in_(obj_ids))
+        return {row.id for row in rows}
+
+    def bulk_insert(self, mappings):
+        """Insert a batch of rows given as dictionaries with one executemany."""
+        if mappings:
+            db.session.bulk_insert_mappings(self.model, mappings)
+
+    def iter_rows(self, updated_since=None, batch_size=1000):
+        """Stream plain table rows ordered by (updated_at, id).
+
+        Rows are fetched batch_size at a time through a server-side cursor
+        where the driver supports one, so memory use does not depend on
+        the size of the table.
+        """
+        model = self.model
+        query = db.select(*model.public_columns()).order_by(model.updated_at, model.id)
+        if updated_since is not None:
+            query = query.where(model.updated_at >= updated_since)
+        result = db.session.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+        for row in result:
+            yield row._mapping
+
+    def get_page(self, limit, cursor=None, query=None, sort_key=None, descending=False):
+        """Get one keyset page ordered by (sort_key, id).
+
+        sort_key defaults to created_at. Returns the rows of the page and
+        the cursor of the next page, or None when there are no more rows.
+        """
+        model = self.model
+        if query is None:
+            query = model.query
+        if sort_key is None:
+            sort_key = model.created_at
+        if cursor:
+            sort_value, obj_id = decode_cursor(cursor)
+            if descending:
+                after = or_(sort_key < sort_value, and_(sort_key == sort_value, model.id < obj_id))
+            else:
+                after = or_(sort_key > sort_value, and_(sort_key == sort_value, model.id > obj_id))
+            query = query.filter(after)
+        order = (sort_key.desc(), model.id.desc()) if descending else (sort_key, model.id)
+        rows = query.add_columns(sort_key).order_by(*order).limit(limit + 1).all()
+        objs = [row[0] for row in rows[:limit]]
+        if len(rows) <= limit:
+            return objs, None
+        last, last_value = rows[limit - 1]
+        return objs, encode_cursor(last_value, last.id)
+
     def commit(self):
-        """Commit the transaction to the database."""
+        """Commit the transaction to the database.
+
+        Inside a unit of work this only flushes; the unit of work commits
+        once when it ends.
+        """
+        if in_unit_of_work():
+            flush_in_unit_of_work()
+            return
         try:
             db.session.commit()
         except Exception as e:
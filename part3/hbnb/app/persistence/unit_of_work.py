@@ -0,0 +1,130 @@
+"""
+Unit of work: one commit per request, however many repository writes it makes
+"""
+import threading
+from functools import wraps
+from flask import g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.db import stick_to_primary
+
+# Methods that do not write: their requests may read from a replica
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class UnitOfWork:
+    """Context manager grouping repository writes into a single commit.
+
+    While a unit of work is active, SQLAlchemyRepository.commit() only
+    flushes; the outermost unit of work commits once on a clean exit and
+    rolls back if an exception escapes or rollback() was requested. A unit
+    of work that wrote nothing ends its read transaction without a commit.
+    Nested units of work join the outermost one. State lives on flask.g,
+    so each request or CLI app context has its own.
+    """
+
+    def __enter__(self):
+        state = g.get('unit_of_work')
+        self.outermost = state is None
+        if self.outermost:
+            state = g.unit_of_work = {'depth': 0, 'rollback': False, 'writes': False, 'after_commit': []}
+        state['depth'] += 1
+        self.state = state
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        state = self.state
+        state['depth'] -= 1
+        if not self.outermost:
+            return False
+        g.pop('unit_of_work')
+        session = db.session
+        if exc_type is not None or state['rollback']:
+            session.rollback()
+            return False
+        if not (state['writes'] or session.new or session.dirty or session.deleted):
+            session.rollback()
+            for callback in state['after_commit']:
+                callback()
+            return False
+        try:
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        for callback in state['after_commit']:
+            callback()
+        return False
+
+    def rollback(self):
+        """Discard the writes of the whole unit of work on exit."""
+        self.state['rollback'] = True
+
+
+def in_unit_of_work():
+    """Whether the current app context is inside a unit of work."""
+    return has_app_context() and g.get('unit_of_work') is not None
+
+
+def flush_in_unit_of_work():
+    """Flush pending writes and mark the current unit of work for commit."""
+    g.unit_of_work['writes'] = True
+    db.session.flush()
+
+
+def after_commit(callback):
+    """Run callback once the current unit of work commits, or now if none is active."""
+    if in_unit_of_work():
+        g.unit_of_work['after_commit'].append(callback)
+    else:
+        callback()
+
+
+def transactional(view):
+    """Run a view inside a unit of work, rolling back error responses.
+
+    Requests with an unsafe method read from the primary only, so the rows
+    they change are never loaded from a lagging replica.
+    """
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if has_request_context() and request.method not in SAFE_METHODS:
+            stick_to_primary()
+        with UnitOfWork() as uow:
+            response = view(*args, **kwargs)
+            if getattr(response, 'status_code', 200) >= 400:
+                uow.rollback()
+        return response
+    return wrapper
+
+
+class count_commits:
+    """Count session commits made while the block runs, e.g. in tests.
+
+        with count_commits() as counter:
+            client.post('/api/v1/places/', ...)
+        assert counter.count == 1
+    """
+
+    def __enter__(self):
+        self.count = 0
+        with _counters_lock:
+            _counters.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        with _counters_lock:
+            _counters.remove(self)
+        return False
+
+
+_counters = []
+_counters_lock = threading.Lock()
+
+
+@event.listens_for(Session, 'after_commit')
+def _count_commit(session):
+    with _counters_lock:
+        for counter in _counters:
+            counter.count += 1
@@ -0,0 +1,164 @@
+"""
+Response serialization: per-model row -> dict functions and the JSON encoder
+"""
+from operator import attrgetter
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy import DateTime, inspect
+
+try:
+    import orjson
+except ImportError:  # optional: JSON_BACKEND falls back to the standard library
+    orjson = None
+
+
+class _ModelSpec:
+    def __init__(self, defaults, computed, private):
+        self.defaults = tuple(defaults)
+        self.computed = dict(computed or {})
+        self.private = frozenset(private)
+
+
+def _isoformat(value):
+    return value.isoformat() if value is not None else None
+
+
+class SerializerRegistry:
+    """Serializers of the models, generated from their column metadata.
+
+    Each model registers its default fields, computed fields (name ->
+    function of the instance) and private columns that are never exposed.
+    The function for a given field selection is built once, from one
+    getter per field, and reused for every row. Selections are kept in
+    the model's field order, so each set of fields is built only once.
+    """
+
+    def __init__(self):
+        self._specs = {}
+        self._compiled = {}
+
+    def register(self, model, defaults, computed=None, private=()):
+        self._specs[model] = _ModelSpec(defaults, computed, private)
+
+    def available(self, model):
+        """Names selectable with ?fields=: public columns and computed fields."""
+        spec = self._specs[model]
+        columns = [attr.key for attr in inspect(model).column_attrs if attr.key not in spec.private]
+        return tuple(columns) + tuple(spec.computed)
+
+    def select(self, model, requested):
+        """Return the requested field names in the model's order, None if none, raising ValueError on unknown ones."""
+        if not requested:
+            return None
+        available = self.available(model)
+        unknown = set(requested) - set(available)
+        if unknown:
+            raise ValueError(f"Unknown fields {', '.join(sorted(unknown))}; expected any of: {', '.join(available)}")
+        requested = set(requested)
+        return tuple(name for name in available if name in requested)
+
+    def columns(self, model, fields):
+        """Names of the columns read to serialize fields; None (every column) without a selection."""
+        if fields is None:
+            return None
+        computed = self._specs[model].computed
+        return tuple(name for name in fields if name not in computed)
+
+    def serializer(self, model, fields=None):
+        """Return the function turning an instance of model into a dict of fields (default: its defaults)."""
+        key = (model, fields)
+        serialize = self._compiled.get(key)
+        if serialize is None:
+            serialize = self._compiled[key] = self._build(model, fields or self._specs[model].defaults)
+        return serialize
+
+    def dump(self, obj, fields=None):
+        return self.serializer(type(obj), fields)(obj)
+
+    def dump_many(self, objs, fields=None, model=None):
+        """Serialize instances of one model; pass model when objs may be empty or a generator."""
+        objs = list(objs)
+        if not objs:
+            return []
+        serialize = self.serializer(model or type(objs[0]), fields)
+        return [serialize(obj) for obj in objs]
+
+    def _build(self, model, fields):
+        spec = self._specs[model]
+        columns = {attr.key: attr.columns[0] for attr in inspect(model).column_attrs}
+        getters = []
+        for name in fields:
+            if name in spec.computed:
+                getters.append((name, spec.computed[name]))
+            elif name in columns and name not in spec.private:
+                get = attrgetter(name)
+                if isinstance(columns[name].type, DateTime):
+                    getters.append((name, lambda obj, get=get: _isoformat(get(obj))))
+                else:
+                    getters.append((name, get))
+            else:
+                raise ValueError(f'{model.__name__} has no serializable field {name!r}')
+        getters = tuple(getters)
+
+        def serialize(obj):
+            return {name: get(obj) for name, get in getters}
+        return serialize
+
+
+class CompactJSONProvider(DefaultJSONProvider):
+    """Standard library encoder, without the key sorting flask-restx never did."""
+
+    sort_keys = False
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """orjson encoder; values it does not handle itself go through Flask's default().
+
+    Datetimes are passed to default() too, so both providers render them
+    the same way.
+    """
+
+    options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.options).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        options = self.options | (orjson.OPT_INDENT_2 if self._app.debug else 0)
+        return self._app.response_class(orjson.dumps(obj, default=self.default, option=options),
+                                        mimetype=self.mimetype)
+
+
+def output_json(data, code, headers=None):
+    """flask-restx representation encoding through the app's JSON provider."""
+    response = current_app.json.response(data)
+    response.status_code = code
+    response.headers.extend(headers or {})
+    return response
+
+
+def init_app(app, api):
+    """Select the JSON provider from JSON_BACKEND and make the API responses use it."""
+    backend = app.config.get('JSON_BACKEND', 'auto')
+    if backend == 'auto':
+        backend = 'orjson' if orjson is not None else 'json'
+    if backend == 'orjson':
+        if orjson is None:
+            raise RuntimeError('JSON_BACKEND is orjson but orjson is not installed')
+        app.json = OrjsonProvider(app)
+    elif backend == 'json':
+        app.json = CompactJSONProvider(app)
+    else:
+        raise ValueError(f"Unknown JSON backend: {backend}")
+    api.representations['application/json'] = output_json
+
+
+serializers = SerializerRegistry()
@@ -0,0 +1,268 @@
+"""
+Streaming NDJSON import of amenities, places and reviews
+"""
+import json
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models.amenity import Amenity
+from app.models.ids import new_id
+from app.models.place import Place
+from app.models.review import Review
+from app.services.cache import cache, place_key, ALL_AMENITIES_KEY
+from app.services.search import search_index
+from app.services.repositories.user_repository import UserRepository
+from app.services.repositories.place_repository import PlaceRepository
+from app.services.repositories.review_repository import ReviewRepository
+from app.services.repositories.amenity_repository import AmenityRepository
+from app.services.repositories.rating_stats_repository import RatingStatsRepository
+
+RECORD_TYPES = ('amenity', 'place', 'review')
+MAX_REPORTED_ERRORS = 1000
+
+
+class BulkImporter:
+    """Import NDJSON records in batches, reporting per-line errors.
+
+    Each line is a JSON object whose optional "type" is amenity, place
+    (default) or review. Lines are grouped in batches of batch_size; each
+    batch is validated, checked against the database with one set lookup
+    per referenced table, inserted with executemany and committed. Invalid
+    lines are reported and skipped without aborting the stream. Within a
+    batch amenities are inserted before places and places before reviews,
+    so a file may reference records defined earlier in it.
+    """
+
+    def __init__(self, batch_size=500):
+        if batch_size < 1:
+            raise ValueError("Batch size must be positive")
+        self.batch_size = batch_size
+        self.user_repo = UserRepository()
+        self.place_repo = PlaceRepository()
+        self.review_repo = ReviewRepository()
+        self.amenity_repo = AmenityRepository()
+        self.rating_stats_repo = RatingStatsRepository()
+
+    def run(self, lines, default_user_id=None):
+        """Import an iterable of NDJSON lines and return the import report."""
+        self.default_user_id = default_user_id
+        self.report = {
+            'imported': {record_type: 0 for record_type in RECORD_TYPES},
+            'failed': 0,
+            'errors': []
+        }
+        batch = []
+        for line_no, line in enumerate(lines, start=1):
+            if isinstance(line, bytes):
+                line = line.decode('utf-8', errors='replace')
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("Record must be a JSON object")
+                record_type = record.get('type', 'place')
+                if record_type not in RECORD_TYPES:
+                    raise ValueError(f"Unknown record type: {record_type}")
+            except ValueError as e:
+                self._error(line_no, str(e))
+                continue
+            batch.append((line_no, record_type, record))
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)
+        return self.report
+
+    def _flush(self, batch):
+        """Validate, insert and commit one batch."""
+        by_type = {record_type: [] for record_type in RECORD_TYPES}
+        for line_no, record_type, record in batch:
+            by_type[record_type].append((line_no, record))
+
+        errors = []
+        self.stale_keys = set()
+        self.unindexed = set()
+        try:
+            imported = {
+                'amenity': self._import_amenities(by_type['amenity'], errors),
+                'place': self._import_places(by_type['place'], errors),
+                'review': self._import_reviews(by_type['review'], errors)
+            }
+            # Search documents commit with the rows they are built from
+            search_index.index_places(self.unindexed)
+            db.session.commit()
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            failed = {line_no for line_no, _ in errors}
+            for line_no, _, _ in batch:
+                if line_no not in failed:
+                    errors.append((line_no, f"Batch rejected by the database: {e.__class__.__name__}"))
+            imported = {}
+
+        for line_no, message in sorted(errors):
+            self._error(line_no, message)
+        for record_type, count in imported.items():
+            self.report['imported'][record_type] += count
+        if imported.get('amenity'):
+            self.stale_keys.add(ALL_AMENITIES_KEY)
+        if imported:
+            cache.invalidate(*self.stale_keys)
+
+    def _import_amenities(self, rows, errors):
+        mappings = []
+        for line_no, record in rows:
+            try:
+                name = record.get('name')
+                if not isinstance(name, str) or not name.strip():
+                    raise ValueError("Name is required")
+                mapping = {
+                    'id': record.get('id') or new_id(),
+                    'name': name,
+                    'description': record.get('description')
+                }
+                self._check_lengths(Amenity, mapping)
+            except (TypeError, ValueError) as e:
+                errors.append((line_no, str(e)))
+                continue
+            mappings.append((line_no, mapping))
+
+        existing = self.amenity_repo.get_existing_ids({mapping['id'] for _, mapping in mappings})
+        accepted = []
+        for line_no, mapping in mappings:
+            if mapping['id'] in existing:
+                errors.append((line_no, f"Amenity {mapping['id']} already exists"))
+                continue
+            existing.add(mapping['id'])
+            accepted.append(mapping)
+        self.amenity_repo.bulk_insert(accepted)
+        return len(accepted)
+
+    def _import_places(self, rows, errors):
+        candidates = []
+        for line_no, record in rows:
+            try:
+                place = Place(
+                    title=record['title'],
+                    description=record['description'],
+                    price=record['price'],
+                    latitude=record['latitude'],
+                    longitude=record['longitude'],
+                    user_id=record.get('user_id', self.default_user_id)
+                )
+                if not place.user_id:
+                    raise ValueError("user_id is required")
+                mapping = {
+                    'id': record.get('id') or new_id(),
+                    'title': place.title,
+                    'description': place.description,
+                    'price': place.price,
+                    'latitude': place.latitude,
+                    'longitude': place.longitude,
+                    'user_id': place.user_id,
+                    'geohash': place.geohash
+                }
+                self._check_lengths(Place, mapping)
+                amenity_ids = record.get('amenities', [])
+                if not isinstance(amenity_ids, list):
+                    raise ValueError("amenities must be a list of IDs")
+            except KeyError as e:
+                errors.append((line_no, f"Missing field {e.args[0]}"))
+                continue
+            except (TypeError, ValueError) as e:
+                errors.append((line_no, str(e)))
+                continue
+            candidates.append((line_no, mapping, set(amenity_ids)))
+
+        # One set lookup per referenced table for the whole batch
+        known_amenities = self.amenity_repo.get_existing_ids(
+            set().union(*(amenity_ids for _, _, amenity_ids in candidates)))
+        known_users = self.user_repo.get_existing_ids({mapping['user_id'] for _, mapping, _ in candidates})
+        taken_ids = self.place_repo.get_existing_ids({mapping['id'] for _, mapping, _ in candidates})
+
+        accepted = []
+        links = []
+        for line_no, mapping, amenity_ids in candidates:
+            missing = amenity_ids - known_amenities
+            if missing:
+                errors.append((line_no, f"Amenity with ID {sorted(missing)[0]} not found"))
+            elif mapping['user_id'] not in known_users:
+                errors.append((line_no, "User not found"))
+            elif mapping['id'] in taken_ids:
+                errors.append((line_no, f"Place {mapping['id']} already exists"))
+            else:
+                taken_ids.add(mapping['id'])
+                accepted.append(mapping)
+                links.extend((mapping['id'], amenity_id) for amenity_id in amenity_ids)
+        self.place_repo.bulk_insert(accepted)
+        self.rating_stats_repo.add_empty([mapping['id'] for mapping in accepted])
+        self.place_repo.add_amenity_links(links)
+        self.unindexed.update(mapping['id'] for mapping in accepted)
+        return len(accepted)
+
+    def _import_reviews(self, rows, errors):
+        candidates = []
+        for line_no, record in rows:
+            try:
+                rating = record['rating']
+                if not isinstance(rating, int) or isinstance(rating, bool) or not (1 <= rating <= 5):
+                    raise ValueError("Rating must be between 1 and 5")
+                text = record['text']
+                if not isinstance(text, str) or not text.strip():
+                    raise ValueError("Text cannot be empty")
+                mapping = {
+                    'id': record.get('id') or new_id(),
+                    'text': text,
+                    'rating': rating,
+                    'place_id': record['place_id'],
+                    'user_id': record['user_id']
+                }
+                self._check_lengths(Review, mapping)
+            except KeyError as e:
+                errors.append((line_no, f"Missing field {e.args[0]}"))
+                continue
+            except (TypeError, ValueError) as e:
+                errors.append((line_no, str(e)))
+                continue
+            candidates.append((line_no, mapping))
+
+        owners = self.place_repo.get_owners_by_ids({mapping['place_id'] for _, mapping in candidates})
+        known_users = self.user_repo.get_existing_ids({mapping['user_id'] for _, mapping in candidates})
+        reviewed = self.review_repo.get_reviewed_pairs(
+            {(mapping['user_id'], mapping['place_id']) for _, mapping in candidates})
+
+        accepted = []
+        for line_no, mapping in candidates:
+            pair = (mapping['user_id'], mapping['place_id'])
+            if mapping['place_id'] not in owners:
+                errors.append((line_no, "Place not found"))
+            elif mapping['user_id'] not in known_users:
+                errors.append((line_no, "User not found"))
+            elif owners[mapping['place_id']] == mapping['user_id']:
+                errors.append((line_no, "You cannot review your own place"))
+            elif pair in reviewed:
+                errors.append((line_no, "You have already reviewed this place"))
+            else:
+                reviewed.add(pair)
+                accepted.append(mapping)
+        self.review_repo.bulk_insert(accepted)
+
+        place_ids = {mapping['place_id'] for mapping in accepted}
+        if place_ids:
+            self.rating_stats_repo.reconcile(place_ids)
+            self.stale_keys.update(place_key(place_id) for place_id in place_ids)
+            self.unindexed.update(place_ids)
+        return len(accepted)
+
+    @staticmethod
+    def _check_lengths(model, mapping):
+        """Reject string values longer than their column allows."""
+        for key, value in mapping.items():
+            length = getattr(model.__table__.c[key].type, 'length', None)
+            if length and isinstance(value, str) and len(value) > length:
+                raise ValueError(f"{key} must be at most {length} characters")
+
+    def _error(self, line_no, message):
+        self.report['failed'] += 1
+        if len(self.report['errors']) < MAX_REPORTED_ERRORS:
+            self.report['errors'].append({'line': line_no, 'error': message})
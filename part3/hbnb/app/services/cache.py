@@ -0,0 +1,338 @@
+"""
+Read-through cache used by HBnBFacade for place and amenity lookups
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# A cached value with the validator of its representation: a strong ETag (hash of the value).
+# No Last-Modified: the load time is neither per row nor the same across workers
+CacheEntry = namedtuple('CacheEntry', ('value', 'etag'))
+
+
+def etag_of(value):
+    """Strong ETag (unquoted) of a JSON-serializable value."""
+    raw = json.dumps(value, sort_keys=True, separators=(',', ':'))
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class CacheBackend:
+    """Interface of a cache store holding serialized values."""
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        raise NotImplementedError
+
+    def delete(self, *keys):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class NullCacheBackend(CacheBackend):
+    """Backend that never stores anything, used to disable caching."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def clear(self):
+        pass
+
+
+class LRUCacheBackend(CacheBackend):
+    """In-process LRU store bounded by entry count, with per-entry TTL."""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCacheBackend(CacheBackend):
+    """Store speaking the Redis protocol.
+
+    Any client exposing get/set(ex=)/delete/scan_iter works, so a local
+    stand-in such as fakeredis can replace a real server.
+    """
+
+    def __init__(self, client, prefix='hbnb:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return value
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=max(1, int(ttl)))
+
+    def delete(self, *keys):
+        if keys:
+            self.client.delete(*(self.prefix + key for key in keys))
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+class _Flight:
+    """One load of a key in progress, shared by the callers asking for the key meanwhile."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        # Stored JSON of the loaded record, None if there was nothing to cache
+        self.record = None
+        self.error = None
+        # Set when the key is invalidated during the load: the result must not be stored
+        self.invalidated = False
+
+
+class FacadeCache:
+    """JSON-serializing cache front with hit/miss counters.
+
+    Values are stored serialized so callers always get a private copy
+    they are free to mutate. Counters are also kept per key prefix (the
+    part before the first ':'), so each kind of entry can be sized on its
+    own.
+
+    Loads are single-flight: concurrent misses of one key in this process
+    wait for the first caller's load instead of all querying the database.
+    An entry past its TTL stays servable for stale_ttl more seconds; the
+    first caller to see it reloads it while the others get the stale
+    value. Invalidated keys are dropped outright and never served stale.
+    """
+
+    def __init__(self, backend=None, ttl=300, stale_ttl=30, coalesce_timeout=10):
+        self.backend = backend or LRUCacheBackend()
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.coalesce_timeout = coalesce_timeout
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.coalesced = 0
+        self.by_prefix = {}
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._flights_lock = threading.Lock()
+
+    def init_app(self, app):
+        """Configure the backend from the CACHE_* settings of the app."""
+        self.ttl = app.config.get('CACHE_TTL', 300)
+        self.stale_ttl = app.config.get('CACHE_STALE_TTL', 30)
+        self.coalesce_timeout = app.config.get('CACHE_COALESCE_TIMEOUT', 10)
+        backend = app.config.get('CACHE_BACKEND', 'memory')
+        if backend == 'memory':
+            self.backend = LRUCacheBackend(app.config.get('CACHE_MAX_ENTRIES', 10000))
+        elif backend == 'redis':
+            import redis
+            self.backend = RedisCacheBackend(redis.Redis.from_url(app.config['CACHE_REDIS_URL']))
+        elif backend == 'null':
+            self.backend = NullCacheBackend()
+        else:
+            raise ValueError(f"Unknown cache backend: {backend}")
+        self.reset_stats()
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for key, calling loader on a miss.
+
+        A loader returning None is not cached.
+        """
+        def load():
+            value = loader()
+            return None if value is None else [value]
+        fields = self._read_through(key, load)
+        return fields[0] if fields is not None else None
+
+    def get_or_load_entry(self, key, loader):
+        """Like get_or_load, but return a CacheEntry, or None if loader returns None.
+
+        The ETag is computed once, when the value is loaded, so serving a
+        cached entry never re-hashes it. Keys read through this method must
+        not also be read with get_or_load.
+        """
+        def load():
+            value = loader()
+            if value is None:
+                return None
+            return [value, etag_of(value)]
+        fields = self._read_through(key, load)
+        if fields is None:
+            return None
+        # Records cached before Last-Modified was dropped still carry a third field
+        return CacheEntry(*fields[:2])
+
+    def _read_through(self, key, load):
+        """Return the fields of the record of key, calling load() for them on a miss.
+
+        Records are stored as JSON [fresh until (epoch seconds), *fields].
+        load returns the fields, or None if there is nothing to cache.
+        """
+        stale = None
+        cached = self.backend.get(key)
+        if cached is not None:
+            fresh_until, *fields = json.loads(cached)
+            if fresh_until > time.time():
+                self._count(key, hit=True)
+                return fields
+            stale = fields
+
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if stale is not None:
+                self._count(key, hit=True, stale=True)
+                return stale
+            self._count(key, hit=False, coalesced=True)
+            if not flight.done.wait(self.coalesce_timeout):
+                # The shared load is stuck; do not queue every request behind it
+                return load()
+            if flight.error is not None:
+                raise flight.error
+            return json.loads(flight.record)[1:] if flight.record is not None else None
+
+        self._count(key, hit=False)
+        try:
+            fields = load()
+            if fields is not None:
+                flight.record = json.dumps([time.time() + self.ttl, *fields])
+            with self._flights_lock:
+                # Checked and stored under the lock, so an invalidation either
+                # comes first and skips the store, or follows and deletes it
+                if fields is None:
+                    if stale is not None:
+                        # Gone since it was cached
+                        self.backend.delete(key)
+                elif not flight.invalidated:
+                    self.backend.set(key, flight.record, self.ttl + self.stale_ttl)
+            return fields
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._flights_lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    def invalidate(self, *keys):
+        """Drop the given keys from the cache, and keep loads in progress from storing them."""
+        with self._flights_lock:
+            for key in keys:
+                flight = self._flights.pop(key, None)
+                if flight is not None:
+                    flight.invalidated = True
+        self.backend.delete(*keys)
+
+    def clear(self):
+        self.backend.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.stale = 0
+            self.coalesced = 0
+            self.by_prefix = {}
+
+    def stats(self):
+        """Return hit/miss counters and the hit ratio, overall and per key prefix.
+
+        stale counts the hits served past their TTL during a reload,
+        coalesced the misses answered by another caller's load.
+        """
+        with self._lock:
+            return dict(
+                _ratio(self.hits, self.misses, self.stale, self.coalesced),
+                by_prefix={prefix: _ratio(*counts) for prefix, counts in sorted(self.by_prefix.items())}
+            )
+
+    def _count(self, key, hit, stale=False, coalesced=False):
+        prefix = key.split(':', 1)[0]
+        with self._lock:
+            counts = self.by_prefix.setdefault(prefix, [0, 0, 0, 0])
+            if hit:
+                self.hits += 1
+                counts[0] += 1
+            else:
+                self.misses += 1
+                counts[1] += 1
+            if stale:
+                self.stale += 1
+                counts[2] += 1
+            if coalesced:
+                self.coalesced += 1
+                counts[3] += 1
+
+
+def _ratio(hits, misses, stale, coalesced):
+    lookups = hits + misses
+    return {'hits': hits, 'misses': misses, 'hit_ratio': hits / lookups if lookups else 0.0,
+            'stale': stale, 'coalesced': coalesced}
+
+
+def place_key(place_id):
+    return f'place:{place_id}'
+
+
+def amenity_key(amenity_id):
+    return f'amenity:{amenity_id}'
+
+
+def user_key(user_id):
+    return f'user:{user_id}'
+
+
+ALL_AMENITIES_KEY = 'amenities:all'
+
+cache = FacadeCache()
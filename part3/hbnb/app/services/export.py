@@ -0,0 +1,57 @@
+"""
+Streaming NDJSON/CSV encoders for table exports
+"""
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+CHUNK_SIZE = 64 * 1024
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def encode_ndjson(rows):
+    """Yield one JSON document per row."""
+    for row in rows:
+        yield json.dumps({key: _plain(value) for key, value in row.items()}) + '\n'
+
+
+def encode_csv(rows, columns):
+    """Yield a header line followed by one CSV line per row."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for row in rows:
+        writer.writerow([_plain(row[column]) for column in columns])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def chunked(pieces, gzip=False):
+    """Group encoded pieces into ~CHUNK_SIZE byte chunks, gzipping on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+    parts = []
+    size = 0
+    for piece in pieces:
+        data = piece.encode('utf-8')
+        parts.append(data)
+        size += len(data)
+        if size >= CHUNK_SIZE:
+            chunk = b''.join(parts)
+            parts = []
+            size = 0
+            chunk = compressor.compress(chunk) if compressor else chunk
+            if chunk:
+                yield chunk
+    tail = b''.join(parts)
+    if compressor:
+        tail = compressor.compress(tail) + compressor.flush()
+    if tail:
+        yield tail
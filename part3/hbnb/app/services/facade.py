@@ -1,13 +1,55 @@
 from app import db
+from app.db import reading_primary
 from app.models.user import User
 from app.models.amenity import Amenity
 from app.models.place import Place
+from app.models.place_rating_stats import PlaceRatingStats
 from app.models.review import Review
+from app.models.geo import MAX_RADIUS_KM, cover_bbox, haversine_km, radius_bboxes
+from app.models.ids import new_id
+from app.services.cache import cache, place_key, amenity_key, user_key, ALL_AMENITIES_KEY, CacheEntry, etag_of
+from app.services.search import search_index
+from app.persistence.unit_of_work import UnitOfWork, after_commit
+from app.serialization import serializers
 from app.services.repositories.user_repository import UserRepository
 from app.services.repositories.place_repository import PlaceRepository
 from app.services.repositories.review_repository import ReviewRepository
 from app.services.repositories.amenity_repository import AmenityRepository
-import uuid
+from app.services.repositories.amenity_link_repository import AmenityLinkRepository
+from app.services.repositories.rating_stats_repository import RatingStatsRepository
+from sqlalchemy.exc import IntegrityError
+
+# Place fields of get_place() and get_all_places()
+PLACE_DETAIL_FIELDS = ('id', 'title', 'description', 'price', 'latitude', 'longitude', 'user_id')
+PLACE_LIST_FIELDS = ('id', 'title', 'description', 'price', 'latitude', 'longitude', 'associated_amenities')
+
+
+def invalidate_after_commit(*keys):
+    """Drop cache keys once the current transaction has committed."""
+    after_commit(lambda: cache.invalidate(*keys))
+
+
+def load_entry(key, loader, for_update=False):
+    """Return the cached CacheEntry of key, or with for_update a fresh one from loader.
+
+    Fresh entries serve If-Match checks: their loader locks the row.
+    """
+    if for_update:
+        value = loader()
+        return CacheEntry(value, etag_of(value)) if value is not None else None
+    return cache.get_or_load_entry(key, from_primary(loader))
+
+
+def from_primary(loader):
+    """Wrap a cache loader to read from the primary.
+
+    Cached values are served for CACHE_TTL: loaded from a replica right
+    after a write invalidated them, they would keep the pre-write state.
+    """
+    def load():
+        with reading_primary():
+            return loader()
+    return load
 
 
 class HBnBFacade:
@@ -19,6 +61,16 @@ class HBnBFacade:
         self.place_repo = PlaceRepository()
         self.review_repo = ReviewRepository()
         self.amenity_repo = AmenityRepository()
+        self.amenity_link_repo = AmenityLinkRepository()
+        self.rating_stats_repo = RatingStatsRepository()
+
+    def transaction(self):
+        """Group several facade writes into one commit.
+
+        API requests already run inside one (see transactional); use it
+        from scripts and CLI commands.
+        """
+        return UnitOfWork()
 
     # User Methods
     def create_user(self, user_data):
@@ -31,13 +83,28 @@ class HBnBFacade:
         """Retrieve a user by their ID."""
         return self.user_repo.get(user_id)
 
+    def get_user_record(self, user_id):
+        """Retrieve the public fields of a user (User.to_dict()) by ID, cached."""
+        entry = self.get_user_entry(user_id)
+        return entry.value if entry else None
+
+    def get_user_entry(self, user_id, for_update=False):
+        """Return get_user_record(user_id) with its validators as a CacheEntry, or None.
+
+        With for_update the row is locked and read from the database.
+        """
+        def load():
+            user = self.user_repo.get(user_id, for_update=for_update)
+            return user.to_dict() if user else None
+        return load_entry(user_key(user_id), load, for_update)
+
     def get_user_by_email(self, email):
         """Retrieve a user by their email."""
         return self.user_repo.get_user_by_email(email)
 
-    def get_all_users(self):
-        """Retrieve a list of all users."""
-        return self.user_repo.get_all()
+    def get_all_users(self, fields=None):
+        """Retrieve a list of all users, loading only the columns of fields if given."""
+        return self.user_repo.get_all(fields)
 
     def update_user(self, user_id, user_data):
         """Update a user's information by their ID."""
@@ -46,43 +113,82 @@ class HBnBFacade:
             return None
         user.first_name = user_data.get('first_name', user.first_name)
         user.last_name = user_data.get('last_name', user.last_name)
-        db.session.commit()
+        self.user_repo.commit()
+        invalidate_after_commit(user_key(user_id))
         return user
 
     def get_user_by_id(self, user_id):
         """Retrieve a user by their ID (alias for get_user)."""
         return self.user_repo.get_user_by_id(user_id)
 
+    def get_users_by_ids(self, user_ids, fields=None):
+        """Retrieve the users of user_ids in one query, loading only the columns of fields if given."""
+        return self.user_repo.get_users_by_ids(user_ids, fields)
+
     def save_user(self, user):
         """Save a user object to the database."""
-        db.session.add(user)
-        db.session.commit()
+        self.user_repo.add(user)
+
+    def authenticate(self, email, password):
+        """Return the user matching email and password, or None.
+
+        A hash made with a different bcrypt cost than the configured one is
+        transparently replaced by a fresh hash of the verified password.
+        """
+        user = self.user_repo.get_user_by_email(email)
+        if not user or not user.check_password(password):
+            return None
+        if user.password_needs_rehash():
+            user.set_password(password)
+            self.user_repo.commit()
+        return user
 
     # Amenity Methods
     def create_amenity(self, amenity_data):
         """Create a new amenity and associate it with places if provided."""
-        amenity_id = str(uuid.uuid4())
+        amenity_id = new_id()
         amenity = Amenity(
             id=amenity_id,
             name=amenity_data['name'],
             description=amenity_data.get('description')
         )
 
+        self.amenity_repo.add(amenity)
+        # Linked through the link repository, which also marks the places as updated
         place_ids = amenity_data.get('associated_places', [])
         if place_ids:
-            places = self.place_repo.get_places_by_ids(place_ids)
-            amenity.associated_places.extend(places)
-
-        self.amenity_repo.add(amenity)
+            self.amenity_link_repo.change_amenity_places(amenity_id, add=place_ids)
+        invalidate_after_commit(ALL_AMENITIES_KEY, *(place_key(place_id) for place_id in place_ids))
         return amenity
 
     def get_amenity(self, amenity_id):
-        """Retrieve an amenity by its ID."""
-        return self.amenity_repo.get(amenity_id)
+        """Retrieve an amenity by its ID as a dictionary."""
+        entry = self.get_amenity_entry(amenity_id)
+        return entry.value if entry else None
+
+    def get_amenity_entry(self, amenity_id, for_update=False):
+        """Return get_amenity(amenity_id) with its validators as a CacheEntry, or None.
+
+        With for_update the row is locked and read from the database.
+        """
+        def load():
+            amenity = self.amenity_repo.get(amenity_id, for_update=for_update)
+            return self._amenity_to_dict(amenity) if amenity else None
+        return load_entry(amenity_key(amenity_id), load, for_update)
 
     def get_all_amenities(self):
-        """Retrieve a list of all amenities."""
-        return self.amenity_repo.get_all()
+        """Retrieve a list of all amenities as dictionaries."""
+        return self.get_all_amenities_entry().value
+
+    def get_all_amenities_entry(self):
+        """Return get_all_amenities() with its validators as a CacheEntry."""
+        return cache.get_or_load_entry(ALL_AMENITIES_KEY, from_primary(lambda: [
+            self._amenity_to_dict(amenity) for amenity in self.amenity_repo.get_all()
+        ]))
+
+    @staticmethod
+    def _amenity_to_dict(amenity):
+        return serializers.dump(amenity)
 
     def update_amenity(self, amenity_id, amenity_data):
         """Update an amenity's information and associated places."""
@@ -93,19 +199,14 @@ class HBnBFacade:
         amenity.name = amenity_data.get('name', amenity.name)
         amenity.description = amenity_data.get('description', amenity.description)
 
-        place_ids = amenity_data.get('associated_places', [])
-        if place_ids is not None:
-            new_places = self.place_repo.get_places_by_ids(place_ids)
-            # Add new places
-            for place in new_places:
-                if place not in amenity.associated_places:
-                    amenity.associated_places.append(place)
-            # Remove places not in the updated list
-            to_remove = [place for place in amenity.associated_places if place.id not in place_ids]
-            for place in to_remove:
-                amenity.associated_places.remove(place)
-
-        db.session.commit()
+        # Places are only replaced when the payload lists them; without, this only reads the linked ones
+        change = self.amenity_link_repo.change_amenity_places(
+            amenity_id, replace=amenity_data.get('associated_places'))
+
+        self.amenity_repo.commit()
+        # Cached places embed amenity names, so every place linked before or after goes stale
+        invalidate_after_commit(amenity_key(amenity_id), ALL_AMENITIES_KEY,
+                                *(place_key(place_id) for place_id in change.linked | change.removed))
         return amenity
 
     def get_amenities_by_ids(self, amenity_ids):
@@ -129,45 +230,56 @@ class HBnBFacade:
             amenities = self.amenity_repo.get_amenities_by_ids(amenity_ids)
             place.associated_amenities.extend(amenities)
 
+        # Zeroed aggregates from the start, so concurrent first reviews only UPDATE them
+        place.rating_stats = PlaceRatingStats()
         self.place_repo.add(place)
+        search_index.index_places([place.id])
+        self.place_repo.commit()
         return place
 
-    def get_place(self, place_id):
-        """Retrieve a place by its ID, including associated amenity names."""
-        place = Place.query.get(place_id)
+    def get_place(self, place_id, expand_amenities=False):
+        """Retrieve a place by its ID, including associated amenity names.
+
+        With expand_amenities, amenities are {'id', 'name'} objects instead.
+        """
+        entry = self.get_place_entry(place_id, expand_amenities)
+        return entry.value if entry else None
+
+    def get_place_entry(self, place_id, expand_amenities=False, for_update=False):
+        """Return get_place() with its validators as a CacheEntry, or None.
+
+        The ETag identifies the state of the place, whichever the amenity
+        representation. With for_update the row is locked and read from the
+        database.
+        """
+        entry = load_entry(place_key(place_id), lambda: self._load_place(place_id, for_update), for_update)
+        if entry and not expand_amenities:
+            entry.value['associated_amenities'] = [amenity['name'] for amenity in entry.value['associated_amenities']]
+        return entry
+
+    def _load_place(self, place_id, for_update=False):
+        place = self.place_repo.get(place_id, for_update=for_update)
         if not place:
             return None
-        amenity_names = [amenity.name for amenity in place.associated_amenities]
         return {
-            'place': {
-                'id': place.id,
-                'title': place.title,
-                'description': place.description,
-                'price': place.price,
-                'latitude': place.latitude,
-                'longitude': place.longitude,
-                'user_id': place.user_id
-            },
-            'associated_amenities': amenity_names
+            'place': serializers.dump(place, PLACE_DETAIL_FIELDS),
+            'associated_amenities': serializers.dump_many(place.associated_amenities, ('id', 'name'), model=Amenity),
+            'rating': place.rating_dict()
         }
 
     def get_all_places(self):
-        """Retrieve a list of all places with their associated amenities."""
-        places = self.place_repo.get_all()
-        return [
-            {
-                'place': {
-                    'id': place.id,
-                    'title': place.title,
-                    'description': place.description,
-                    'price': place.price,
-                    'latitude': place.latitude,
-                    'longitude': place.longitude
-                },
-                'associated_amenities': [amenity.id for amenity in place.associated_amenities]
-            }
-            for place in places
-        ]
+        """Retrieve a list of all places with their associated amenity IDs, as dictionaries."""
+        return serializers.dump_many(self.place_repo.get_all(), PLACE_LIST_FIELDS, model=Place)
+
+    def get_places_page(self, limit, cursor=None, min_price=None, max_price=None, amenity_ids=None,
+                        amenity_mode='all', sort='created_at', fields=None):
+        """Retrieve one page of places and the cursor of the next page.
+
+        With amenity_ids, only places offering all of them (amenity_mode
+        'all') or at least one ('any') are returned.
+        """
+        return self.place_repo.get_filtered_page(limit, cursor, min_price, max_price, amenity_ids,
+                                                 amenity_mode, sort, fields)
 
     def update_place(self, place_id, place_data):
         """Update a place's information and associated amenities."""
@@ -180,25 +292,91 @@ class HBnBFacade:
         place.price = place_data.get('price', place.price)
         place.latitude = place_data.get('latitude', place.latitude)
         place.longitude = place_data.get('longitude', place.longitude)
+        place.refresh_geohash()
 
-        amenity_ids = place_data.get('associated_amenities', [])
+        # Amenities are only replaced when the payload lists them
+        amenity_ids = place_data.get('associated_amenities')
         if amenity_ids is not None:
-            new_amenities = self.amenity_repo.get_amenities_by_ids(amenity_ids)
-            # Add new amenities
-            for amenity in new_amenities:
-                if amenity not in place.associated_amenities:
-                    place.associated_amenities.append(amenity)
-            # Remove amenities not in the updated list
-            to_remove = [amenity for amenity in place.associated_amenities if amenity.id not in amenity_ids]
-            for amenity in to_remove:
-                place.associated_amenities.remove(amenity)
-
-        db.session.commit()
+            self.amenity_link_repo.change_place_amenities(place_id, replace=amenity_ids)
+
+        search_index.index_places([place_id])
+        self.place_repo.commit()
+        invalidate_after_commit(place_key(place_id))
         return place
 
+    def change_place_amenities(self, place_id, add=(), remove=()):
+        """Link a place to the amenity IDs of add and unlink it from those of remove.
+
+        Returns the LinkChange, or None if the place does not exist; raises
+        ValueError if an amenity does not.
+        """
+        change = self.amenity_link_repo.change_place_amenities(place_id, add, remove)
+        if change is None:
+            return None
+        if change.added or change.removed:
+            self.place_repo.commit()
+            invalidate_after_commit(place_key(place_id))
+        return change
+
     def delete_place(self, place_id):
         """Delete a place by its ID."""
-        return self.place_repo.delete(place_id)
+        search_index.remove_places([place_id])
+        deleted = self.place_repo.delete(place_id)
+        invalidate_after_commit(place_key(place_id))
+        return deleted
+
+    def get_places_nearby(self, latitude, longitude, radius_km, limit, fields=None):
+        """Retrieve places within radius_km of a point, nearest first.
+
+        Returns a list of (place, distance_km) tuples. Each bounding box
+        only loads the 2 * limit places nearest to the point, as SQL
+        approximates the distance.
+        """
+        if not -90 <= latitude <= 90 or not -180 <= longitude <= 180:
+            raise ValueError("Invalid coordinates")
+        if radius_km <= 0:
+            raise ValueError("Radius must be positive")
+        if radius_km > MAX_RADIUS_KM:
+            raise ValueError(f"Radius must be at most {MAX_RADIUS_KM} km")
+
+        matches = {}
+        for box in radius_bboxes(latitude, longitude, radius_km):
+            # Across the antimeridian, the point is 360 degrees away from its box
+            near_longitude = longitude
+            if longitude < box[1]:
+                near_longitude += 360
+            elif longitude > box[3]:
+                near_longitude -= 360
+            for place in self.place_repo.get_in_bbox(cover_bbox(*box), *box, limit=2 * limit, fields=fields,
+                                                     near=(latitude, near_longitude)):
+                distance = haversine_km(latitude, longitude, place.latitude, place.longitude)
+                if distance <= radius_km:
+                    matches[place.id] = (place, distance)
+        return sorted(matches.values(), key=lambda match: match[1])[:limit]
+
+    def get_places_in_bbox(self, min_lat, min_lon, max_lat, max_lon, limit, fields=None):
+        """Retrieve places inside a latitude/longitude bounding box."""
+        if not -90 <= min_lat <= max_lat <= 90:
+            raise ValueError("Invalid latitude range")
+        if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180):
+            raise ValueError("Invalid longitude range")
+
+        # A box with min_lon > max_lon crosses the antimeridian
+        if min_lon <= max_lon:
+            boxes = [(min_lat, min_lon, max_lat, max_lon)]
+        else:
+            boxes = [(min_lat, min_lon, max_lat, 180.0), (min_lat, -180.0, max_lat, max_lon)]
+        places = []
+        for box in boxes:
+            places.extend(self.place_repo.get_in_bbox(cover_bbox(*box), *box, limit=limit - len(places),
+                                                      fields=fields))
+            if len(places) >= limit:
+                break
+        return places
+
+    def iter_places(self, updated_since=None):
+        """Stream place rows as mappings, ordered by updated_at."""
+        return self.place_repo.iter_rows(updated_since)
 
     def get_places_by_price_range(self, min_price, max_price):
         """Retrieve places within a price range."""
@@ -212,11 +390,33 @@ class HBnBFacade:
         """Retrieve places owned by a specific user."""
         return self.place_repo.get_by_owner(owner_id)
 
-    def get_places_by_ids(self, place_ids):
-        """Retrieve a list of places by their IDs."""
-        return self.place_repo.get_places_by_ids(place_ids)
+    def get_places_by_ids(self, place_ids, fields=None):
+        """Retrieve a list of places by their IDs, loading what fields serialize (default: every field)."""
+        return self.place_repo.get_places_by_ids(place_ids, with_amenities=fields is None, fields=fields)
+
+    def search_places(self, query, limit, offset=0):
+        """Full-text search places by title, description and reviews, best match first.
+
+        Returns a list of (place, score).
+        """
+        hits = search_index.search(query, limit, offset)
+        places = {place.id: place for place in
+                  self.place_repo.get_places_by_ids([place_id for place_id, _ in hits], with_amenities=True)}
+        return [(places[place_id], score) for place_id, score in hits if place_id in places]
 
     # Review Methods
+    def get_review(self, review_id):
+        """Retrieve a review by its ID."""
+        return self.review_repo.get(review_id)
+
+    def get_all_reviews(self, fields=None):
+        """Retrieve a list of all reviews, loading only the columns of fields if given."""
+        return self.review_repo.get_all(fields)
+
+    def iter_reviews(self, updated_since=None):
+        """Stream review rows as mappings, ordered by updated_at."""
+        return self.review_repo.iter_rows(updated_since)
+
     def get_reviews_by_place(self, place_id):
         """Retrieve all reviews for a specific place."""
         place = self.place_repo.get(place_id)
@@ -225,6 +425,18 @@ class HBnBFacade:
         reviews = self.review_repo.get_by_place(place_id)
         return reviews or []
 
+    def get_reviews_page_by_place(self, place_id, limit, cursor=None, expand_author=False, fields=None):
+        """Retrieve one page of a place's reviews and the cursor of the next page."""
+        return self.review_repo.get_page_by_place(place_id, limit, cursor, with_author=expand_author,
+                                                  fields=fields)
+
+    def get_review_context(self, user_id, place_id):
+        """Return (user exists, place owner ID or None, user already reviewed the place)."""
+        place = self.get_place(place_id)
+        return (self.get_user_record(user_id) is not None,
+                place['place']['user_id'] if place else None,
+                self.review_repo.has_reviewed(user_id, place_id))
+
     def create_review(self, review_data):
         """Create a new review with validation."""
         try:
@@ -250,12 +462,63 @@ class HBnBFacade:
                 user_id=review_data['user_id'],
                 place_id=review_data['place_id']
             )
-            self.review_repo.add(review)
-            db.session.commit()
+            try:
+                # The (user_id, place_id) unique constraint settles concurrent duplicates
+                with db.session.begin_nested():
+                    db.session.add(review)
+            except IntegrityError:
+                raise ValueError("You have already reviewed this place")
+            self.rating_stats_repo.record_change(review.place_id, added=review.rating)
+            search_index.index_places([review.place_id])
+            self.review_repo.commit()
+            invalidate_after_commit(place_key(review.place_id))
             return review
         except ValueError as e:
             raise e
         except Exception as e:
+            db.session.rollback()
             raise Exception(f"Failed to create review: {str(e)}")
-        finally:
-            db.session.rollback()
\ No newline at end of file
+
+    def update_review(self, review_id, review_data):
+        """Update a review's text and rating, keeping place aggregates in sync."""
+        review = self.review_repo.get(review_id)
+        if not review:
+            return None
+        rating = review_data.get('rating', review.rating)
+        if not isinstance(rating, int) or not (1 <= rating <= 5):
+            raise ValueError("Rating must be between 1 and 5")
+        text = review_data.get('text', review.text)
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("Text cannot be empty")
+
+        old_rating = review.rating
+        review.rating = rating
+        review.text = text
+        db.session.flush()
+        self.rating_stats_repo.record_change(review.place_id, added=rating, removed=old_rating)
+        search_index.index_places([review.place_id])
+        self.review_repo.commit()
+        invalidate_after_commit(place_key(review.place_id))
+        return review
+
+    def delete_review(self, review_id):
+        """Delete a review by its ID, keeping place aggregates in sync."""
+        review = self.review_repo.get(review_id)
+        if not review:
+            return False
+        place_id = review.place_id
+        rating = review.rating
+        db.session.delete(review)
+        db.session.flush()
+        self.rating_stats_repo.record_change(place_id, removed=rating)
+        search_index.index_places([place_id])
+        self.review_repo.commit()
+        invalidate_after_commit(place_key(place_id))
+        return True
+
+    def reconcile_rating_stats(self):
+        """Rebuild place rating aggregates from the reviews table."""
+        fixed = self.rating_stats_repo.reconcile()
+        self.rating_stats_repo.commit()
+        after_commit(cache.clear)
+        return fixed
@@ -0,0 +1,102 @@
+"""
+Cache of verified JWT claims, so a token is decoded and checked once
+"""
+import threading
+import time
+from flask_jwt_extended import JWTManager
+from app.services.cache import LRUCacheBackend
+
+
+class TokenCache:
+    """In-process LRU of encoded token -> verified claims, with hit/miss counters.
+
+    An entry lives for at most ttl seconds and never past the token's own
+    exp, so an expired token always goes through full verification and is
+    rejected. Only successfully verified tokens are stored.
+    """
+
+    def __init__(self, max_entries=10000, ttl=300, enabled=True):
+        self.configure(max_entries, ttl, enabled)
+
+    def configure(self, max_entries=10000, ttl=300, enabled=True):
+        self.store = LRUCacheBackend(max_entries)
+        self.ttl = ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def init_app(self, app):
+        """Configure the cache from the JWT_CACHE_* settings of the app."""
+        self.configure(
+            max_entries=app.config.get('JWT_CACHE_MAX_ENTRIES', 10000),
+            ttl=app.config.get('JWT_CACHE_TTL', 300),
+            enabled=app.config.get('JWT_CACHE_ENABLED', True)
+        )
+
+    def get_or_verify(self, key, verify):
+        """Return the cached claims for key, calling verify on a miss."""
+        if not self.enabled:
+            return verify()
+        claims = self.store.get(key)
+        with self._lock:
+            if claims is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if claims is not None:
+            return dict(claims)
+        claims = verify()
+        ttl = self.ttl
+        if 'exp' in claims:
+            ttl = min(ttl, claims['exp'] - time.time())
+        if ttl > 0:
+            self.store.set(key, dict(claims), ttl)
+        return claims
+
+    def clear(self):
+        self.store.clear()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Return hit/miss counters, the hit ratio and the number of cached tokens."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'entries': len(self.store),
+                'max_entries': self.store.max_entries
+            }
+
+
+token_cache = TokenCache()
+
+
+# Every decode goes through this method: flask_jwt_extended.decode_token and
+# verify_jwt_in_request (which imports decode_token by name) both call it.
+# It is private, hence the version pin in requirements.txt and this check.
+if not callable(getattr(JWTManager, '_decode_jwt_from_config', None)):
+    raise RuntimeError('This flask-jwt-extended has no JWTManager._decode_jwt_from_config; '
+                       'install the version pinned in requirements.txt')
+
+
+class CachingJWTManager(JWTManager):
+    """JWTManager that verifies each distinct token once per token_cache entry.
+
+    Blocklist, user lookup and claims checks registered on the manager still
+    run on every request; only signature verification and decoding are
+    cached.
+    """
+
+    def _decode_jwt_from_config(self, encoded_token, csrf_value=None, allow_expired=False):
+        if allow_expired:
+            return super()._decode_jwt_from_config(encoded_token, csrf_value, allow_expired)
+        return token_cache.get_or_verify(
+            (encoded_token, csrf_value),
+            lambda: super(CachingJWTManager, self)._decode_jwt_from_config(encoded_token, csrf_value)
+        )
@@ -0,0 +1,129 @@
+"""
+Password hashing off the request thread, with a bounded queue and tunable cost
+"""
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError
+import bcrypt
+
+
+# Retry-After (seconds) sent with the 503 answering PasswordHasherBusy
+RETRY_AFTER = 1
+
+# Rough duration of one bcrypt hash at cost 12 on a server core; each round doubles it
+COST_12_SECONDS = 0.25
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing queue is full or a hash did not finish in time."""
+
+
+def busy_response():
+    """The API response to PasswordHasherBusy."""
+    return {'error': 'Server busy, please retry later'}, 503, {'Retry-After': str(RETRY_AFTER)}
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check(password, password_hash):
+    return bcrypt.checkpw(password, password_hash)
+
+
+class PasswordHasher:
+    """Run bcrypt in a dedicated worker pool.
+
+    At most max_pending hashes may be queued or running at once; past that
+    hash() and check() raise PasswordHasherBusy immediately instead of
+    tying up another request worker, and views answer busy_response().
+    A hash keeps its slot until bcrypt is done, even once its caller timed
+    out. By default max_pending is the number of hashes the workers can
+    finish within timeout, so a queued hash is rejected rather than left
+    to time out. The pool is created on first use so forked app servers
+    each get their own. With executor 'inline' (the default before
+    init_app, e.g. in the CLI) bcrypt runs on the calling thread.
+    """
+
+    def __init__(self, rounds=12, executor='inline', workers=None, max_pending=None, timeout=10.0):
+        self.configure(rounds, executor, workers, max_pending, timeout)
+
+    def configure(self, rounds=12, executor='inline', workers=None, max_pending=None, timeout=10.0):
+        if executor not in ('process', 'thread', 'inline'):
+            raise ValueError(f"Unknown password hash executor: {executor}")
+        self.shutdown()
+        self.rounds = rounds
+        self.executor = executor
+        self.workers = workers or multiprocessing.cpu_count()
+        self.max_pending = max_pending or max(self.workers, int(
+            self.workers * timeout / (COST_12_SECONDS * 2 ** (rounds - 12))))
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    def init_app(self, app):
+        """Configure the hasher from the BCRYPT_LOG_ROUNDS and PASSWORD_HASH_* settings."""
+        self.configure(
+            rounds=app.config.get('BCRYPT_LOG_ROUNDS', 12),
+            executor=app.config.get('PASSWORD_HASH_EXECUTOR', 'process'),
+            workers=app.config.get('PASSWORD_HASH_WORKERS'),
+            max_pending=app.config.get('PASSWORD_HASH_MAX_PENDING'),
+            timeout=app.config.get('PASSWORD_HASH_TIMEOUT', 10.0)
+        )
+
+    def hash(self, password):
+        """Return the bcrypt hash of password at the configured cost."""
+        return self._run(_hash, password.encode('utf-8'), self.rounds)
+
+    def check(self, password_hash, password):
+        """Whether password matches password_hash."""
+        return self._run(_check, password.encode('utf-8'), password_hash.encode('utf-8'))
+
+    def needs_rehash(self, password_hash):
+        """Whether password_hash was made with a different cost than the configured one."""
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def shutdown(self):
+        pool = getattr(self, '_pool', None)
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _run(self, func, *args):
+        if self.executor == 'inline':
+            return func(*args)
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            raise PasswordHasherBusy("Password hashing queue is full")
+        try:
+            future = self._get_pool().submit(func, *args)
+        except BaseException:
+            slots.release()
+            raise
+        # Released once bcrypt is done (or the queued hash is cancelled), not when we stop waiting
+        future.add_done_callback(lambda _: slots.release())
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise PasswordHasherBusy("Password hashing timed out")
+
+    def _get_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                if self.executor == 'process':
+                    # spawn: forking a multi-threaded server process is unsafe
+                    self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+                else:
+                    # bcrypt releases the GIL, so threads also hash in parallel
+                    self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='password-hash')
+            return self._pool
+
+
+hasher = PasswordHasher()
+atexit.register(hasher.shutdown)
@@ -0,0 +1,183 @@
+"""
+Per-client rate limiting with token buckets, checked before the view runs
+"""
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_jwt_extended.exceptions import JWTExtendedException
+from jwt import PyJWTError
+
+# Budget of the routes without a rate_limit() mark
+DEFAULT_BUDGET = 'default'
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+RETRY_AFTER_MAX = 3600
+
+
+def parse_limit(limit):
+    """Parse 'count/period' (period: second, minute, hour or day) into (tokens per second, capacity)."""
+    count, _, period = limit.partition('/')
+    if period not in PERIODS or not count.strip().isdigit() or int(count) <= 0:
+        raise ValueError(f"Invalid rate limit {limit!r}, expected count/second|minute|hour|day")
+    return int(count) / PERIODS[period], int(count)
+
+
+def rate_limit(budget):
+    """Mark a Resource method as drawing from the named budget of RATE_LIMITS."""
+    def mark(method):
+        method.rate_limit_budget = budget
+        return method
+    return mark
+
+
+class BucketStore:
+    """Token buckets by key; take() is atomic per key."""
+
+    def take(self, key, rate, capacity, cost=1):
+        """Take cost tokens; return (allowed, seconds until cost tokens will be available)."""
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class MemoryBucketStore(BucketStore):
+    """Buckets of this process, least recently used evicted past max_entries.
+
+    An evicted bucket comes back full, so max_entries must exceed the
+    number of clients active within one refill period.
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, capacity, cost=1):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+    def __len__(self):
+        with self._lock:
+            return len(self._buckets)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class RedisBucketStore(BucketStore):
+    """Buckets shared by every worker, updated atomically by a Lua script.
+
+    Any client exposing eval/scan_iter/delete works. Buckets expire once
+    they would be full again.
+    """
+
+    SCRIPT = """
+local rate, capacity, now, cost = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, client, prefix='hbnb:rate:'):
+        self.client = client
+        self.prefix = prefix
+
+    def take(self, key, rate, capacity, cost=1):
+        allowed, tokens = self.client.eval(self.SCRIPT, 1, self.prefix + key, rate, capacity, time.time(), cost)
+        if allowed:
+            return True, 0.0
+        return False, (cost - float(tokens)) / rate
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=self.prefix + '*'))
+        if keys:
+            self.client.delete(*keys)
+
+
+class RateLimiter:
+    """before_request admission control: one token bucket per budget and client.
+
+    The client is the JWT identity when the request carries a valid
+    token, else the remote address: the socket peer, or with
+    TRUSTED_PROXIES set the X-Forwarded-For entry ProxyFix trusts. Each
+    route draws from the budget it is marked with (see rate_limit) or
+    from DEFAULT_BUDGET. The check runs
+    before the body is parsed and the view runs, so a rejected request
+    costs one bucket update; it is answered 429 with Retry-After.
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.store = MemoryBucketStore()
+        self.limits = {}
+
+    def init_app(self, app):
+        """Configure the budgets and the store from the RATE_LIMIT* settings and install the hook."""
+        self.enabled = app.config.get('RATE_LIMIT_ENABLED', True)
+        self.limits = {budget: parse_limit(limit) for budget, limit in app.config.get('RATE_LIMITS', {}).items()}
+        backend = app.config.get('RATE_LIMIT_BACKEND', 'memory')
+        if backend == 'memory':
+            self.store = MemoryBucketStore(app.config.get('RATE_LIMIT_MAX_CLIENTS', 100000))
+        elif backend == 'redis':
+            import redis
+            self.store = RedisBucketStore(redis.Redis.from_url(app.config['RATE_LIMIT_REDIS_URL']))
+        else:
+            raise ValueError(f"Unknown rate limit backend: {backend}")
+        app.before_request(self.check)
+
+    @staticmethod
+    def budget():
+        """Budget of the current request's route."""
+        view = current_app.view_functions.get(request.endpoint)
+        method = getattr(getattr(view, 'view_class', None), request.method.lower(), None)
+        return getattr(method, 'rate_limit_budget', DEFAULT_BUDGET)
+
+    @staticmethod
+    def client():
+        try:
+            if verify_jwt_in_request(optional=True):
+                return f'user:{get_jwt_identity()}'
+        except (JWTExtendedException, PyJWTError):
+            pass  # The view reports the bad token
+        return f'ip:{request.remote_addr}'
+
+    def check(self):
+        if not self.enabled or request.method == 'OPTIONS' or request.endpoint is None:
+            return None
+        budget = self.budget()
+        limit = self.limits.get(budget)
+        if limit is None:
+            return None
+        allowed, retry_after = self.store.take(f'{budget}:{self.client()}', *limit)
+        if allowed:
+            return None
+        retry_after = min(RETRY_AFTER_MAX, max(1, math.ceil(retry_after)))
+        return {'error': 'Too many requests, please retry later'}, 429, {'Retry-After': str(retry_after)}
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,102 @@
+from collections import namedtuple
+from datetime import datetime, timezone
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+from app.models.amenity import Amenity
+from app.models.association_tables import place_amenity_association
+from app.models.place import Place
+
+# Public IDs linked after a change, and those it added and removed
+LinkChange = namedtuple('LinkChange', ('linked', 'added', 'removed'))
+
+# INSERT ... ON CONFLICT DO NOTHING by dialect
+_INSERT_IGNORING_CONFLICTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+links = place_amenity_association.c
+
+
+class AmenityLinkRepository:
+    """Set-based edits of the place_amenity association.
+
+    A change reads the current links of one place (or amenity) once,
+    computes what to add and remove with set operations, then writes
+    them with one INSERT ... ON CONFLICT DO NOTHING and one DELETE, and
+    touches the updated_at of the owner and of every place whose links
+    changed. ORM collections are never loaded; the owner's is expired if
+    the session holds it. The caller commits.
+    """
+
+    # By owner model: (owner key column, owner collection, other model, other key column)
+    SIDES = {
+        Place: (links.place_pk, 'associated_amenities', Amenity, links.amenity_pk),
+        Amenity: (links.amenity_pk, 'places_associated', Place, links.place_pk)
+    }
+
+    def change_place_amenities(self, place_id, add=(), remove=(), replace=None):
+        """Link a place to the amenity IDs of add and unlink it from those of remove.
+
+        With replace, link it to exactly those amenity IDs instead. Returns
+        a LinkChange, or None if the place does not exist; raises
+        ValueError if an amenity does not.
+        """
+        return self._change(Place, place_id, add, remove, replace)
+
+    def change_amenity_places(self, amenity_id, add=(), remove=(), replace=None):
+        """Same as change_place_amenities, from the amenity side."""
+        return self._change(Amenity, amenity_id, add, remove, replace)
+
+    def _change(self, owner_model, owner_id, add, remove, replace):
+        owner_column, collection, other_model, other_column = self.SIDES[owner_model]
+        owner_pk = db.session.scalar(db.select(owner_model.pk).where(owner_model.id == owner_id))
+        if owner_pk is None:
+            return None
+        requested = {*add, *remove, *(replace or ())}
+        keys = dict(db.session.execute(
+            db.select(other_model.id, other_model.pk).where(other_model.id.in_(requested))
+        ).all()) if requested else {}
+        missing = requested - keys.keys()
+        if missing:
+            raise ValueError(f"{other_model.__name__} with ID {sorted(missing)[0]} not found")
+
+        current = dict(db.session.execute(
+            db.select(other_model.id, other_model.pk)
+            .join(place_amenity_association, other_column == other_model.pk)
+            .where(owner_column == owner_pk)
+        ).all())
+        target = set(replace) if replace is not None else (current.keys() | set(add)) - set(remove)
+        added, removed = target - current.keys(), current.keys() - target
+
+        if added:
+            db.session.execute(self._insert_ignoring_conflicts(), [
+                {owner_column.name: owner_pk, other_column.name: keys[other_id]} for other_id in added
+            ])
+        if removed:
+            db.session.execute(delete(place_amenity_association).where(
+                owner_column == owner_pk,
+                other_column.in_([current[other_id] for other_id in removed])
+            ))
+        if added or removed:
+            now = datetime.now(timezone.utc)
+            db.session.execute(update(owner_model).where(owner_model.pk == owner_pk).values(updated_at=now))
+            self._expire(owner_model, owner_pk, collection)
+            if owner_model is Amenity:
+                # Places whose links changed look updated too, e.g. to exports by updated_since
+                changed = [keys[other_id] for other_id in added] + [current[other_id] for other_id in removed]
+                db.session.execute(update(Place).where(Place.pk.in_(changed)).values(updated_at=now))
+        return LinkChange(frozenset(target), frozenset(added), frozenset(removed))
+
+    @staticmethod
+    def _expire(owner_model, owner_pk, collection):
+        """Expire the owner's link collection and updated_at if the session holds the owner."""
+        owner = db.session.identity_map.get(db.session.identity_key(owner_model, owner_pk))
+        if owner is not None:
+            db.session.expire(owner, [collection, 'updated_at'])
+
+    @staticmethod
+    def _insert_ignoring_conflicts():
+        """Insert into place_amenity skipping rows a concurrent transaction already added."""
+        dialect = db.session.get_bind().dialect.name
+        if dialect in _INSERT_IGNORING_CONFLICTS:
+            return _INSERT_IGNORING_CONFLICTS[dialect](place_amenity_association).on_conflict_do_nothing()
+        return insert(place_amenity_association)
@@ -1,10 +1,17 @@
+import math
 from app.models.place import Place
 from app.models.amenity import Amenity
+from app.models.place_rating_stats import PlaceRatingStats
 from app import db
+from app.models.association_tables import place_amenity_association
 from app.persistence.repository import SQLAlchemyRepository
-from sqlalchemy.orm import joinedload
+from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload, lazyload, selectinload
 
 class PlaceRepository(SQLAlchemyRepository):
+    # Accepted values of the sort parameter of get_filtered_page
+    SORT_KEYS = ('created_at', '-created_at', 'price', '-price', 'rating', '-rating')
+
     def __init__(self):
         super().__init__(Place)
 
@@ -12,23 +19,155 @@ class PlaceRepository(SQLAlchemyRepository):
         return self.model.query.filter(Place.price >= min_price, Place.price <= max_price).all()
     
     def get_by_amenity(self, amenity_id):
-        return self.model.query.join(Place.amenities).filter(Amenity.id == amenity_id).all()
+        return self.model.query.join(Place.associated_amenities).filter(Amenity.id == amenity_id).all()
     
     def get_by_owner(self, owner_id):
-        return self.model.query.filter(Place.owner_id == owner_id).all()
+        return self.model.query.filter(Place.user_id == owner_id).all()
     
-    def get_places_by_ids(self, place_ids):
-        """Retrieve places by their IDs."""
-        # Assuming place_ids is a list of integers (IDs of the places)
-        return self.model.query.filter(Place.id.in_(place_ids)).all()
+    def get_places_by_ids(self, place_ids, with_amenities=False, fields=None):
+        """Retrieve places by their IDs, optionally loading their amenities in one query.
+
+        With fields, only what they serialize is loaded (see query_for_fields).
+        """
+        query = self.model.query if fields is None else self.query_for_fields(fields)
+        if with_amenities:
+            query = query.options(selectinload(Place.associated_amenities))
+        return query.filter(Place.id.in_(place_ids)).all()
     
+    def get_filtered_page(self, limit, cursor=None, min_price=None, max_price=None, amenity_ids=None,
+                          amenity_mode='all', sort='created_at', fields=None):
+        """Retrieve one keyset page of places matching the given filters
+
+        Places must offer all (amenity_mode 'all') or any ('any') of
+        amenity_ids, checked with semijoins on the place_amenity indexes.
+        With fields, only what they serialize is loaded.
+        """
+        if sort not in self.SORT_KEYS:
+            raise ValueError(f"Invalid sort, expected one of: {', '.join(self.SORT_KEYS)}")
+        query = self.query_for_fields(fields)
+        field = sort.lstrip('-')
+        if field == 'rating':
+            # Places without reviews rank as 0
+            query = query.outerjoin(PlaceRatingStats, PlaceRatingStats.place_id == Place.id)
+            sort_key = func.coalesce(PlaceRatingStats.average, 0)
+        else:
+            sort_key = getattr(Place, field)
+        if min_price is not None:
+            query = query.filter(Place.price >= min_price)
+        if max_price is not None:
+            query = query.filter(Place.price <= max_price)
+        if amenity_ids:
+            for place_pks in self._amenity_semijoins(amenity_ids, amenity_mode):
+                query = query.filter(Place.pk.in_(place_pks))
+        return self.get_page(limit, cursor, query, sort_key, descending=sort.startswith('-'))
+
+    @staticmethod
+    def _amenity_semijoins(amenity_ids, amenity_mode):
+        """Selects of the place keys linked to any of amenity_ids, or one per amenity for mode 'all'"""
+        links = place_amenity_association.c
+        if amenity_mode == 'any':
+            return [db.select(links.place_pk).where(links.amenity_pk.in_(
+                db.select(Amenity.pk).where(Amenity.id.in_(amenity_ids))
+            ))]
+        return [
+            db.select(links.place_pk).where(
+                links.amenity_pk == db.select(Amenity.pk).where(Amenity.id == amenity_id).scalar_subquery()
+            )
+            for amenity_id in set(amenity_ids)
+        ]
+
+    def query_for_fields(self, fields=None, extra=()):
+        """Query of places loading the columns and relationships serialized for fields (None: all)
+
+        The extra column names are loaded too.
+        """
+        query = self.model.query
+        if fields is None or 'associated_amenities' in fields:
+            query = query.options(selectinload(Place.associated_amenities))
+        if fields is not None and 'rating' not in fields:
+            # rating_stats is eagerly loaded by default
+            query = query.options(lazyload(Place.rating_stats))
+        return self.load_fields(query, fields, extra)
+
+    def get_in_bbox(self, cells, min_lat, min_lon, max_lat, max_lon, limit=None, fields=None, near=None):
+        """Retrieve places inside a bounding box using geohash prefix ranges
+
+        With near, a (latitude, longitude) pair, the places nearest to it
+        come first, by equirectangular distance, and their coordinates are
+        loaded whatever the fields.
+        """
+        # '~' sorts after every geohash character, so [cell, cell + '~') is a prefix range
+        cell_filters = [Place.geohash.between(cell, cell + '~') for cell in cells if cell]
+        query = self.query_for_fields(fields, extra=('latitude', 'longitude') if near else ())
+        if cell_filters:
+            query = query.filter(or_(*cell_filters))
+        query = query.filter(
+            Place.latitude.between(min_lat, max_lat),
+            Place.longitude.between(min_lon, max_lon)
+        )
+        if near is not None:
+            # Squared distance in degrees of latitude: close to the great-circle
+            # order for the radii accepted, and computable by any database
+            latitude, longitude = near
+            scale = math.cos(math.radians(latitude))
+            dlat = Place.latitude - latitude
+            dlon = (Place.longitude - longitude) * scale
+            query = query.order_by(dlat * dlat + dlon * dlon, Place.id)
+        if limit is not None:
+            query = query.limit(limit)
+        return query.all()
+
+    def get_owners_by_ids(self, place_ids):
+        """Map each existing place ID to the ID of its owner, in one query."""
+        if not place_ids:
+            return {}
+        rows = db.session.query(Place.id, Place.user_id).filter(Place.id.in_(place_ids))
+        return {row.id: row.user_id for row in rows}
+
+    def iter_amenity_links(self, batch_size=10000):
+        """Stream every (place_id, amenity_id) row of the association table, as public IDs."""
+        links = place_amenity_association.c
+        result = db.session.execute(
+            db.select(Place.id, Amenity.id)
+            .select_from(place_amenity_association)
+            .join(Place, Place.pk == links.place_pk)
+            .join(Amenity, Amenity.pk == links.amenity_pk)
+            .execution_options(stream_results=True, yield_per=batch_size)
+        )
+        for place_id, amenity_id in result:
+            yield place_id, amenity_id
+
+    def add_amenity_links(self, links):
+        """Insert (place_id, amenity_id) association rows, given as public IDs, with one executemany.
+
+        Both IDs are translated to internal keys first, one query per table;
+        every place and amenity must exist.
+        """
+        if links:
+            place_pks = self.get_internal_keys(Place, {place_id for place_id, _ in links})
+            amenity_pks = self.get_internal_keys(Amenity, {amenity_id for _, amenity_id in links})
+            db.session.execute(
+                place_amenity_association.insert(),
+                [{'place_pk': place_pks[place_id], 'amenity_pk': amenity_pks[amenity_id]}
+                 for place_id, amenity_id in links]
+            )
+
+    @staticmethod
+    def get_internal_keys(model, obj_ids):
+        """Map each existing public ID of model to its internal key, in one query."""
+        rows = db.session.execute(db.select(model.id, model.pk).where(model.id.in_(obj_ids)))
+        return dict(rows.all())
+
     def get_all(self):
         """Retrieve all places with their associated amenities"""
         return self.model.query.options(joinedload(Place.associated_amenities)).all()
     
-    def get(self, place_id):
-        """Retrieve a place by its ID, including associated amenities"""
-        place = self.model.query.options(joinedload(Place.associated_amenities)).filter(Place.id == place_id).first()
+    def get(self, place_id, for_update=False):
+        """Retrieve a place by its ID, including associated amenities, locking its row with for_update"""
+        query = self.model.query.options(joinedload(Place.associated_amenities)).filter(Place.id == place_id)
+        if for_update:
+            query = query.with_for_update(of=Place)
+        place = query.first()
     
         if place:
             return place
@@ -0,0 +1,100 @@
+from app.models.place import Place
+from app.models.place_rating_stats import PlaceRatingStats, RATING_VALUES
+from app.models.review import Review
+from app import db
+from app.persistence.repository import SQLAlchemyRepository
+from sqlalchemy import Float, case, cast, func, update
+from sqlalchemy.exc import IntegrityError
+
+class RatingStatsRepository(SQLAlchemyRepository):
+    def __init__(self):
+        super().__init__(PlaceRatingStats)
+
+    def add_empty(self, place_ids):
+        """Insert zeroed aggregates for places already inserted, so their first reviews only UPDATE them."""
+        self.bulk_insert([{'place_id': place_id} for place_id in place_ids])
+
+    def record_change(self, place_id, added=None, removed=None):
+        """Apply one review rating change to the aggregates of a place.
+
+        added is the rating of a created review (or the new rating of an
+        updated one), removed the rating of a deleted review (or the old
+        rating of an updated one). The update is a single atomic UPDATE, so
+        concurrent reviews on the same place cannot lose increments.
+        The review change must already be flushed. The caller commits.
+        """
+        if added == removed:
+            return
+        count_delta = (added is not None) - (removed is not None)
+        sum_delta = (added or 0) - (removed or 0)
+        new_count = PlaceRatingStats.review_count + count_delta
+        values = {
+            PlaceRatingStats.review_count: new_count,
+            PlaceRatingStats.rating_sum: PlaceRatingStats.rating_sum + sum_delta,
+            PlaceRatingStats.average: case(
+                (new_count > 0, cast(PlaceRatingStats.rating_sum + sum_delta, Float) / new_count),
+                else_=None
+            )
+        }
+        if added is not None:
+            column = PlaceRatingStats.histogram_column(added)
+            values[column] = column + 1
+        if removed is not None:
+            column = PlaceRatingStats.histogram_column(removed)
+            values[column] = column - 1
+
+        statement = update(PlaceRatingStats).where(PlaceRatingStats.place_id == place_id).values(values)
+        if db.session.execute(statement).rowcount == 0:
+            # Place created before aggregates existed: build its row from its
+            # reviews, unless a concurrent review inserts it first
+            try:
+                with db.session.begin_nested():
+                    self.reconcile([place_id])
+            except IntegrityError:
+                db.session.execute(statement)
+
+    def reconcile(self, place_ids=None):
+        """Recompute aggregates from the reviews table and fix drifted rows.
+
+        Limited to the given places when place_ids is not None. Places
+        without reviews keep a zeroed row; over all places, those missing
+        one get it. Returns the number of rows inserted or updated. The
+        caller commits.
+        """
+        query = db.session.query(
+            Review.place_id,
+            func.count(Review.id),
+            func.sum(Review.rating),
+            *(func.sum(case((Review.rating == rating, 1), else_=0)) for rating in RATING_VALUES)
+        ).group_by(Review.place_id)
+        existing_query = PlaceRatingStats.query
+        if place_ids is not None:
+            place_ids = list(place_ids)
+            query = query.filter(Review.place_id.in_(place_ids))
+            existing_query = existing_query.filter(PlaceRatingStats.place_id.in_(place_ids))
+
+        fresh = {}
+        for row_place_id, count, total, *histogram in query:
+            values = {'review_count': count, 'rating_sum': total, 'average': total / count}
+            values.update({f'rating_{rating}': histogram[i] for i, rating in enumerate(RATING_VALUES)})
+            fresh[row_place_id] = values
+
+        empty = dict({'review_count': 0, 'rating_sum': 0, 'average': None},
+                     **{f'rating_{rating}': 0 for rating in RATING_VALUES})
+        fixed = 0
+        for stats in existing_query.all():
+            values = fresh.pop(stats.place_id, empty)
+            if any(getattr(stats, key) != value for key, value in values.items()):
+                for key, value in values.items():
+                    setattr(stats, key, value)
+                fixed += 1
+        for row_place_id, values in fresh.items():
+            db.session.add(PlaceRatingStats(place_id=row_place_id, **values))
+            fixed += 1
+        if place_ids is None:
+            missing = db.session.scalars(
+                db.select(Place.id).outerjoin(PlaceRatingStats).where(PlaceRatingStats.place_id.is_(None))
+            ).all()
+            self.add_empty(missing)
+            fixed += len(missing)
+        return fixed
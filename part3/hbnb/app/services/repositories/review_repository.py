@@ -1,6 +1,7 @@
 from app.models.review import Review
 from app import db
 from app.persistence.repository import SQLAlchemyRepository
+from sqlalchemy.orm import selectinload
 
 class ReviewRepository(SQLAlchemyRepository):
     def __init__(self):
@@ -10,6 +11,32 @@ class ReviewRepository(SQLAlchemyRepository):
         # Query the reviews table to get all reviews for a given place
         return db.session.query(Review).filter(Review.place_id == place_id).all()
 
+    def get_page_by_place(self, place_id, limit, cursor=None, with_author=False, fields=None):
+        """Retrieve one keyset page of a place's reviews, optionally with authors and only some columns"""
+        query = self.model.query.filter(Review.place_id == place_id)
+        if with_author:
+            # One batched IN query for all authors of the page
+            query = query.options(selectinload(Review.author))
+        query = self.load_fields(query, fields, extra=('user_id',) if with_author else ())
+        return self.get_page(limit, cursor, query)
+
     def get_review_by_user_and_place(self, user_id, place_id):
         # Check if a review already exists for the user on the specified place
         return self.model.query.filter_by(user_id=user_id, place_id=place_id).first()
+
+    def has_reviewed(self, user_id, place_id):
+        """Whether the user already reviewed the place: one probe of the (user_id, place_id) unique index."""
+        return db.session.query(
+            db.exists().where(Review.user_id == user_id, Review.place_id == place_id)
+        ).scalar()
+
+    def get_reviewed_pairs(self, pairs):
+        """Return the (user_id, place_id) pairs that already have a review."""
+        if not pairs:
+            return set()
+        user_ids = {user_id for user_id, _ in pairs}
+        place_ids = {place_id for _, place_id in pairs}
+        rows = db.session.query(Review.user_id, Review.place_id).filter(
+            Review.user_id.in_(user_ids), Review.place_id.in_(place_ids)
+        )
+        return {(row.user_id, row.place_id) for row in rows} & set(pairs)
@@ -11,3 +11,7 @@ class UserRepository(SQLAlchemyRepository):
     
     def get_user_by_id(self, user_id):
         return self.model.query.filter_by(id=user_id).first()
+
+    def get_users_by_ids(self, user_ids, fields=None):
+        """Retrieve users by their IDs in one query, loading only the columns of fields if given."""
+        return self.load_fields(self.model.query, fields).filter(User.id.in_(user_ids)).all()
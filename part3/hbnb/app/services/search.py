@@ -0,0 +1,297 @@
+"""
+Full-text search over place titles, descriptions and review text
+"""
+import re
+from sqlalchemy import bindparam, text
+from sqlalchemy.engine import make_url
+from app import db
+from app.models.place import Place
+from app.models.review import Review
+
+MAX_QUERY_TERMS = 8
+INDEX_BATCH_SIZE = 1000
+
+
+def query_terms(query):
+    """Split a user query into at most MAX_QUERY_TERMS lowercase words.
+
+    Returns (terms, prefix): prefix is True when the query ends with '*',
+    asking for the last word to be matched as a prefix. Prefix matching is
+    opt-in because expanding a long common prefix is far slower than
+    looking up a word.
+    """
+    terms = re.findall(r'\w+', query.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        raise ValueError("Search query must contain at least one word")
+    return terms, query.rstrip().endswith('*')
+
+
+def place_documents(place_ids):
+    """Map each existing place ID to its (title, description, review text) document."""
+    place_ids = list(place_ids)
+    documents = {
+        row.id: [row.title, row.description or '', []]
+        for row in db.session.query(Place.id, Place.title, Place.description).filter(Place.id.in_(place_ids))
+    }
+    for row in db.session.query(Review.place_id, Review.text).filter(Review.place_id.in_(place_ids)):
+        if row.place_id in documents:
+            documents[row.place_id][2].append(row.text)
+    return {place_id: (title, description, '\n'.join(reviews))
+            for place_id, (title, description, reviews) in documents.items()}
+
+
+class SearchBackend:
+    """Interface of a full-text index of places.
+
+    Index maintenance runs on the caller's session, inside its
+    transaction, so the index commits or rolls back with the write that
+    changed the place or its reviews.
+    """
+
+    def create_schema(self):
+        raise NotImplementedError
+
+    def index_places(self, place_ids):
+        """Add or refresh the documents of place_ids; deleted places are dropped."""
+        raise NotImplementedError
+
+    def remove_places(self, place_ids):
+        raise NotImplementedError
+
+    def search(self, query, limit, offset=0):
+        """Return [(place_id, score)] best match first; higher scores rank higher."""
+        raise NotImplementedError
+
+    def rebuild(self):
+        """Reindex every place in batches and return the number of places indexed."""
+        total = 0
+        last_id = ''
+        while True:
+            place_ids = [row.id for row in db.session.query(Place.id).filter(Place.id > last_id)
+                         .order_by(Place.id).limit(INDEX_BATCH_SIZE)]
+            if not place_ids:
+                return total
+            self.index_places(place_ids)
+            total += len(place_ids)
+            last_id = place_ids[-1]
+
+
+class NullSearchBackend(SearchBackend):
+    """Backend that indexes nothing and finds nothing, used to disable search."""
+
+    def create_schema(self):
+        pass
+
+    def index_places(self, place_ids):
+        pass
+
+    def remove_places(self, place_ids):
+        pass
+
+    def search(self, query, limit, offset=0):
+        query_terms(query)
+        return []
+
+    def rebuild(self):
+        return 0
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """SQLite FTS5 index ranked with bm25, title weighted above description and reviews.
+
+    FTS5 rows are keyed by an integer rowid, so place_search_docs maps
+    each place ID to the rowid of its document. Only the max_candidates
+    most recently indexed matches are ranked (all of them with 0): this
+    bounds the cost of queries on very common terms, but can leave their
+    best older matches out. Prefix indexes keep two and three letter
+    prefix queries cheap.
+    """
+
+    # bm25 column weights: title, description, reviews
+    WEIGHTS = (10.0, 4.0, 1.0)
+
+    def __init__(self, max_candidates=10000):
+        self.max_candidates = max_candidates
+
+    def create_schema(self):
+        db.session.execute(text(
+            'CREATE TABLE IF NOT EXISTS place_search_docs ('
+            'id INTEGER PRIMARY KEY, place_id VARCHAR(36) NOT NULL UNIQUE)'
+        ))
+        db.session.execute(text(
+            'CREATE VIRTUAL TABLE IF NOT EXISTS place_search USING fts5('
+            "title, description, reviews, tokenize='porter unicode61', prefix='2 3')"
+        ))
+
+    def index_places(self, place_ids):
+        place_ids = set(place_ids)
+        if not place_ids:
+            return
+        db.session.flush()
+        documents = place_documents(place_ids)
+        self.remove_places(place_ids - documents.keys())
+        if not documents:
+            return
+        db.session.execute(text('INSERT OR IGNORE INTO place_search_docs (place_id) VALUES (:place_id)'),
+                           [{'place_id': place_id} for place_id in documents])
+        rowids = self._rowids(documents)
+        db.session.execute(text('DELETE FROM place_search WHERE rowid IN :rowids')
+                           .bindparams(bindparam('rowids', expanding=True)),
+                           {'rowids': list(rowids.values())})
+        db.session.execute(
+            text('INSERT INTO place_search (rowid, title, description, reviews) '
+                 'VALUES (:rowid, :title, :description, :reviews)'),
+            [{'rowid': rowids[place_id], 'title': title, 'description': description, 'reviews': reviews}
+             for place_id, (title, description, reviews) in documents.items()]
+        )
+
+    def remove_places(self, place_ids):
+        rowids = self._rowids(place_ids)
+        if not rowids:
+            return
+        params = {'rowids': list(rowids.values())}
+        for statement in ('DELETE FROM place_search WHERE rowid IN :rowids',
+                          'DELETE FROM place_search_docs WHERE id IN :rowids'):
+            db.session.execute(text(statement).bindparams(bindparam('rowids', expanding=True)), params)
+
+    def search(self, query, limit, offset=0):
+        terms, prefix = query_terms(query)
+        # Quoted terms are matched literally, so user input cannot inject FTS5 syntax
+        match = ' '.join(f'"{term}"' for term in terms) + ('*' if prefix else '')
+        cut = ''
+        if self.max_candidates:
+            # FTS5 walks matches in rowid order and applies rowid bounds itself,
+            # so both the cut-off lookup and the ranking stop after max_candidates
+            cut = ('AND place_search.rowid >= (SELECT min(rowid) FROM (SELECT rowid FROM place_search '
+                   'WHERE place_search MATCH :match ORDER BY rowid DESC LIMIT :max_candidates)) ')
+        rows = db.session.execute(text(
+            'SELECT d.place_id, bm25(place_search, :w_title, :w_description, :w_reviews) AS score '
+            'FROM place_search JOIN place_search_docs d ON d.id = place_search.rowid '
+            'WHERE place_search MATCH :match ' + cut +
+            'ORDER BY score, d.place_id LIMIT :limit OFFSET :offset'
+        ), {'match': match, 'max_candidates': self.max_candidates, 'limit': limit, 'offset': offset,
+            'w_title': self.WEIGHTS[0], 'w_description': self.WEIGHTS[1], 'w_reviews': self.WEIGHTS[2]})
+        # bm25 is negative, lower is better
+        return [(place_id, -score) for place_id, score in rows]
+
+    def _rowids(self, place_ids):
+        place_ids = list(place_ids)
+        if not place_ids:
+            return {}
+        rows = db.session.execute(
+            text('SELECT place_id, id FROM place_search_docs WHERE place_id IN :place_ids')
+            .bindparams(bindparam('place_ids', expanding=True)),
+            {'place_ids': place_ids}
+        )
+        return dict(rows.all())
+
+
+class PostgresSearchBackend(SearchBackend):
+    """Postgres tsvector index with a GIN index, ranked with ts_rank_cd.
+
+    Title, description and reviews get weights A, B and C. Only the
+    max_candidates newest matching places are ranked (all of them with
+    0; place IDs are time-ordered), so very common terms cannot make a
+    query rank the whole table, at the cost of leaving their best older
+    matches out.
+    """
+
+    def __init__(self, language='english', max_candidates=10000):
+        self.language = language
+        self.max_candidates = max_candidates
+
+    def create_schema(self):
+        db.session.execute(text(
+            'CREATE TABLE IF NOT EXISTS place_search ('
+            'place_id VARCHAR(36) PRIMARY KEY REFERENCES places (id) ON DELETE CASCADE, '
+            'document TSVECTOR NOT NULL)'
+        ))
+        db.session.execute(text(
+            'CREATE INDEX IF NOT EXISTS ix_place_search_document ON place_search USING GIN (document)'
+        ))
+
+    def index_places(self, place_ids):
+        place_ids = set(place_ids)
+        if not place_ids:
+            return
+        db.session.flush()
+        documents = place_documents(place_ids)
+        self.remove_places(place_ids - documents.keys())
+        if not documents:
+            return
+        db.session.execute(text(
+            'INSERT INTO place_search (place_id, document) VALUES (:place_id, '
+            "setweight(to_tsvector(CAST(:language AS regconfig), :title), 'A') || "
+            "setweight(to_tsvector(CAST(:language AS regconfig), :description), 'B') || "
+            "setweight(to_tsvector(CAST(:language AS regconfig), :reviews), 'C')) "
+            'ON CONFLICT (place_id) DO UPDATE SET document = EXCLUDED.document'
+        ), [{'place_id': place_id, 'language': self.language, 'title': title,
+             'description': description, 'reviews': reviews}
+            for place_id, (title, description, reviews) in documents.items()])
+
+    def remove_places(self, place_ids):
+        place_ids = list(place_ids)
+        if place_ids:
+            db.session.execute(text('DELETE FROM place_search WHERE place_id IN :place_ids')
+                               .bindparams(bindparam('place_ids', expanding=True)),
+                               {'place_ids': place_ids})
+
+    def search(self, query, limit, offset=0):
+        terms, prefix = query_terms(query)
+        # Every term must match
+        tsquery = ' & '.join(terms) + (':*' if prefix else '')
+        cut = 'ORDER BY place_id DESC LIMIT :max_candidates' if self.max_candidates else ''
+        rows = db.session.execute(text(
+            'WITH q AS (SELECT to_tsquery(CAST(:language AS regconfig), :tsquery) AS query), '
+            'candidates AS (SELECT place_id, document FROM place_search, q '
+            'WHERE document @@ q.query ' + cut + ') '
+            'SELECT place_id, ts_rank_cd(document, q.query) AS score FROM candidates, q '
+            'ORDER BY score DESC, place_id LIMIT :limit OFFSET :offset'
+        ), {'language': self.language, 'tsquery': tsquery, 'max_candidates': self.max_candidates,
+            'limit': limit, 'offset': offset})
+        return [(place_id, score) for place_id, score in rows]
+
+
+class SearchIndex:
+    """Front of the configured search backend.
+
+    SEARCH_BACKEND 'auto' picks FTS5 on SQLite and tsvector on Postgres;
+    'sqlite', 'postgres' and 'none' force a backend.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend or NullSearchBackend()
+
+    def init_app(self, app):
+        """Select the backend from SEARCH_BACKEND and the database URL of the app."""
+        backend = app.config.get('SEARCH_BACKEND', 'auto')
+        if backend == 'auto':
+            backend = make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+            backend = {'postgresql': 'postgres'}.get(backend, backend)
+        max_candidates = app.config.get('SEARCH_MAX_CANDIDATES', 10000)
+        if backend == 'sqlite':
+            self.backend = SQLiteSearchBackend(max_candidates)
+        elif backend == 'postgres':
+            self.backend = PostgresSearchBackend(app.config.get('SEARCH_LANGUAGE', 'english'), max_candidates)
+        elif backend == 'none':
+            self.backend = NullSearchBackend()
+        else:
+            raise ValueError(f"Unknown search backend: {backend}")
+
+    def create_schema(self):
+        self.backend.create_schema()
+
+    def index_places(self, place_ids):
+        self.backend.index_places(place_ids)
+
+    def remove_places(self, place_ids):
+        self.backend.remove_places(place_ids)
+
+    def search(self, query, limit, offset=0):
+        return self.backend.search(query, limit, offset)
+
+    def rebuild(self):
+        return self.backend.rebuild()
+
+
+search_index = SearchIndex()
@@ -0,0 +1,11 @@
+"""
+Reproducible load benchmarks for the HBnB API
+
+    python -m benchmarks run --users 200 --places 2000 --reviews 10000 \
+        --scenario mixed --requests 2000 --output before.json
+
+Seeds a throwaway database with a deterministic synthetic dataset, drives
+the app through a weighted request mix and writes latency percentiles,
+throughput and SQL queries per request as JSON, so runs on two commits can
+be compared with `python -m benchmarks compare before.json after.json`.
+"""
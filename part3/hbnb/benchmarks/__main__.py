@@ -0,0 +1,371 @@
+"""
+Command line entry point: python -m benchmarks run|search|replicas|serialization|indexes|keys|coalesce|compare
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='HBnB API load benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='Seed a database, replay a scenario and report JSON')
+    run_parser.add_argument('--database-url', help='Empty scratch database (default: temporary SQLite file)')
+    run_parser.add_argument('--users', type=int, default=100)
+    run_parser.add_argument('--places', type=int, default=1000)
+    run_parser.add_argument('--amenities', type=int, default=20)
+    run_parser.add_argument('--reviews', type=int, default=5000)
+    run_parser.add_argument('--seed', type=int, default=42)
+    run_parser.add_argument('--scenario', default='mixed')
+    run_parser.add_argument('--requests', type=int, default=1000)
+    run_parser.add_argument('--warmup', type=int, default=50)
+    run_parser.add_argument('--concurrency', type=int, default=1)
+    run_parser.add_argument('--target', choices=('test_client', 'wsgi_server'), default='test_client')
+    run_parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+
+    search_parser = commands.add_parser('search', help='Time full-text search queries on a seeded database')
+    search_parser.add_argument('--database-url', help='Empty scratch database (default: temporary SQLite file)')
+    search_parser.add_argument('--places', type=int, default=100000)
+    search_parser.add_argument('--reviews', type=int, default=100000)
+    search_parser.add_argument('--repeat', type=int, default=50)
+    search_parser.add_argument('--seed', type=int, default=42)
+    search_parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+
+    replicas_parser = commands.add_parser(
+        'replicas', help='Check read-replica routing with two SQLite files as primary and replica')
+    replicas_parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+
+    serialization_parser = commands.add_parser(
+        'serialization', help='Compare response serialization CPU time per JSON backend')
+    serialization_parser.add_argument('--database-url', help='Empty scratch database (default: temporary SQLite file)')
+    serialization_parser.add_argument('--places', type=int, default=2000)
+    serialization_parser.add_argument('--limit', type=int, default=100)
+    serialization_parser.add_argument('--repeat', type=int, default=200)
+    serialization_parser.add_argument('--seed', type=int, default=42)
+    serialization_parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+
+    indexes_parser = commands.add_parser(
+        'indexes', help='EXPLAIN the hot lookups on a seeded database and fail if one does not use its index')
+    indexes_parser.add_argument('--database-url', help='Empty scratch database (default: temporary SQLite file)')
+    indexes_parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+
+    keys_parser = commands.add_parser(
+        'keys', help='Compare index size and join speed of integer and UUID string keys on a seeded database')
+    keys_parser.add_argument('--database-url', help='Empty scratch database (default: temporary SQLite file)')
+    keys_parser.add_argument('--places', type=int, default=50000)
+    keys_parser.add_argument('--amenities', type=int, default=40)
+    keys_parser.add_argument('--amenities-per-place', type=int, default=5)
+    keys_parser.add_argument('--ids', type=int, default=200000, help='IDs inserted per UUID version')
+    keys_parser.add_argument('--repeat', type=int, default=200)
+    keys_parser.add_argument('--seed', type=int, default=42)
+    keys_parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+
+    coalesce_parser = commands.add_parser(
+        'coalesce', help='Check that concurrent identical place reads cost one database load')
+    coalesce_parser.add_argument('--database-url', help='Empty scratch database (default: temporary SQLite file)')
+    coalesce_parser.add_argument('--clients', type=int, default=50, help='Concurrent requests per burst')
+    coalesce_parser.add_argument('--query-delay-ms', type=int, default=50, help='Added to each SELECT on places')
+    coalesce_parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+
+    compare_parser = commands.add_parser('compare', help='Compare two JSON reports')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+
+    args = parser.parse_args(argv)
+    if args.command == 'compare':
+        return compare(args.baseline, args.candidate)
+    if args.command == 'search':
+        return search(args)
+    if args.command == 'replicas':
+        return replicas(args)
+    if args.command == 'serialization':
+        return serialization(args)
+    if args.command == 'indexes':
+        return indexes(args)
+    if args.command == 'keys':
+        return keys(args)
+    if args.command == 'coalesce':
+        return coalesce(args)
+    return run(args)
+
+
+def _scratch_app(database_url):
+    """Create the app on database_url (default: a temporary SQLite file), which must be empty."""
+    if not database_url:
+        database_url = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='hbnb-bench-'), 'bench.db')
+    # config.py reads DATABASE_URL at import time
+    os.environ['DATABASE_URL'] = database_url
+    os.environ.setdefault('SLOW_QUERY_THRESHOLD_MS', '1000')
+    # Every simulated client shares one address
+    os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+
+    from app import create_app, db
+    from app.models.user import User
+
+    app = create_app()
+    with app.app_context():
+        if db.session.query(User.id).first() is not None:
+            sys.exit('Database is not empty; point --database-url at a scratch database')
+    return app
+
+
+def _write(report, output):
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+
+def search(args):
+    app = _scratch_app(args.database_url)
+    from app import db
+    from benchmarks import dataset, search as search_benchmark
+
+    with app.app_context():
+        started = time.perf_counter()
+        dataset.seed(users=1000, places=args.places, amenities=20, reviews=args.reviews, seed=args.seed)
+        seed_seconds = time.perf_counter() - started
+        results = search_benchmark.run(repeat=args.repeat)
+        dialect = db.engine.dialect.name
+
+    _write({
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'database': dialect,
+            'search_backend': app.config.get('SEARCH_BACKEND'),
+            'places': args.places,
+            'reviews': args.reviews,
+            'seed_seconds': round(seed_seconds, 1)
+        },
+        'queries': results
+    }, args.output)
+    return 0
+
+
+def replicas(args):
+    directory = tempfile.mkdtemp(prefix='hbnb-replicas-')
+    primary = os.path.join(directory, 'primary.db')
+    replica = os.path.join(directory, 'replica.db')
+    # config.py reads these at import time
+    os.environ['DATABASE_URL'] = f'sqlite:///{primary}'
+    os.environ['DATABASE_REPLICA_URLS'] = f'sqlite:///{replica}'
+    os.environ.setdefault('RATE_LIMIT_ENABLED', 'false')
+    from app import create_app, db
+    from benchmarks import dataset, replicas as replica_check
+
+    app = create_app()
+    # Seeding only writes to the primary; the replica is a snapshot taken afterwards
+    with app.app_context():
+        data = dataset.seed(users=10, places=100, amenities=5, reviews=100, seed=42)
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+    shutil.copyfile(primary, replica)
+
+    _write({
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'primary': primary,
+            'replica': replica
+        },
+        'steps': replica_check.run(app, data)
+    }, args.output)
+    return 0
+
+
+def serialization(args):
+    app = _scratch_app(args.database_url)
+    from app import db
+    from benchmarks import dataset, serialization as serialization_benchmark
+
+    with app.app_context():
+        dataset.seed(users=100, places=args.places, amenities=20, reviews=args.places * 2, seed=args.seed)
+        dialect = db.engine.dialect.name
+    results = serialization_benchmark.run(app, limit=args.limit, repeat=args.repeat)
+
+    _write({
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'database': dialect,
+            'places': args.places
+        },
+        **results
+    }, args.output)
+    return 0
+
+
+def indexes(args):
+    app = _scratch_app(args.database_url)
+    from app import db
+    from benchmarks import dataset, indexes as index_check
+
+    with app.app_context():
+        data = dataset.seed(users=50, places=500, amenities=10, reviews=2000, seed=42)
+        results = index_check.run(data)
+        dialect = db.engine.dialect.name
+
+    _write({
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'database': dialect
+        },
+        'checks': results
+    }, args.output)
+    return 0 if all(check['uses_index'] for check in results.values()) else 1
+
+
+def keys(args):
+    app = _scratch_app(args.database_url)
+    from app import db
+    from benchmarks import dataset, keys as key_benchmark
+
+    with app.app_context():
+        data = dataset.seed(users=100, places=args.places, amenities=args.amenities, reviews=0,
+                            amenities_per_place=args.amenities_per_place, seed=args.seed)
+        results = key_benchmark.run(data, repeat=args.repeat, ids=args.ids, seed=args.seed)
+        dialect = db.engine.dialect.name
+
+    _write({
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'database': dialect,
+            'places': args.places,
+            'amenities': args.amenities,
+            'amenities_per_place': args.amenities_per_place
+        },
+        **results
+    }, args.output)
+    return 0
+
+
+def coalesce(args):
+    app = _scratch_app(args.database_url)
+    from app import db
+    from benchmarks import coalescing, dataset
+
+    with app.app_context():
+        data = dataset.seed(users=10, places=100, amenities=10, reviews=200, seed=42)
+        dialect = db.engine.dialect.name
+    results = coalescing.run(app, data, clients=args.clients, query_delay_ms=args.query_delay_ms)
+
+    _write({
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'database': dialect,
+            'cache_backend': app.config.get('CACHE_BACKEND'),
+            'clients': args.clients,
+            'query_delay_ms': args.query_delay_ms
+        },
+        'bursts': results
+    }, args.output)
+    return 0 if all(burst['passed'] for burst in results.values()) else 1
+
+
+def run(args):
+    app = _scratch_app(args.database_url)
+    from flask_jwt_extended import create_access_token
+    from app import db
+    from benchmarks import dataset, runner
+    from benchmarks.scenarios import Workload
+
+    with app.app_context():
+        data = dataset.seed(users=args.users, places=args.places, amenities=args.amenities,
+                            reviews=args.reviews, seed=args.seed)
+        tokens = {user_id: create_access_token(identity=user_id) for user_id, _ in data['users']}
+        dialect = db.engine.dialect.name
+
+    workload = Workload(args.scenario, data, tokens, seed=args.seed)
+    target_class = runner.WSGIServerTarget if args.target == 'wsgi_server' else runner.TestClientTarget
+    with target_class(app) as target:
+        results = runner.run(target, workload, args.requests, args.concurrency, args.warmup)
+
+    report = {
+        'meta': {
+            'commit': _git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'cpus': os.cpu_count(),
+            'database': dialect,
+            'target': args.target,
+            'scenario': args.scenario,
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'concurrency': args.concurrency,
+            'seed': args.seed,
+            'dataset': {'users': args.users, 'places': args.places,
+                        'amenities': args.amenities, 'reviews': args.reviews},
+            'cache_backend': app.config.get('CACHE_BACKEND'),
+            'bcrypt_rounds': app.config.get('BCRYPT_LOG_ROUNDS'),
+            'password_hash_executor': app.config.get('PASSWORD_HASH_EXECUTOR')
+        },
+        **results
+    }
+    for summary in [report['overall'], *report['actions'].values()]:
+        if summary['throughput_rps'] is not None:
+            summary['throughput_rps_per_core'] = round(summary['throughput_rps'] / (os.cpu_count() or 1), 2)
+    _write(report, args.output)
+    return 0
+
+
+def compare(baseline_path, candidate_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(candidate_path) as f:
+        candidate = json.load(f)
+    print(f"{'action':<16}{'metric':<14}{'baseline':>12}{'candidate':>12}{'change':>10}")
+    for action in ['overall'] + sorted(set(baseline['actions']) | set(candidate['actions'])):
+        before = baseline if action == 'overall' else baseline['actions'].get(action)
+        after = candidate if action == 'overall' else candidate['actions'].get(action)
+        if action == 'overall':
+            before, after = before['overall'], after['overall']
+        if not before or not after:
+            continue
+        for label, path in (('p50 ms', ('latency_ms', 'p50')), ('p95 ms', ('latency_ms', 'p95')),
+                            ('p99 ms', ('latency_ms', 'p99')), ('req/s', ('throughput_rps',)),
+                            ('req/s/core', ('throughput_rps_per_core',)),
+                            ('queries/req', ('queries_per_request', 'mean'))):
+            old, new = _lookup(before, path), _lookup(after, path)
+            change = f'{(new - old) / old * 100:+.1f}%' if old and new is not None else '-'
+            print(f'{action:<16}{label:<14}{_fmt(old):>12}{_fmt(new):>12}{change:>10}')
+    return 0
+
+
+def _lookup(summary, path):
+    for key in path:
+        summary = summary.get(key) if summary else None
+    return summary
+
+
+def _fmt(value):
+    return '-' if value is None else f'{value:.2f}'
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == '__main__':
+    sys.exit(main())
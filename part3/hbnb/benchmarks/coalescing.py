@@ -0,0 +1,97 @@
+"""
+Single-flight check: N concurrent identical GET /places/<id> and the place queries they cost
+"""
+import json
+import threading
+import time
+from sqlalchemy import event
+from app import db
+from app.services.cache import cache, place_key
+from benchmarks.runner import WSGIServerTarget
+
+
+def _is_place_load(statement):
+    return statement.lstrip().upper().startswith('SELECT') and 'FROM places' in statement
+
+
+def _burst(target, path, clients):
+    """Send clients GET path at once, one thread and connection each; return (status, ETag) per request."""
+    barrier = threading.Barrier(clients)
+    results = [None] * clients
+
+    def one(index):
+        barrier.wait()
+        status, headers = target.request('GET', path, {}, None)
+        results[index] = (status, headers.get('ETag'))
+    threads = [threading.Thread(target=one, args=(index,)) for index in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def _expire(key):
+    """Make the cached record of key stale without dropping it, as if its TTL had just passed.
+
+    Returns False if the backend holds no record of key (CACHE_BACKEND null).
+    """
+    cached = cache.backend.get(key)
+    if cached is None:
+        return False
+    record = json.loads(cached)
+    record[0] = time.time() - 1
+    cache.backend.set(key, json.dumps(record), cache.ttl + cache.stale_ttl)
+    return True
+
+
+def run(app, data, clients=50, query_delay_ms=50):
+    """Replay a cold-cache and a stale-entry burst of clients identical reads of one place.
+
+    Each SELECT on places is slowed down by query_delay_ms so the requests
+    overlap the load, as with a busy database. A burst passes when it
+    costs the place queries of a single load: one request reads the
+    database, the others wait for its result (cold) or get the stale
+    entry meanwhile (stale). Served over a threaded WSGI server.
+    """
+    place_id = data['places'][0][0]
+    path = f'/api/v1/places/{place_id}'
+    with app.app_context():
+        engine = db.engine
+    place_queries = []
+
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        if _is_place_load(statement):
+            place_queries.append(statement)
+            time.sleep(query_delay_ms / 1000)
+    event.listen(engine, 'before_cursor_execute', listener)
+    report = {}
+    try:
+        with WSGIServerTarget(app) as target:
+            cache.clear()
+            target.request('GET', path, {}, None)
+            queries_per_load = len(place_queries)
+
+            for label, prepare in (('cold', cache.clear), ('stale', lambda: _expire(place_key(place_id)))):
+                if prepare() is False:
+                    report[label] = {'skipped': 'the cache backend stores nothing', 'passed': True}
+                    continue
+                place_queries.clear()
+                cache.reset_stats()
+                started = time.perf_counter()
+                results = _burst(target, path, clients)
+                stats = cache.stats()
+                report[label] = {
+                    'requests': clients,
+                    'statuses': sorted({status for status, _ in results}),
+                    'etags': len({etag for _, etag in results}),
+                    'place_queries': len(place_queries),
+                    'place_queries_per_load': queries_per_load,
+                    'db_loads': len(place_queries) / queries_per_load if queries_per_load else None,
+                    'cache': {key: stats[key] for key in ('hits', 'misses', 'stale', 'coalesced')},
+                    'seconds': round(time.perf_counter() - started, 3)
+                }
+                report[label]['passed'] = report[label]['db_loads'] == 1 and report[label]['statuses'] == [200]
+    finally:
+        event.remove(engine, 'before_cursor_execute', listener)
+    return report
@@ -0,0 +1,128 @@
+"""
+Deterministic synthetic dataset for the benchmarks
+"""
+import itertools
+import random
+from app import db
+from app.models.geo import encode_geohash
+from app.models.ids import uuid7
+from app.services.passwords import hasher
+from app.services.search import search_index
+from app.services.repositories.user_repository import UserRepository
+from app.services.repositories.place_repository import PlaceRepository
+from app.services.repositories.review_repository import ReviewRepository
+from app.services.repositories.amenity_repository import AmenityRepository
+from app.services.repositories.rating_stats_repository import RatingStatsRepository
+
+PASSWORD = 'benchmark'
+BATCH_SIZE = 1000
+
+AMENITY_NAMES = ('WiFi', 'Pool', 'Parking', 'Kitchen', 'Air conditioning', 'Heating',
+                 'Washer', 'Dryer', 'TV', 'Gym', 'Hot tub', 'Fireplace')
+REVIEW_TEXTS = ('Great stay, would come back.', 'Clean and quiet.', 'Not as described.',
+                'Perfect location for a weekend.', 'The host was very helpful.')
+# Listing vocabulary, most frequent first: word n is drawn with weight 1/(n+1)
+WORDS = ('room', 'apartment', 'cozy', 'view', 'private', 'bright', 'house', 'center', 'garden', 'quiet',
+         'spacious', 'studio', 'modern', 'beach', 'terrace', 'family', 'charming', 'balcony', 'loft',
+         'historic', 'sunny', 'villa', 'cottage', 'lake', 'mountain', 'river', 'downtown', 'rustic',
+         'luxury', 'pool', 'forest', 'harbour', 'vineyard', 'chalet', 'castle', 'penthouse', 'cabin',
+         'farmhouse', 'lighthouse', 'treehouse', 'houseboat', 'windmill', 'igloo', 'yurt')
+WORD_WEIGHTS = tuple(1 / (rank + 1) for rank in range(len(WORDS)))
+
+
+def seed(users=100, places=1000, amenities=20, reviews=5000, amenities_per_place=4, seed=42):
+    """Insert a synthetic dataset and return the IDs the scenarios need.
+
+    The same arguments always produce the same rows. All users share
+    PASSWORD, hashed once, so seeding cost does not depend on bcrypt.
+    Places are spread over a 10x10 degree area so spatial queries return
+    realistic result sizes; titles and descriptions draw from WORDS with
+    Zipf-like frequencies so search queries range from rare to very common
+    terms. Runs inside an app context on an empty schema.
+    """
+    rng = random.Random(seed)
+    # Separate stream, so listing text does not shift the other generated rows
+    text_rng = random.Random(seed + 1)
+    words = lambda count: ' '.join(text_rng.choices(WORDS, WORD_WEIGHTS, k=count))
+    # Time-ordered like the IDs the app generates, one millisecond apart from a fixed epoch
+    clock = itertools.count(1_700_000_000_000)
+    ids = lambda: str(uuid7(next(clock), rng.getrandbits(74)))
+    password_hash = hasher.hash(PASSWORD)
+
+    user_rows = [{
+        'id': ids(),
+        'first_name': f'User{i}',
+        'last_name': 'Bench',
+        'email': f'user{i}@bench.test',
+        'password_hash': password_hash,
+        'is_admin': i == 0
+    } for i in range(users)]
+    _insert(UserRepository(), user_rows)
+
+    amenity_rows = [{
+        'id': ids(),
+        'name': f'{AMENITY_NAMES[i % len(AMENITY_NAMES)]} {i // len(AMENITY_NAMES) or ""}'.strip(),
+        'description': None
+    } for i in range(amenities)]
+    _insert(AmenityRepository(), amenity_rows)
+
+    place_repo = PlaceRepository()
+    place_rows = []
+    links = []
+    for i in range(places):
+        latitude = round(rng.uniform(40.0, 50.0), 6)
+        longitude = round(rng.uniform(0.5, 10.0), 6)
+        place_id = ids()
+        place_rows.append({
+            'id': place_id,
+            'title': f'{words(3).capitalize()} {i}',
+            'description': words(12),
+            'price': round(rng.uniform(20, 500), 2),
+            'latitude': latitude,
+            'longitude': longitude,
+            'user_id': user_rows[rng.randrange(users)]['id'],
+            'geohash': encode_geohash(latitude, longitude)
+        })
+        chosen = rng.sample(amenity_rows, min(amenities_per_place, amenities))
+        links.extend((place_id, amenity['id']) for amenity in chosen)
+    _insert(place_repo, place_rows)
+    for start in range(0, len(links), BATCH_SIZE):
+        place_repo.add_amenity_links(links[start:start + BATCH_SIZE])
+    db.session.commit()
+
+    review_rows = []
+    reviewed = set()
+    attempts = 0
+    while len(review_rows) < reviews and attempts < reviews * 10:
+        attempts += 1
+        user = user_rows[rng.randrange(users)]
+        place = place_rows[rng.randrange(places)]
+        pair = (user['id'], place['id'])
+        if place['user_id'] == user['id'] or pair in reviewed:
+            continue
+        reviewed.add(pair)
+        review_rows.append({
+            'id': ids(),
+            'text': rng.choice(REVIEW_TEXTS),
+            'rating': rng.randint(1, 5),
+            'user_id': user['id'],
+            'place_id': place['id']
+        })
+    _insert(ReviewRepository(), review_rows)
+    RatingStatsRepository().reconcile()
+    db.session.commit()
+    search_index.rebuild()
+    db.session.commit()
+
+    return {
+        'users': [(row['id'], row['email']) for row in user_rows],
+        'places': [(row['id'], row['user_id']) for row in place_rows],
+        'amenities': [row['id'] for row in amenity_rows],
+        'reviewed': reviewed
+    }
+
+
+def _insert(repo, rows):
+    for start in range(0, len(rows), BATCH_SIZE):
+        repo.bulk_insert(rows[start:start + BATCH_SIZE])
+        db.session.commit()
@@ -0,0 +1,82 @@
+"""
+Index usage check: EXPLAIN the SQL of the hot lookups and look for their index
+"""
+from sqlalchemy import event, inspect, text
+from app import db
+from app.models.place import Place
+from app.services.repositories.place_repository import PlaceRepository
+from app.services.repositories.review_repository import ReviewRepository
+
+
+def checks(data):
+    """(label, table, indexed columns, call) of every lookup that must use an index."""
+    place_id, owner_id = data['places'][0]
+    reviewer_id = data['users'][-1][0]
+    places, reviews = PlaceRepository(), ReviewRepository()
+    return (
+        ('reviews of a place', 'reviews', ('place_id', 'created_at', 'id'),
+         lambda: reviews.get_page_by_place(place_id, 20)),
+        ('already reviewed?', 'reviews', ('user_id', 'place_id'),
+         lambda: reviews.has_reviewed(reviewer_id, place_id)),
+        ('places of an owner', 'places', ('user_id',),
+         lambda: Place.query.filter(Place.user_id == owner_id).all()),
+        ('price range by price', 'places', ('price', 'id'),
+         lambda: places.get_filtered_page(20, min_price=100, max_price=120, sort='price')),
+        ('newest places', 'places', ('created_at', 'id'),
+         lambda: places.get_filtered_page(20)),
+        ('places with an amenity', 'place_amenity', ('amenity_pk',),
+         lambda: places.get_filtered_page(20, amenity_ids=data['amenities'][:1], amenity_mode='any')),
+    )
+
+
+def index_names(connection, table, columns):
+    """Names of the indexes of table on exactly columns, unique constraints included."""
+    if connection.dialect.name == 'sqlite':
+        names = set()
+        for index in connection.exec_driver_sql(f'PRAGMA index_list({table})').mappings():
+            info = connection.exec_driver_sql(f"PRAGMA index_info('{index['name']}')").mappings()
+            if tuple(row['name'] for row in sorted(info, key=lambda row: row['seqno'])) == columns:
+                names.add(index['name'])
+        return names
+    inspector = inspect(connection)
+    indexes = inspector.get_indexes(table) + inspector.get_unique_constraints(table)
+    return {index['name'] for index in indexes if tuple(index['column_names']) == columns}
+
+
+def explain(connection, statement, parameters):
+    if connection.dialect.name == 'sqlite':
+        rows = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters)
+        return [row[-1] for row in rows]
+    return [row[0] for row in connection.exec_driver_sql('EXPLAIN ' + statement, parameters)]
+
+
+def run(data):
+    """EXPLAIN every statement of each check; it passes if one plan names the expected index.
+
+    Runs inside an app context on a seeded database. On PostgreSQL
+    sequential scans are disabled for the session, so small tables still
+    show whether an index can serve the query.
+    """
+    report = {}
+    connection = db.session.connection()
+    if connection.dialect.name == 'postgresql':
+        connection.execute(text('SET LOCAL enable_seqscan = off'))
+    for label, table, columns, call in checks(data):
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+        event.listen(db.engine, 'before_cursor_execute', capture)
+        try:
+            call()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', capture)
+        expected = index_names(connection, table, columns)
+        plans = [explain(connection, statement, parameters) for statement, parameters in statements]
+        used = sorted(name for name in expected if any(name in line for plan in plans for line in plan))
+        report[label] = {
+            'index': sorted(expected),
+            'uses_index': bool(used),
+            'plans': plans
+        }
+    return report
@@ -0,0 +1,157 @@
+"""
+Key layout benchmark: integer keys vs UUID strings in place_amenity, UUIDv7 vs UUIDv4 ID indexes
+"""
+import random
+import time
+import uuid
+from sqlalchemy import bindparam, text
+from app import db
+from app.models.ids import uuid7
+from benchmarks.runner import percentile
+
+# place_amenity as it was before the internal keys, rebuilt from the current rows
+LEGACY_LINKS = 'legacy_place_amenity'
+
+BATCH_SIZE = 1000
+
+# (label, SQL on the integer keys, SQL on the UUID strings); :amenity_id is a public ID,
+# :keys the keys of a page of places in each layout
+QUERIES = (
+    ('places with an amenity',
+     'SELECT COUNT(*) FROM places WHERE pk IN (SELECT place_pk FROM place_amenity '
+     'WHERE amenity_pk = (SELECT pk FROM amenities WHERE id = :amenity_id))',
+     f'SELECT COUNT(*) FROM places WHERE id IN (SELECT place_id FROM {LEGACY_LINKS} '
+     'WHERE amenity_id = :amenity_id)'),
+    ('amenities of a page of places',
+     'SELECT l.place_pk, a.id, a.name FROM place_amenity l JOIN amenities a ON a.pk = l.amenity_pk '
+     'WHERE l.place_pk IN :keys',
+     f'SELECT l.place_id, a.id, a.name FROM {LEGACY_LINKS} l JOIN amenities a ON a.id = l.amenity_id '
+     'WHERE l.place_id IN :keys'),
+    ('every link joined to both sides',
+     'SELECT COUNT(*) FROM place_amenity l JOIN places p ON p.pk = l.place_pk '
+     'JOIN amenities a ON a.pk = l.amenity_pk',
+     f'SELECT COUNT(*) FROM {LEGACY_LINKS} l JOIN places p ON p.id = l.place_id '
+     'JOIN amenities a ON a.id = l.amenity_id'),
+)
+
+
+def create_legacy_links():
+    """Copy place_amenity into LEGACY_LINKS keyed by (place_id, amenity_id) strings."""
+    db.session.execute(text(
+        f'CREATE TABLE {LEGACY_LINKS} (place_id VARCHAR(36) NOT NULL, amenity_id VARCHAR(36) NOT NULL, '
+        'PRIMARY KEY (place_id, amenity_id))'
+    ))
+    db.session.execute(text(
+        f'INSERT INTO {LEGACY_LINKS} (place_id, amenity_id) SELECT p.id, a.id FROM place_amenity l '
+        'JOIN places p ON p.pk = l.place_pk JOIN amenities a ON a.pk = l.amenity_pk'
+    ))
+    db.session.execute(text(f'CREATE INDEX ix_{LEGACY_LINKS}_amenity_id ON {LEGACY_LINKS} (amenity_id)'))
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+
+
+def relation_sizes(table):
+    """Bytes of table and of each of its indexes."""
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite':
+        names = [row['name'] for row in connection.exec_driver_sql(f'PRAGMA index_list({table})').mappings()]
+        sizes = dict(connection.execute(
+            text('SELECT name, SUM(pgsize) FROM dbstat WHERE name IN :names GROUP BY name')
+            .bindparams(bindparam('names', expanding=True)), {'names': [table, *names]}).all())
+        # The primary key of a WITHOUT ROWID table is the table itself and has no pages of its own
+        return {'table': sizes.get(table, 0), 'indexes': {name: sizes[name] for name in names if name in sizes}}
+    rows = connection.execute(text(
+        'SELECT indexrelname, pg_relation_size(indexrelid) FROM pg_stat_user_indexes WHERE relname = :table'
+    ), {'table': table})
+    return {'table': connection.scalar(text('SELECT pg_relation_size(:table)'), {'table': table}),
+            'indexes': dict(rows.all())}
+
+
+def _layout_report(table, links):
+    sizes = relation_sizes(table)
+    total = sizes['table'] + sum(sizes['indexes'].values())
+    return dict(sizes, total=total, bytes_per_link=round(total / links, 1) if links else None)
+
+
+def _time(statement, params, repeat):
+    samples = []
+    for parameters in params[:repeat]:
+        started = time.perf_counter()
+        db.session.execute(statement, parameters).all()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {'p50': percentile(samples, 50), 'p95': percentile(samples, 95),
+            'mean': round(sum(samples) / len(samples), 3)}
+
+
+def id_index_growth(count, seed=42):
+    """Insert count UUIDv4 then count UUIDv7 strings into an indexed table; time and size of each.
+
+    IDs are inserted in generation order, BATCH_SIZE per statement, as
+    the app creates rows: random v4 IDs land on any page of the index,
+    time-ordered v7 IDs on the last one.
+    """
+    rng = random.Random(seed)
+    clock = iter(range(1_700_000_000_000, 1_700_000_000_000 + count))
+    generators = {
+        'uuid4': lambda: str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        'uuid7': lambda: str(uuid7(next(clock), rng.getrandbits(74)))
+    }
+    report = {}
+    for label, generate in generators.items():
+        table = f'key_order_{label}'
+        db.session.execute(text(f'CREATE TABLE {table} (id VARCHAR(36) NOT NULL, PRIMARY KEY (id))'))
+        insert = text(f'INSERT INTO {table} (id) VALUES (:id)')
+        started = time.perf_counter()
+        for start in range(0, count, BATCH_SIZE):
+            db.session.execute(insert, [{'id': generate()} for _ in range(min(BATCH_SIZE, count - start))])
+            db.session.commit()
+        insert_seconds = time.perf_counter() - started
+        sizes = relation_sizes(table)
+        report[label] = {'insert_seconds': round(insert_seconds, 2), **sizes,
+                         'total': sizes['table'] + sum(sizes['indexes'].values())}
+    return report
+
+
+def run(data, repeat=200, ids=200000, seed=42):
+    """Compare the integer-keyed place_amenity with its UUID string layout on the seeded rows.
+
+    Runs inside an app context on a seeded database. Reports the bytes of
+    both layouts and their indexes, latency percentiles (ms) of the same
+    joins on each, then the size of an index of ids IDs filled with UUIDv4
+    and with UUIDv7 strings.
+    """
+    rng = random.Random(seed)
+    create_legacy_links()
+    links = db.session.scalar(text('SELECT COUNT(*) FROM place_amenity'))
+    report = {
+        'links': links,
+        'size_bytes': {
+            'integer keys': _layout_report('place_amenity', links),
+            'uuid strings': _layout_report(LEGACY_LINKS, links)
+        },
+        'queries_ms': {}
+    }
+
+    keys = dict(db.session.execute(text('SELECT id, pk FROM places')).all())
+    pages = [rng.sample(sorted(keys), min(20, len(keys))) for _ in range(repeat)]
+    amenity_ids = [rng.choice(data['amenities']) for _ in range(repeat)]
+    for label, integer_sql, string_sql in QUERIES:
+        timings = {}
+        for layout, sql in (('integer keys', integer_sql), ('uuid strings', string_sql)):
+            statement = text(sql)
+            if ':keys' in sql:
+                statement = statement.bindparams(bindparam('keys', expanding=True))
+                as_keys = (lambda page: [keys[place_id] for place_id in page]) if layout == 'integer keys' else list
+                params = [{'keys': as_keys(page)} for page in pages]
+            elif ':amenity_id' in sql:
+                params = [{'amenity_id': amenity_id} for amenity_id in amenity_ids]
+            else:
+                params = [{}] * min(repeat, 20)
+            db.session.execute(statement, params[0]).all()
+            timings[layout] = _time(statement, params, repeat)
+        timings['speedup_p50'] = round(timings['uuid strings']['p50'] / timings['integer keys']['p50'], 2)
+        report['queries_ms'][label] = timings
+
+    report['id_index'] = id_index_growth(ids, seed)
+    return report
@@ -0,0 +1,76 @@
+"""
+Read-replica routing check with two SQLite files standing in for primary and replica
+"""
+from contextlib import contextmanager
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+from app import db
+from app.models.place import Place
+from app.services.facade import HBnBFacade
+
+
+@contextmanager
+def count_statements(app):
+    """Count statements per bind key ('primary' or replica_<n>) while the block runs."""
+    counts = {}
+    listeners = []
+    with app.app_context():
+        engines = dict(db.engines)
+    for key, engine in engines.items():
+        name = key or 'primary'
+
+        def listener(conn, cursor, statement, parameters, context, executemany, name=name):
+            counts[name] = counts.get(name, 0) + 1
+        event.listen(engine, 'before_cursor_execute', listener)
+        listeners.append((engine, listener))
+    try:
+        yield counts
+    finally:
+        for engine, listener in listeners:
+            event.remove(engine, 'before_cursor_execute', listener)
+
+
+def run(app, data):
+    """Replay reads and writes and report where their statements went.
+
+    The replica is a copy of the primary taken after seeding and never
+    updated, as if replication lagged forever: a place created later is
+    only on the primary. The request creating it must still read it back
+    (read-your-writes). Place details are cached, so they are loaded from
+    the primary and a later request finds the new place; page listings
+    are not cached and read the replica.
+    """
+    client = app.test_client()
+    place_id, owner_id = data['places'][0]
+    with app.app_context():
+        token = create_access_token(identity=owner_id)
+    headers = {'Authorization': f'Bearer {token}'}
+    report = {}
+
+    def step(label, method, path, **kwargs):
+        with count_statements(app) as counts:
+            response = client.open(path, method=method, headers=headers, **kwargs)
+        report[label] = {'status': response.status_code, 'statements': dict(counts)}
+        return response
+
+    step('read place', 'GET', f'/api/v1/places/{place_id}')
+    step('list places', 'GET', '/api/v1/places/?limit=20')
+    created = step('create place', 'POST', '/api/v1/places/', json={
+        'title': 'Replica check', 'description': 'Created on the primary', 'price': 10,
+        'latitude': 45.0, 'longitude': 5.0})
+    new_place_id = created.get_json()['id']
+
+    # One request: read, write, commit, then read the write back with a fresh query
+    with count_statements(app) as counts, app.test_request_context():
+        before = db.session.scalar(db.select(db.func.count(Place.id)))
+        place = HBnBFacade().create_place({
+            'title': 'Replica check 2', 'description': 'Created on the primary', 'price': 10,
+            'latitude': 45.0, 'longitude': 5.0, 'user_id': owner_id})
+        db.session.commit()
+        found = db.session.scalar(db.select(Place.id).where(Place.id == place.id)) is not None
+        db.session.remove()
+    report['read, write, read back in one request'] = {
+        'places_before': before, 'write_read_back': found, 'statements': dict(counts)}
+
+    step('read new place, next request', 'GET', f'/api/v1/places/{new_place_id}')
+    return report
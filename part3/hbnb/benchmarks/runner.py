@@ -0,0 +1,157 @@
+"""
+Replay a workload against the app and summarize latency, throughput and SQL
+"""
+import http.client
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import make_server
+
+SERVER_TIMING_QUERIES = re.compile(r'sql;[^,]*desc="(\d+) queries"')
+
+
+class TestClientTarget:
+    """Send requests through Flask's test client, in process."""
+
+    name = 'test_client'
+
+    def __init__(self, app):
+        self.app = app
+        self.local = threading.local()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def request(self, method, path, headers, body):
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(path, method=method, headers=headers, json=body)
+        return response.status_code, response.headers
+
+
+class WSGIServerTarget:
+    """Serve the app on a local threaded WSGI server and send real HTTP requests."""
+
+    name = 'wsgi_server'
+
+    def __init__(self, app, host='127.0.0.1', port=0):
+        self.server = make_server(host, port, app, threaded=True)
+        self.local = threading.local()
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.server.shutdown()
+        self.thread.join()
+        return False
+
+    def request(self, method, path, headers, body):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = self.local.connection = http.client.HTTPConnection(
+                self.server.host, self.server.port)
+        headers = dict(headers)
+        payload = None
+        if body is not None:
+            payload = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        try:
+            connection.request(method, path, body=payload, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            self.local.connection = None
+            raise
+        return response.status, response.headers
+
+
+def run(target, workload, requests, concurrency=1, warmup=0):
+    """Send warmup + requests requests and return the summary dict.
+
+    Requests are drawn from the workload under a lock. With concurrency 1
+    the replayed sequence is fully deterministic; above that, cursor
+    feedback depends on scheduling, so compare runs at equal concurrency.
+    """
+    lock = threading.Lock()
+    samples = []
+
+    def one(record):
+        with lock:
+            action, method, path, headers, body = workload.next_request()
+        start = time.perf_counter()
+        try:
+            status, response_headers = target.request(method, path, headers, body)
+        except Exception:
+            status, response_headers = None, {}
+        elapsed = time.perf_counter() - start
+        with lock:
+            workload.observe(action, response_headers)
+            if record:
+                match = SERVER_TIMING_QUERIES.search(response_headers.get('Server-Timing', ''))
+                samples.append((action, status, elapsed, int(match.group(1)) if match else None))
+
+    for _ in range(warmup):
+        one(False)
+
+    started = time.perf_counter()
+    if concurrency <= 1:
+        for _ in range(requests):
+            one(True)
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, [True] * requests))
+    duration = time.perf_counter() - started
+
+    by_action = {}
+    for sample in samples:
+        by_action.setdefault(sample[0], []).append(sample)
+    return {
+        'overall': summarize(samples, duration),
+        'actions': {action: summarize(rows, duration) for action, rows in sorted(by_action.items())}
+    }
+
+
+def summarize(samples, duration):
+    """Latency percentiles (ms), throughput and SQL queries per request of samples."""
+    latencies = sorted(elapsed * 1000 for _, _, elapsed, _ in samples)
+    queries = [count for _, _, _, count in samples if count is not None]
+    statuses = {}
+    for _, status, _, _ in samples:
+        key = str(status) if status is not None else 'error'
+        statuses[key] = statuses.get(key, 0) + 1
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, status, _, _ in samples if status is None or status >= 500),
+        'status_codes': statuses,
+        'throughput_rps': round(len(samples) / duration, 2) if duration else None,
+        'latency_ms': {
+            'mean': round(sum(latencies) / len(latencies), 3) if latencies else None,
+            'p50': percentile(latencies, 50),
+            'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99),
+            'max': round(latencies[-1], 3) if latencies else None
+        },
+        'queries_per_request': {
+            'mean': round(sum(queries) / len(queries), 2) if queries else None,
+            'p95': percentile(sorted(queries), 95),
+            'max': max(queries) if queries else None
+        }
+    }
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return round(sorted_values[int(rank) - 1], 3)
@@ -0,0 +1,93 @@
+"""
+Weighted request mixes replayed by the benchmark runner
+"""
+import random
+
+# Action weights of each scenario
+SCENARIOS = {
+    'browse': {'list_places': 60, 'next_page': 20, 'nearby': 20},
+    'detail': {'place_detail': 60, 'place_reviews': 40},
+    'login': {'login': 100},
+    'write': {'post_review': 100},
+    'mixed': {'list_places': 25, 'next_page': 5, 'nearby': 10, 'place_detail': 30,
+              'place_reviews': 15, 'login': 5, 'post_review': 10}
+}
+
+SORTS = ('created_at', '-created_at', 'price', '-price', 'rating', '-rating')
+
+
+class Workload:
+    """Generate the requests of a scenario from a seeded dataset.
+
+    next_request() returns (action, method, path, headers, json body).
+    The sequence only depends on the seed, the dataset and the responses
+    fed back through observe(), so runs against two commits replay the
+    same requests.
+    """
+
+    def __init__(self, scenario, dataset, tokens, seed=42):
+        if scenario not in SCENARIOS:
+            raise ValueError(f"Unknown scenario, expected one of: {', '.join(SCENARIOS)}")
+        weights = SCENARIOS[scenario]
+        self.actions = list(weights)
+        self.weights = [weights[action] for action in self.actions]
+        self.rng = random.Random(seed)
+        self.users = dataset['users']
+        self.places = dataset['places']
+        self.reviewed = set(dataset['reviewed'])
+        self.tokens = tokens
+        self.cursors = []
+
+    def next_request(self):
+        action = self.rng.choices(self.actions, self.weights)[0]
+        return (action,) + getattr(self, f'_{action}')()
+
+    def observe(self, action, response_headers):
+        """Remember pagination cursors so next_page can follow them."""
+        cursor = response_headers.get('X-Next-Cursor')
+        if action == 'list_places' and cursor:
+            self.cursors.append(cursor)
+            del self.cursors[:-100]
+
+    def _auth(self, user_id):
+        return {'Authorization': f'Bearer {self.tokens[user_id]}'}
+
+    def _list_places(self):
+        query = f'limit=20&sort={self.rng.choice(SORTS)}'
+        if self.rng.random() < 0.3:
+            low = self.rng.randint(20, 300)
+            query += f'&min_price={low}&max_price={low + 100}'
+        return 'GET', f'/api/v1/places/?{query}', {}, None
+
+    def _next_page(self):
+        if not self.cursors:
+            return self._list_places()
+        cursor = self.cursors.pop(self.rng.randrange(len(self.cursors)))
+        return 'GET', f'/api/v1/places/?limit=20&cursor={cursor}', {}, None
+
+    def _nearby(self):
+        lat = round(self.rng.uniform(40.0, 50.0), 4)
+        lon = round(self.rng.uniform(0.5, 10.0), 4)
+        return 'GET', f'/api/v1/places/nearby?lat={lat}&lon={lon}&radius_km=25&limit=20', {}, None
+
+    def _place_detail(self):
+        place_id, _ = self.rng.choice(self.places)
+        return 'GET', f'/api/v1/places/{place_id}?expand=amenities', {}, None
+
+    def _place_reviews(self):
+        place_id, _ = self.rng.choice(self.places)
+        return 'GET', f'/api/v1/reviews/places/{place_id}/reviews?expand=author&limit=20', {}, None
+
+    def _login(self):
+        _, email = self.rng.choice(self.users)
+        return 'POST', '/api/v1/auth/login', {}, {'email': email, 'password': 'benchmark'}
+
+    def _post_review(self):
+        for _ in range(100):
+            user_id, _ = self.rng.choice(self.users)
+            place_id, owner_id = self.rng.choice(self.places)
+            if owner_id != user_id and (user_id, place_id) not in self.reviewed:
+                break
+        self.reviewed.add((user_id, place_id))
+        body = {'text': 'Benchmark review', 'rating': self.rng.randint(1, 5)}
+        return 'POST', f'/api/v1/reviews/places/{place_id}/reviews', self._auth(user_id), body
@@ -0,0 +1,45 @@
+"""
+Full-text search micro-benchmark over the seeded listings
+"""
+import time
+from app.services.facade import HBnBFacade
+from app.services.search import search_index
+from benchmarks.dataset import WORDS
+from benchmarks.runner import percentile
+
+# (label, query): from the most to the least frequent terms
+QUERIES = (
+    ('most common word', WORDS[0]),
+    ('common word', WORDS[5]),
+    ('rare word', WORDS[-1]),
+    ('two common words', f'{WORDS[0]} {WORDS[1]}'),
+    ('common + rare word', f'{WORDS[0]} {WORDS[-2]}'),
+    ('short prefix', WORDS[3][:3] + '*'),
+    ('long prefix', WORDS[1][:5] + '*'),
+    ('no match', 'zeppelin'),
+)
+
+
+def run(repeat=50, limit=20):
+    """Time the first page of each query, index lookup alone and through the facade.
+
+    Runs inside an app context on a seeded database. Returns per query
+    the number of matching documents and latency percentiles (ms).
+    """
+    facade = HBnBFacade()
+    report = {}
+    for label, query in QUERIES:
+        timings = {}
+        for stage, call in (('index', lambda: search_index.search(query, limit)),
+                            ('facade', lambda: facade.search_places(query, limit))):
+            samples = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                call()
+                samples.append((time.perf_counter() - started) * 1000)
+            samples.sort()
+            timings[stage] = {'p50': percentile(samples, 50), 'p95': percentile(samples, 95),
+                              'max': round(samples[-1], 3)}
+        timings['results'] = len(search_index.search(query, limit))
+        report[label] = dict(query=query, **timings)
+    return report
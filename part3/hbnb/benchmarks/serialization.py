@@ -0,0 +1,72 @@
+"""
+Serialization micro-benchmark: hand-built dicts and json vs the serializer registry and orjson
+"""
+import json
+import time
+from app.serialization import CompactJSONProvider, OrjsonProvider, orjson, serializers
+from app.services.facade import HBnBFacade
+from benchmarks.runner import percentile
+
+
+def legacy_place_to_dict(place):
+    """The listing representation as the views built it before the registry."""
+    return {
+        'id': place.id,
+        'title': place.title,
+        'description': place.description,
+        'price': place.price,
+        'latitude': place.latitude,
+        'longitude': place.longitude,
+        'associated_amenities': [amenity.id for amenity in place.associated_amenities],
+        'rating': place.rating_dict()
+    }
+
+
+def _cpu_ms(call, repeat):
+    """Percentiles of the CPU time (ms) of call over repeat runs."""
+    samples = []
+    for _ in range(repeat):
+        started = time.process_time()
+        call()
+        samples.append((time.process_time() - started) * 1000)
+    samples.sort()
+    return {'p50': percentile(samples, 50), 'p95': percentile(samples, 95), 'mean': round(sum(samples) / repeat, 3)}
+
+
+def run(app, limit=100, repeat=200):
+    """Time serializing one page of places, then the whole list endpoint, per JSON backend.
+
+    The page is loaded once and kept in the session, so the first part
+    measures only row -> dict -> bytes. The endpoint part replays
+    GET /api/v1/places/ through the test client and includes routing, SQL
+    and the response. Responses are compact, as in production (DEBUG off).
+    """
+    report = {'page_size': limit, 'repeat': repeat, 'encode_ms': {}, 'endpoint_ms': {}}
+    app.debug = False
+    with app.test_request_context():
+        places, _ = HBnBFacade().get_places_page(limit)
+        fields = ('id', 'title', 'description', 'price', 'latitude', 'longitude', 'user_id', 'created_at')
+        encoders = {
+            'hand-built dicts + json': lambda: json.dumps([legacy_place_to_dict(place) for place in places]),
+            'registry + json': lambda: json.dumps(serializers.dump_many(places)),
+            'registry + json, ?fields= (8 columns)': lambda: json.dumps(serializers.dump_many(places, fields)),
+        }
+        if orjson is not None:
+            encoders['registry + orjson'] = lambda: orjson.dumps(serializers.dump_many(places))
+        for label, call in encoders.items():
+            call()
+            report['encode_ms'][label] = _cpu_ms(call, repeat)
+
+    providers = {'json': CompactJSONProvider}
+    if orjson is not None:
+        providers['orjson'] = OrjsonProvider
+    client = app.test_client()
+    installed = app.json
+    try:
+        for label, provider in providers.items():
+            app.json = provider(app)
+            path = f'/api/v1/places/?limit={limit}'
+            report['endpoint_ms'][label] = _cpu_ms(lambda: client.get(path), repeat)
+    finally:
+        app.json = installed
+    return report
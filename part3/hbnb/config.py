@@ -3,6 +3,66 @@ import os
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'default_secret_key')
     DEBUG = False
+    # Facade read cache: 'memory', 'redis' or 'null'
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 300))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 10000))
+    # Seconds an expired entry is still served while one request reloads it
+    CACHE_STALE_TTL = int(os.getenv('CACHE_STALE_TTL', 30))
+    # Seconds a request waits for another one's load of the same key before loading itself
+    CACHE_COALESCE_TIMEOUT = float(os.getenv('CACHE_COALESCE_TIMEOUT', 10))
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    # Response encoder: 'auto' (orjson when installed), 'orjson' or 'json'
+    JSON_BACKEND = os.getenv('JSON_BACKEND', 'auto')
+    # Response compression: brotli (when installed) or gzip, for bodies of at least COMPRESS_MIN_SIZE bytes
+    COMPRESS_ENABLED = os.getenv('COMPRESS_ENABLED', 'true').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.getenv('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))
+    COMPRESS_MIMETYPES = ('application/json',)
+    # Per-client token buckets (JWT identity, else IP), by budget: 'count/second|minute|hour|day'
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')  # 'memory' or 'redis' (shared by workers)
+    RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0')
+    RATE_LIMIT_MAX_CLIENTS = int(os.getenv('RATE_LIMIT_MAX_CLIENTS', 100000))
+    # Reverse proxies in front of the app, each appending to X-Forwarded-For. ProxyFix then takes
+    # the client address (rate limit key of anonymous requests) from that header; with 0 the
+    # header is ignored, as any client could forge it, and the socket peer is the client
+    TRUSTED_PROXIES = int(os.getenv('TRUSTED_PROXIES', 0))
+    RATE_LIMITS = {
+        'default': os.getenv('RATE_LIMIT_DEFAULT', '600/minute'),
+        'login': os.getenv('RATE_LIMIT_LOGIN', '10/minute'),
+        'register': os.getenv('RATE_LIMIT_REGISTER', '5/minute'),
+        'admin_token': os.getenv('RATE_LIMIT_ADMIN_TOKEN', '2/minute')
+    }
+    BULK_IMPORT_BATCH_SIZE = int(os.getenv('BULK_IMPORT_BATCH_SIZE', 500))
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    SLOW_QUERY_THRESHOLD_MS = float(os.getenv('SLOW_QUERY_THRESHOLD_MS', 100))
+    # bcrypt work factor; hashes with another cost are upgraded on login
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    # Password hashing pool: 'process', 'thread' or 'inline'
+    PASSWORD_HASH_EXECUTOR = os.getenv('PASSWORD_HASH_EXECUTOR', 'process')
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 0)) or None
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 0)) or None
+    PASSWORD_HASH_TIMEOUT = float(os.getenv('PASSWORD_HASH_TIMEOUT', 10))
+    # Verified JWT claims cache; entries never outlive the token's exp
+    JWT_CACHE_ENABLED = os.getenv('JWT_CACHE_ENABLED', 'true').lower() == 'true'
+    JWT_CACHE_TTL = int(os.getenv('JWT_CACHE_TTL', 300))
+    JWT_CACHE_MAX_ENTRIES = int(os.getenv('JWT_CACHE_MAX_ENTRIES', 10000))
+    # Full-text search: 'auto' (from the database URL), 'sqlite', 'postgres' or 'none'
+    SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'auto')
+    SEARCH_LANGUAGE = os.getenv('SEARCH_LANGUAGE', 'english')
+    # Matches ranked per query, newest first; 0 ranks them all, which is slower on common terms
+    SEARCH_MAX_CANDIDATES = int(os.getenv('SEARCH_MAX_CANDIDATES', 10000))
+    SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', 1000))
+    # Connection pool of every engine (primary and replicas); configure_replicas leaves out
+    # the QueuePool sizing for engines on another pool, such as in-memory SQLite
+    DB_POOL_OPTIONS = {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    }
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -10,6 +70,8 @@ class DevelopmentConfig(Config):
         'DATABASE_URL',
         'postgresql://mac@localhost/hbnbameni_db'
     )
+    # Read replicas, comma separated; plain SELECTs are routed to them (see RoutingSession)
+    SQLALCHEMY_REPLICA_URIS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
 config = {
@@ -0,0 +1,56 @@
+"""add place_rating_stats table
+
+Revision ID: 107fb93f2984
+Revises: a815bdfaf9bf
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '107fb93f2984'
+down_revision = 'a815bdfaf9bf'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('place_rating_stats',
+        sa.Column('place_id', sa.String(length=36), nullable=False),
+        sa.Column('review_count', sa.Integer(), nullable=False),
+        sa.Column('rating_sum', sa.Integer(), nullable=False),
+        sa.Column('average', sa.Float(), nullable=True),
+        sa.Column('rating_1', sa.Integer(), nullable=False),
+        sa.Column('rating_2', sa.Integer(), nullable=False),
+        sa.Column('rating_3', sa.Integer(), nullable=False),
+        sa.Column('rating_4', sa.Integer(), nullable=False),
+        sa.Column('rating_5', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['place_id'], ['places.id'], ),
+        sa.PrimaryKeyConstraint('place_id')
+    )
+    with op.batch_alter_table('place_rating_stats', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_place_rating_stats_average'), ['average'], unique=False)
+
+    # Backfill from existing reviews; `flask hbnb reconcile-ratings` repairs drift later
+    op.execute("""
+        INSERT INTO place_rating_stats
+            (place_id, review_count, rating_sum, average,
+             rating_1, rating_2, rating_3, rating_4, rating_5)
+        SELECT place_id, COUNT(*), SUM(rating), CAST(SUM(rating) AS FLOAT) / COUNT(*),
+               SUM(CASE WHEN rating = 1 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN rating = 2 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN rating = 3 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN rating = 4 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN rating = 5 THEN 1 ELSE 0 END)
+        FROM reviews
+        GROUP BY place_id
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('place_rating_stats', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_place_rating_stats_average'))
+
+    op.drop_table('place_rating_stats')
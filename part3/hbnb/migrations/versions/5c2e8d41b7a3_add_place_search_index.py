@@ -0,0 +1,56 @@
+"""add place full-text search index
+
+Revision ID: 5c2e8d41b7a3
+Revises: 107fb93f2984
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2e8d41b7a3'
+down_revision = '107fb93f2984'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute('CREATE TABLE place_search_docs ('
+                   'id INTEGER PRIMARY KEY, place_id VARCHAR(36) NOT NULL UNIQUE)')
+        op.execute("CREATE VIRTUAL TABLE place_search USING fts5("
+                   "title, description, reviews, tokenize='porter unicode61', prefix='2 3')")
+        # Backfill; `flask hbnb reindex-search` rebuilds the index later
+        op.execute('INSERT INTO place_search_docs (place_id) SELECT id FROM places')
+        op.execute("""
+            INSERT INTO place_search (rowid, title, description, reviews)
+            SELECT d.id, p.title, COALESCE(p.description, ''),
+                   COALESCE((SELECT group_concat(r.text, char(10)) FROM reviews r
+                             WHERE r.place_id = p.id), '')
+            FROM places p JOIN place_search_docs d ON d.place_id = p.id
+        """)
+    elif dialect == 'postgresql':
+        op.execute('CREATE TABLE place_search ('
+                   'place_id VARCHAR(36) PRIMARY KEY REFERENCES places (id) ON DELETE CASCADE, '
+                   'document TSVECTOR NOT NULL)')
+        op.execute("""
+            INSERT INTO place_search (place_id, document)
+            SELECT p.id,
+                   setweight(to_tsvector('english', p.title), 'A') ||
+                   setweight(to_tsvector('english', COALESCE(p.description, '')), 'B') ||
+                   setweight(to_tsvector('english', COALESCE(string_agg(r.text, E'\\n'), '')), 'C')
+            FROM places p LEFT JOIN reviews r ON r.place_id = p.id
+            GROUP BY p.id
+        """)
+        op.execute('CREATE INDEX ix_place_search_document ON place_search USING GIN (document)')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute('DROP TABLE place_search')
+        op.execute('DROP TABLE place_search_docs')
+    elif dialect == 'postgresql':
+        op.execute('DROP TABLE place_search')
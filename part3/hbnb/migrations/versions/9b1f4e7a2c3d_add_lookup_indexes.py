@@ -0,0 +1,57 @@
+"""add indexes for hot lookups and one review per user and place
+
+Revision ID: 9b1f4e7a2c3d
+Revises: 5c2e8d41b7a3
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b1f4e7a2c3d'
+down_revision = '5c2e8d41b7a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    duplicates = op.get_bind().scalar(sa.text(
+        'SELECT COUNT(*) FROM (SELECT user_id, place_id FROM reviews '
+        'GROUP BY user_id, place_id HAVING COUNT(*) > 1) AS pairs'
+    ))
+    if duplicates:
+        raise RuntimeError(
+            f'{duplicates} (user_id, place_id) pairs have several reviews; delete the extra reviews, '
+            'run `flask hbnb reconcile-ratings`, then upgrade again'
+        )
+
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        # Also serves lookups by user_id alone (leftmost column)
+        batch_op.create_unique_constraint('uq_reviews_user_id_place_id', ['user_id', 'place_id'])
+        # Keyset pages of a place's reviews, ordered by (created_at, id)
+        batch_op.create_index('ix_reviews_place_id_created_at', ['place_id', 'created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_places_user_id'), ['user_id'], unique=False)
+        batch_op.create_index('ix_places_price', ['price', 'id'], unique=False)
+        batch_op.create_index('ix_places_created_at', ['created_at', 'id'], unique=False)
+
+    with op.batch_alter_table('place_amenity', schema=None) as batch_op:
+        # The primary key (place_id, amenity_id) does not serve lookups by amenity
+        batch_op.create_index('ix_place_amenity_amenity_id', ['amenity_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('place_amenity', schema=None) as batch_op:
+        batch_op.drop_index('ix_place_amenity_amenity_id')
+
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.drop_index('ix_places_created_at')
+        batch_op.drop_index('ix_places_price')
+        batch_op.drop_index(batch_op.f('ix_places_user_id'))
+
+    with op.batch_alter_table('reviews', schema=None) as batch_op:
+        batch_op.drop_index('ix_reviews_place_id_created_at')
+        batch_op.drop_constraint('uq_reviews_user_id_place_id', type_='unique')
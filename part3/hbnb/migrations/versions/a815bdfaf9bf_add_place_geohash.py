@@ -0,0 +1,45 @@
+"""add geohash column to places
+
+Revision ID: a815bdfaf9bf
+Revises: 29fd9f6c18ba
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from app.models.geo import encode_geohash, GEOHASH_PRECISION
+
+
+# revision identifiers, used by Alembic.
+revision = 'a815bdfaf9bf'
+down_revision = '29fd9f6c18ba'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('geohash', sa.String(length=GEOHASH_PRECISION), nullable=True))
+        batch_op.create_index(batch_op.f('ix_places_geohash'), ['geohash'], unique=False)
+
+    # Backfill the geohash of existing places
+    places = sa.table(
+        'places',
+        sa.column('id', sa.String),
+        sa.column('latitude', sa.Float),
+        sa.column('longitude', sa.Float),
+        sa.column('geohash', sa.String)
+    )
+    connection = op.get_bind()
+    rows = connection.execute(sa.select(places.c.id, places.c.latitude, places.c.longitude)).fetchall()
+    if rows:
+        connection.execute(
+            places.update().where(places.c.id == sa.bindparam('place_id')),
+            [{'place_id': row.id, 'geohash': encode_geohash(row.latitude, row.longitude)} for row in rows]
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_places_geohash'))
+        batch_op.drop_column('geohash')
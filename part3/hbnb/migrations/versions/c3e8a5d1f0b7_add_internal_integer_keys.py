@@ -0,0 +1,125 @@
+"""key places and amenities by internal integers, place_amenity on them
+
+Revision ID: c3e8a5d1f0b7
+Revises: 9b1f4e7a2c3d
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+import warnings
+from contextlib import contextmanager
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3e8a5d1f0b7'
+down_revision = '9b1f4e7a2c3d'
+branch_labels = None
+depends_on = None
+
+# BIGINT, but INTEGER on SQLite where only INTEGER PRIMARY KEY is an auto-incremented rowid alias
+InternalKey = sa.BigInteger().with_variant(sa.Integer(), 'sqlite')
+
+KEYED_TABLES = ('places', 'amenities')
+
+
+def upgrade():
+    for table in KEYED_TABLES:
+        if op.get_bind().dialect.name == 'sqlite':
+            # The table is rebuilt; existing rows get pk in rowid (insertion) order
+            with warnings.catch_warnings():
+                warnings.filterwarnings('ignore', 'Table .* specifies columns .* as primary_key=True')
+                with op.batch_alter_table(table, recreate='always') as batch_op:
+                    batch_op.add_column(sa.Column('pk', sa.Integer(), nullable=False))
+                    batch_op.create_primary_key(f'pk_{table}', ['pk'])
+                    batch_op.create_unique_constraint(f'uq_{table}_id', ['id'])
+        else:
+            with _foreign_keys_to(table):
+                op.drop_constraint(_primary_key_name(table), table, type_='primary')
+                op.add_column(table, sa.Column('pk', sa.BigInteger(), sa.Identity(), nullable=False))
+                op.create_primary_key(f'pk_{table}', table, ['pk'])
+                op.create_unique_constraint(f'uq_{table}_id', table, ['id'])
+
+    _rebuild_place_amenity(
+        sa.Column('place_pk', InternalKey, nullable=False),
+        sa.Column('amenity_pk', InternalKey, nullable=False),
+        'SELECT p.pk, a.pk FROM place_amenity l '
+        'JOIN places p ON p.id = l.place_id JOIN amenities a ON a.id = l.amenity_id',
+        'pk', 'pk_place_amenity', sqlite_with_rowid=False
+    )
+
+
+def downgrade():
+    _rebuild_place_amenity(
+        sa.Column('place_id', sa.String(length=36), nullable=False),
+        sa.Column('amenity_id', sa.String(length=36), nullable=False),
+        'SELECT p.id, a.id FROM place_amenity l '
+        'JOIN places p ON p.pk = l.place_pk JOIN amenities a ON a.pk = l.amenity_pk',
+        'id', 'place_amenity_pkey'
+    )
+
+    for table in KEYED_TABLES:
+        if op.get_bind().dialect.name == 'sqlite':
+            with warnings.catch_warnings():
+                warnings.filterwarnings('ignore', 'Table .* specifies columns .* as primary_key=True')
+                with op.batch_alter_table(table, recreate='always') as batch_op:
+                    batch_op.drop_constraint(f'uq_{table}_id', type_='unique')
+                    batch_op.create_primary_key(f'pk_{table}', ['id'])
+                    batch_op.drop_column('pk')
+        else:
+            with _foreign_keys_to(table):
+                op.drop_constraint(f'uq_{table}_id', table, type_='unique')
+                op.drop_constraint(f'pk_{table}', table, type_='primary')
+                op.create_primary_key(f'{table}_pkey', table, ['id'])
+                op.drop_column(table, 'pk')
+
+
+def _rebuild_place_amenity(place_column, amenity_column, select, key, primary_key_name, **table_kwargs):
+    """Replace place_amenity by a table on (place_column, amenity_column) filled by select.
+
+    Both columns reference the key column of places and amenities. The
+    old table still exists while the new one is created, so on PostgreSQL
+    primary_key_name must differ from the name of its primary key.
+    """
+    op.create_table(
+        '_place_amenity_new',
+        place_column,
+        amenity_column,
+        sa.ForeignKeyConstraint([place_column.name], [f'places.{key}'],
+                                name=f'place_amenity_{place_column.name}_fkey'),
+        sa.ForeignKeyConstraint([amenity_column.name], [f'amenities.{key}'],
+                                name=f'place_amenity_{amenity_column.name}_fkey'),
+        sa.PrimaryKeyConstraint(place_column.name, amenity_column.name, name=primary_key_name),
+        **table_kwargs
+    )
+    op.execute(f'INSERT INTO _place_amenity_new ({place_column.name}, {amenity_column.name}) {select}')
+    op.drop_table('place_amenity')
+    op.rename_table('_place_amenity_new', 'place_amenity')
+    # The primary key does not serve lookups by amenity
+    op.create_index(f'ix_place_amenity_{amenity_column.name}', 'place_amenity', [amenity_column.name], unique=False)
+
+
+def _primary_key_name(table):
+    return sa.inspect(op.get_bind()).get_pk_constraint(table)['name']
+
+
+@contextmanager
+def _foreign_keys_to(table):
+    """Drop the foreign keys referencing table, run the block, then create them again.
+
+    PostgreSQL ties a foreign key to the unique index it references, so the
+    primary key of table can only be replaced while they are dropped.
+    """
+    inspector = sa.inspect(op.get_bind())
+    foreign_keys = [
+        (source, foreign_key)
+        for source in inspector.get_table_names()
+        for foreign_key in inspector.get_foreign_keys(source)
+        if foreign_key['referred_table'] == table
+    ]
+    for source, foreign_key in foreign_keys:
+        op.drop_constraint(foreign_key['name'], source, type_='foreignkey')
+    yield
+    for source, foreign_key in foreign_keys:
+        op.create_foreign_key(foreign_key['name'], source, table, foreign_key['constrained_columns'],
+                              foreign_key['referred_columns'], **foreign_key['options'])
@@ -0,0 +1,27 @@
+"""index places.updated_at
+
+Revision ID: d4f1a7c9e2b6
+Revises: c3e8a5d1f0b7
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f1a7c9e2b6'
+down_revision = 'c3e8a5d1f0b7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        # Places changed since the amenity index was read, and exports by updated_at
+        batch_op.create_index('ix_places_updated_at', ['updated_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.drop_index('ix_places_updated_at')
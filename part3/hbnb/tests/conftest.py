@@ -0,0 +1,53 @@
+"""
+Shared fixtures: the app on scratch SQLite files, seeded with the benchmark dataset
+"""
+import pytest
+from app import create_app, db
+from benchmarks import dataset
+from config import DevelopmentConfig
+
+
+@pytest.fixture
+def make_app(tmp_path, monkeypatch):
+    """Return a factory creating the app with the given config overrides.
+
+    The database defaults to an empty SQLite file under tmp_path. Engines
+    are disposed when the test ends.
+    """
+    apps = []
+
+    def make(**settings):
+        settings = dict({
+            'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'primary.db'}",
+            'SQLALCHEMY_REPLICA_URIS': [],
+            'RATE_LIMIT_ENABLED': False,
+            'PASSWORD_HASH_EXECUTOR': 'inline',
+            'BCRYPT_LOG_ROUNDS': 4,
+            'SLOW_QUERY_THRESHOLD_MS': 1000
+        }, **settings)
+        for name, value in settings.items():
+            monkeypatch.setattr(DevelopmentConfig, name, value, raising=False)
+        app = create_app()
+        apps.append(app)
+        return app
+
+    yield make
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def data(app):
+    """A small seeded dataset (see benchmarks.dataset.seed)."""
+    with app.app_context():
+        seeded = dataset.seed(users=10, places=100, amenities=10, reviews=200, seed=42)
+        db.session.remove()
+    return seeded
@@ -0,0 +1,49 @@
+"""
+?amenities= filters of GET /places/ match the place_amenity links
+"""
+from collections import defaultdict
+import pytest
+from app import db
+from app.models.amenity import Amenity
+from app.models.association_tables import place_amenity_association
+from app.models.place import Place
+
+
+def _links():
+    """Place ID -> set of its amenity IDs, read straight from place_amenity."""
+    links = place_amenity_association.c
+    rows = db.session.execute(
+        db.select(Place.id, Amenity.id)
+        .join(place_amenity_association, links.place_pk == Place.pk)
+        .join(Amenity, Amenity.pk == links.amenity_pk)
+    )
+    amenities = defaultdict(set)
+    for place_id, amenity_id in rows:
+        amenities[place_id].add(amenity_id)
+    return amenities
+
+
+def _listed(client, **params):
+    """IDs of every place listed for params, following the cursors."""
+    ids, params = set(), dict(params, limit=7)
+    while True:
+        response = client.get('/api/v1/places/', query_string=params)
+        assert response.status_code in (200, 404), response.get_json()
+        ids.update(place['id'] for place in (response.get_json() if response.status_code == 200 else []))
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            return ids
+        params['cursor'] = cursor
+
+
+@pytest.mark.parametrize('mode, count', [('all', 1), ('all', 2), ('any', 2), ('any', 3)])
+def test_filtered_places_are_exactly_the_matching_ones(app, data, mode, count):
+    amenity_ids = data['amenities'][:count]
+    with app.app_context():
+        links = _links()
+    match = set(amenity_ids).issubset if mode == 'all' else set(amenity_ids).intersection
+    expected = {place_id for place_id, amenities in links.items() if match(amenities)}
+    assert expected
+
+    listed = _listed(app.test_client(), amenities=','.join(amenity_ids), mode=mode)
+    assert listed == expected
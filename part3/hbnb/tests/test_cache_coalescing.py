@@ -0,0 +1,84 @@
+"""
+Single-flight loads and stale serving of the facade cache
+"""
+import threading
+import time
+from benchmarks import coalescing
+from app.services.cache import FacadeCache
+
+
+def _slow_loader(started, release, value):
+    calls = []
+
+    def loader():
+        calls.append(1)
+        started.set()
+        assert release.wait(5)
+        return value
+    return loader, calls
+
+
+def test_concurrent_misses_share_one_load():
+    cache = FacadeCache()
+    started, release = threading.Event(), threading.Event()
+    loader, calls = _slow_loader(started, release, {'name': 'Wifi'})
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('amenity:1', loader)))
+               for _ in range(10)]
+    threads[0].start()
+    assert started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    # Only release the load once the nine other misses wait on it
+    deadline = time.monotonic() + 5
+    while cache.stats()['coalesced'] < 9:
+        assert time.monotonic() < deadline, cache.stats()
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{'name': 'Wifi'}] * 10
+    assert cache.stats()['coalesced'] == 9
+
+
+def test_stale_entry_is_served_during_its_reload():
+    cache = FacadeCache(ttl=0, stale_ttl=30)
+    assert cache.get_or_load('place:1', lambda: 'old') == 'old'
+
+    started, release = threading.Event(), threading.Event()
+    loader, calls = _slow_loader(started, release, 'new')
+    reload = threading.Thread(target=cache.get_or_load, args=('place:1', loader))
+    reload.start()
+    assert started.wait(5)
+    assert cache.get_or_load('place:1', lambda: 'unexpected load') == 'old'
+    release.set()
+    reload.join()
+
+    assert len(calls) == 1
+    assert cache.stats()['stale'] == 1
+
+
+def test_invalidation_during_a_load_keeps_its_result_out():
+    cache = FacadeCache()
+    started, release = threading.Event(), threading.Event()
+    loader, _ = _slow_loader(started, release, 'before the write')
+    load = threading.Thread(target=cache.get_or_load, args=('place:1', loader))
+    load.start()
+    assert started.wait(5)
+    cache.invalidate('place:1')
+    release.set()
+    load.join()
+
+    assert cache.get_or_load('place:1', lambda: 'after the write') == 'after the write'
+
+
+def test_request_bursts_cost_one_database_load(app, data):
+    report = coalescing.run(app, data, clients=20, query_delay_ms=30)
+
+    for label in ('cold', 'stale'):
+        burst = report[label]
+        assert burst['statuses'] == [200]
+        assert burst['etags'] == 1
+        assert burst['db_loads'] == 1, burst
@@ -0,0 +1,25 @@
+"""
+Conditional GETs of cached resources revalidate on the ETag only
+"""
+from datetime import datetime, timedelta, timezone
+from flask_jwt_extended import create_access_token
+from werkzeug.http import http_date
+
+
+def test_changed_place_is_never_answered_304(app, data):
+    client = app.test_client()
+    place_id, owner_id = data['places'][0]
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity=owner_id)}'}
+
+    first = client.get(f'/api/v1/places/{place_id}')
+    assert 'Last-Modified' not in first.headers
+    assert client.get(f'/api/v1/places/{place_id}',
+                      headers={'If-None-Match': first.headers['ETag']}).status_code == 304
+
+    assert client.put(f'/api/v1/places/{place_id}', headers=headers, json={'title': 'Renamed'}).status_code == 200
+    # A date at or after the first load, as a client revalidating within the same second sends
+    since = http_date(datetime.now(timezone.utc) + timedelta(seconds=1))
+    changed = client.get(f'/api/v1/places/{place_id}', headers={'If-Modified-Since': since})
+    assert changed.status_code == 200
+    assert changed.get_json()['place']['title'] == 'Renamed'
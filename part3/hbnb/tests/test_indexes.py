@@ -0,0 +1,52 @@
+"""
+Hot lookups use their index, and the unique index keeps one review per user and place
+"""
+import pytest
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models.review import Review
+from app.services.facade import HBnBFacade
+from benchmarks import indexes
+
+LOOKUPS = ('reviews of a place', 'already reviewed?', 'places of an owner',
+           'price range by price', 'newest places', 'places with an amenity')
+
+
+@pytest.fixture
+def report(app, data):
+    """The EXPLAIN report of benchmarks.indexes for the seeded dataset."""
+    with app.app_context():
+        report = indexes.run(data)
+        db.session.rollback()
+    return report
+
+
+def test_every_hot_lookup_is_checked(report):
+    assert set(report) == set(LOOKUPS)
+
+
+@pytest.mark.parametrize('label', LOOKUPS)
+def test_hot_lookup_uses_its_index(report, label):
+    check = report[label]
+    assert check['index'], f'no index on the columns of {label!r}'
+    assert check['uses_index'], check['plans']
+
+
+def test_duplicate_review_check_is_one_probe(report):
+    # One EXISTS statement, not a load of the place's reviews
+    assert len(report['already reviewed?']['plans']) == 1
+
+
+def test_second_review_of_a_place_is_refused(app, data):
+    user_id, place_id = next(iter(data['reviewed']))
+    with app.app_context():
+        headers = {'Authorization': f'Bearer {create_access_token(identity=user_id)}'}
+        # Past the has_reviewed check, as a concurrent request would be
+        with pytest.raises(ValueError, match='already reviewed'):
+            HBnBFacade().create_review({'text': 'Again', 'rating': 3, 'user_id': user_id, 'place_id': place_id})
+        db.session.rollback()
+        assert db.session.query(Review).filter_by(user_id=user_id, place_id=place_id).count() == 1
+
+    response = app.test_client().post(f'/api/v1/reviews/places/{place_id}/reviews', headers=headers,
+                                      json={'text': 'Again', 'rating': 3})
+    assert response.status_code == 400
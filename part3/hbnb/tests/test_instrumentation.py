@@ -0,0 +1,21 @@
+"""
+Per-request SQL counting survives failing statements
+"""
+import pytest
+from flask import g
+from sqlalchemy.exc import OperationalError
+from app import db
+
+
+def test_failed_statement_leaves_no_start_time_behind(app):
+    with app.test_request_context('/api/v1/amenities/'):
+        app.preprocess_request()
+        connection = db.session.connection()
+        for _ in range(3):
+            with pytest.raises(OperationalError), db.session.begin_nested():
+                db.session.execute(db.text('SELECT * FROM no_such_table'))
+        counted = g.request_metrics['sql_count']
+        db.session.execute(db.text('SELECT 1'))
+
+        assert g.request_metrics['sql_count'] == counted + 1
+        assert not connection.info.get('query_start')
@@ -0,0 +1,35 @@
+"""
+Protected requests go through the verified token cache
+"""
+import time
+from datetime import timedelta
+from flask_jwt_extended import create_access_token
+from app.services.jwt_cache import token_cache
+
+
+def _get_protected(client, token):
+    return client.get('/api/v1/auth/protected', headers={'Authorization': f'Bearer {token}'})
+
+
+def test_each_token_is_verified_once(app, data):
+    client = app.test_client()
+    with app.app_context():
+        tokens = [create_access_token(identity=user_id) for user_id, _ in data['users'][:2]]
+    token_cache.reset_stats()
+
+    for token in tokens + tokens:
+        assert _get_protected(client, token).status_code == 200
+
+    # Fails if flask-jwt-extended stops decoding through CachingJWTManager
+    stats = token_cache.stats()
+    assert (stats['misses'], stats['hits']) == (2, 2)
+
+
+def test_expired_token_is_rejected_although_it_was_cached(app, data):
+    client = app.test_client()
+    with app.app_context():
+        token = create_access_token(identity=data['users'][0][0], expires_delta=timedelta(seconds=1))
+    assert _get_protected(client, token).status_code == 200
+
+    time.sleep(1.1)
+    assert _get_protected(client, token).status_code == 401
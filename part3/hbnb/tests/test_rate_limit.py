@@ -0,0 +1,27 @@
+"""
+Anonymous clients are rate limited by address, taken from X-Forwarded-For only behind TRUSTED_PROXIES
+"""
+import pytest
+
+LIMITS = {'default': '2/minute', 'login': '2/minute', 'register': '2/minute', 'admin_token': '2/minute'}
+
+
+def _limited(client, forwarded_for, count=3):
+    """Whether each of count requests sent with the X-Forwarded-For header is answered 429."""
+    return [client.get('/api/v1/amenities/', headers={'X-Forwarded-For': forwarded_for}).status_code == 429
+            for _ in range(count)]
+
+
+@pytest.mark.parametrize('trusted_proxies', [0, 1])
+def test_forwarded_for_picks_the_bucket_only_behind_a_trusted_proxy(make_app, trusted_proxies):
+    app = make_app(RATE_LIMIT_ENABLED=True, RATE_LIMITS=LIMITS, TRUSTED_PROXIES=trusted_proxies)
+    client = app.test_client()
+    client.environ_base['REMOTE_ADDR'] = '10.0.0.1'  # The proxy, or the client itself
+
+    assert _limited(client, '203.0.113.7') == [False, False, True]
+    if trusted_proxies:
+        # The proxy's entry names another client, with a bucket of its own
+        assert _limited(client, '203.0.113.7, 203.0.113.8') == [False, False, True]
+    else:
+        # A forged header is no way around the budget of the socket peer
+        assert _limited(client, '203.0.113.8', count=1) == [True]
@@ -0,0 +1,38 @@
+"""
+Full-text search ranks the SEARCH_MAX_CANDIDATES newest matches, or all of them with 0
+"""
+from app import db
+from app.services.facade import HBnBFacade
+from app.services.search import search_index
+
+
+def _add_places(owner_id, titles_and_descriptions):
+    facade = HBnBFacade()
+    ids = [facade.create_place({'title': title, 'description': description, 'price': 50, 'latitude': 10.0,
+                                'longitude': 10.0, 'user_id': owner_id}).id
+           for title, description in titles_and_descriptions]
+    db.session.commit()
+    return ids
+
+
+def _top(query, limit=3):
+    return [place_id for place_id, _ in search_index.search(query, limit)]
+
+
+def test_best_match_is_ranked_first_while_within_the_cap(app, data):
+    owner_id = data['users'][0][0]
+    with app.app_context():
+        best, = _add_places(owner_id, [('Zeppelin hangar', 'A zeppelin hangar turned zeppelin loft')])
+        _add_places(owner_id, [(f'Flat {n}', 'Seen a zeppelin once') for n in range(10)])
+
+        try:
+            search_index.backend.max_candidates = 0
+            assert _top('zeppelin')[0] == best
+            search_index.backend.max_candidates = 11
+            assert _top('zeppelin')[0] == best
+
+            # A cap ranks only the newest matches: cheaper on common terms, but older best matches drop out
+            search_index.backend.max_candidates = 5
+            assert best not in _top('zeppelin', limit=10)
+        finally:
+            search_index.backend.max_candidates = app.config['SEARCH_MAX_CANDIDATES']
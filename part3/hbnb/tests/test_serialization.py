@@ -0,0 +1,25 @@
+"""
+Field selections of the serializer registry
+"""
+import pytest
+from app.models.place import Place
+from app.serialization import serializers
+
+
+def test_any_order_of_the_same_fields_shares_one_serializer(app, data):
+    fields = serializers.select(Place, ['price', 'title', 'id', 'created_at'])
+    assert serializers.select(Place, ['id', 'created_at', 'title', 'price', 'title']) == fields
+    assert serializers.serializer(Place, fields) is serializers.serializer(Place, fields)
+
+    with app.app_context():
+        place = Place.query.first()
+        assert serializers.dump(place, fields) == {
+            'id': place.id, 'title': place.title, 'price': place.price,
+            'created_at': place.created_at.isoformat()
+        }
+
+
+def test_unknown_or_private_fields_are_refused(app):
+    with pytest.raises(ValueError, match='Unknown fields nope'):
+        serializers.select(Place, ['title', 'nope'])
+    assert 'pk' not in serializers.available(Place)
@@ -6,6 +6,13 @@ document.addEventListener('DOMContentLoaded', () => {
     const addReviewForm = document.getElementById('add-review-form');
     const placesList = document.querySelector('.places-grid');
     const priceFilter = document.getElementById('max-price');
+    const loadMorePlaces = document.getElementById('load-more-places');
+    const loadMoreReviews = document.getElementById('load-more-reviews');
+
+    // Listing state, declared before the first fetch below can use it
+    let placesRequestId = 0;
+    let placesCursor = null;
+    let reviewsCursor = null;
 
     // Set up the "Add Your Review" link dynamically
     const addReviewLink = document.getElementById('add-review-link');
@@ -69,7 +76,7 @@ document.addEventListener('DOMContentLoaded', () => {
         try {
             const token = getCookie('token');
             const headers = token ? { 'Authorization': `Bearer ${token}` } : {};
-            const response = await fetch(`http://127.0.0.1:5000/api/v1/places/${placeId}`, { headers });
+            const response = await fetch(`http://127.0.0.1:5000/api/v1/places/${placeId}?expand=amenities`, { headers });
 
             if (response.ok) {
                 const placeData = await response.json();
@@ -82,71 +89,69 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    // Fetch user details by user_id
-    async function fetchUserName(userId) {
-        try {
-            const token = getCookie('token');
-            const headers = token ? { 'Authorization': `Bearer ${token}` } : {};
-            const response = await fetch(`http://127.0.0.1:5000/api/v1/users/${userId}`, { headers });
-
-            if (response.ok) {
-                const userData = await response.json();
-                return `${userData.first_name} ${userData.last_name}`; // Combine first and last name
-            } else {
-                console.error('Failed to fetch user details', await response.json());
-                return 'Anonymous'; // Fallback if user fetch fails
-            }
-        } catch (error) {
-            console.error('Error fetching user details:', error);
-            return 'Anonymous'; // Fallback in case of error
-        }
-    }
-
-    // Fetch reviews for the place and include user names
-    async function fetchReviews() {
+    // Fetch one page of the place's reviews, with author names embedded by the API:
+    // the first one, or the one after cursor ("Load more")
+    async function fetchReviews(cursor = null) {
         const placeId = getPlaceIdFromURL();
         if (!placeId) {
             console.error('Place ID not found in URL for reviews');
             return;
         }
 
+        const reviewsContainer = document.getElementById('reviews-container');
+        showLoadMore(loadMoreReviews, false);
         try {
             const token = getCookie('token');
             const headers = token ? { 'Authorization': `Bearer ${token}` } : {};
-            const response = await fetch(`http://127.0.0.1:5000/api/v1/reviews/places/${placeId}/reviews`, { headers });
+            const params = new URLSearchParams({ expand: 'author', limit: '20' });
+            if (cursor) {
+                params.set('cursor', cursor);
+            }
 
-            const reviewsContainer = document.getElementById('reviews-container');
+            const response = await fetch(`http://127.0.0.1:5000/api/v1/reviews/places/${placeId}/reviews?${params}`, { headers });
             if (!response.ok) {
                 const errorData = await response.json();
-                reviewsContainer.innerHTML = `<p>${errorData.error}</p>`;
+                if (cursor) {
+                    console.error('Failed to fetch more reviews', errorData);
+                } else {
+                    reviewsContainer.innerHTML = `<p>${errorData.error}</p>`;
+                }
                 return;
             }
-
             const reviews = await response.json();
-            if (reviews.length === 0) {
+            reviewsCursor = response.headers.get('X-Next-Cursor');
+
+            const items = reviews.map(review => `
+                <li>
+                    <p><strong>${review.author ? `${review.author.first_name} ${review.author.last_name}` : 'Anonymous'}:</strong> ${review.text} (Rating: ${review.rating})</p>
+                </li>
+            `).join('');
+            if (cursor) {
+                reviewsContainer.querySelector('ul').insertAdjacentHTML('beforeend', items);
+            } else if (reviews.length === 0) {
                 reviewsContainer.innerHTML = '<p>No reviews available</p>';
             } else {
-                // Fetch user names for each review
-                const reviewsWithUserNames = await Promise.all(reviews.map(async (review) => {
-                    const userName = await fetchUserName(review.user_id);
-                    return { ...review, userName }; // Add userName to the review object
-                }));
-
-                // Display reviews with user names
-                reviewsContainer.innerHTML = '<ul>' + reviewsWithUserNames.map(review => `
-                    <li>
-                        <p><strong>${review.userName}:</strong> ${review.text} (Rating: ${review.rating})</p>
-                    </li>
-                `).join('') + '</ul>';
+                reviewsContainer.innerHTML = '<ul>' + items + '</ul>';
             }
+            showLoadMore(loadMoreReviews, Boolean(reviewsCursor));
         } catch (error) {
             console.error('Error fetching reviews:', error);
-            document.getElementById('reviews-container').innerHTML = '<p>Error loading reviews</p>';
+            if (!cursor) {
+                reviewsContainer.innerHTML = '<p>Error loading reviews</p>';
+            }
         }
     }
 
+    if (loadMoreReviews) {
+        loadMoreReviews.addEventListener('click', () => {
+            if (reviewsCursor) {
+                fetchReviews(reviewsCursor);
+            }
+        });
+    }
+
     // Improved place details display
-    async function displayPlaceDetails(placeData) {
+    function displayPlaceDetails(placeData) {
         if (!placeDetailsSection) return;
 
         const place = placeData.place || {};
@@ -157,7 +162,7 @@ document.addEventListener('DOMContentLoaded', () => {
             <h2>${place.title || 'Place Name Not Available'}</h2>
             <p><strong>Description:</strong> ${place.description || 'Not available'}</p>
             <p><strong>Price per night:</strong> ${place.price ? `$${place.price}` : 'Not available'}</p>
-            <p><strong>Amenities:</strong> ${await fetchAmenityNames(amenities)}</p>
+            <p><strong>Amenities:</strong> ${amenities.map(amenity => amenity.name).join(', ') || 'No amenities available'}</p>
         `;
 
         if (addReviewForm) {
@@ -165,27 +170,6 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    // Fetch amenity names from the IDs array
-    async function fetchAmenityNames(ids) {
-        if (ids.length === 0) {
-            return 'No amenities available';
-        }
-
-        const names = await Promise.all(ids.map(async (id) => {
-            try {
-                const response = await fetch(`http://127.0.0.1:5000/api/v1/amenities/${id}`);
-                if (response.ok) {
-                    const data = await response.json();
-                    return data.name;
-                }
-            } catch (error) {
-                console.error('Error fetching amenity:', error);
-            }
-            return null;
-        }));
-        return names.filter(name => name).join(', ') || 'No amenities available';
-    }
-
     // Authentication functions
     async function loginUser(email, password) {
         try {
@@ -240,32 +224,69 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // Places listing functions
-    async function fetchPlaces(token) {
+    // Fetch one page of places: the first one, or the one after cursor ("Load more")
+    async function fetchPlaces(token, maxPrice = 'All', cursor = null) {
+        // A newer filter selection supersedes pages still in flight
+        const requestId = ++placesRequestId;
+        // The cards only show the title and price
+        const params = new URLSearchParams({ limit: '20', fields: 'id,title,price' });
+        if (maxPrice !== 'All') {
+            params.set('max_price', maxPrice);
+        }
+        if (cursor) {
+            params.set('cursor', cursor);
+        } else {
+            placesList.innerHTML = '';
+        }
+        showLoadMore(loadMorePlaces, false);
+
         try {
-            const response = await fetch('http://127.0.0.1:5000/api/v1/places/', {
+            const response = await fetch(`http://127.0.0.1:5000/api/v1/places/?${params}`, {
                 headers: { 'Authorization': `Bearer ${token}` }
             });
 
-            if (response.ok) {
-                displayPlaces(await response.json());
-            } else {
-                console.error('Failed to fetch places');
+            if (requestId !== placesRequestId) {
+                return;
             }
+            if (!response.ok) {
+                if (response.status !== 404) {
+                    console.error('Failed to fetch places');
+                }
+                return;
+            }
+            displayPlaces(await response.json());
+            placesCursor = response.headers.get('X-Next-Cursor');
+            showLoadMore(loadMorePlaces, Boolean(placesCursor));
         } catch (error) {
             console.error('Error fetching places:', error);
         }
     }
 
+    if (loadMorePlaces) {
+        loadMorePlaces.addEventListener('click', () => {
+            const token = getCookie('token');
+            if (token && placesCursor) {
+                fetchPlaces(token, priceFilter ? priceFilter.value : 'All', placesCursor);
+            }
+        });
+    }
+
+    // The "Load more" button is hidden while a page loads and once the last one is shown
+    function showLoadMore(button, visible) {
+        if (!button) return;
+        button.style.display = visible ? 'inline-block' : 'none';
+    }
+
     function displayPlaces(places) {
         if (!placesList) return;
         
-        placesList.innerHTML = places.map(place => `
+        placesList.insertAdjacentHTML('beforeend', places.map(place => `
             <div class="place-card" data-price="${place.price}">
                 <h2>${place.title}</h2>
                 <p class="price">Price per night: $${place.price}</p>
                 <a href="place.html?id=${place.id}" class="details-button">View Details</a>
             </div>
-        `).join('');
+        `).join(''));
     }
 
     // Price filter functions
@@ -281,12 +302,10 @@ document.addEventListener('DOMContentLoaded', () => {
         if (!priceFilter) return;
         
         priceFilter.addEventListener('change', () => {
-            const selectedPrice = priceFilter.value;
-            document.querySelectorAll('.place-card').forEach(card => {
-                card.style.display = (selectedPrice === 'All' || parseFloat(card.dataset.price) <= selectedPrice) 
-                    ? 'block' 
-                    : 'none';
-            });
+            const token = getCookie('token');
+            if (token) {
+                fetchPlaces(token, priceFilter.value);
+            }
         });
     }
 